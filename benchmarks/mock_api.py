@@ -0,0 +1,533 @@
+"""
+An in-process mock of the Hetzner DNS API, for benchmarks.
+
+It serves zones and records (including the bulk endpoints, pagination and
+zone file import/export) from memory, on a local port, and counts every
+request it receives, so that a benchmark can tell how many requests an
+operation made.
+
+    with MockHetznerDNSAPI() as api:
+        zone = api.add_zone('example.com')
+        api.add_records(zone['id'], 1000)
+        os.environ['HETZNER_DNS_API_URL'] = api.url
+        ...
+        print(api.request_count)
+
+Latency, errors and rate limits can be simulated:
+    - api.latency = 0.05        (seconds added to each response)
+    - api.fail_next(2, 503)     (the next 2 requests fail with a 503)
+    - api.error_rate = 0.01     (1% of requests fail with a 503)
+    - api.rate_limit = 10       (requests per second, with rate limit headers)
+"""
+import collections
+import datetime
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# the largest page size allowed when listing zones (records are returned
+# all at once unless 'per_page' is given)
+ZONES_MAX_PER_PAGE = 100
+
+# the TTL of new zones and records
+DEFAULT_TTL = 86400
+
+# paths containing an ID are counted by their endpoint, e.g. '/zones/{id}'
+ENDPOINT_PATTERNS = [
+    (re.compile(r'^/zones/[^/]+/(export|import)$'), r'/zones/{id}/\1'),
+    (re.compile(r'^/zones/(?!file/)[^/]+$'), '/zones/{id}'),
+    (re.compile(r'^/records/(?!bulk$)[^/]+$'), '/records/{id}'),
+]
+
+
+def get_timestamp():
+    """Return the current time, in the format used by the API."""
+    return datetime.datetime.now(datetime.timezone.utc) \
+        .strftime('%Y-%m-%d %H:%M:%S.%f +0000 UTC')
+
+
+def get_endpoint(method, path):
+    """Return the endpoint of a request, e.g. 'GET /zones/{id}'."""
+    for pattern, replacement in ENDPOINT_PATTERNS:
+        if pattern.match(path):
+            path = pattern.sub(replacement, path)
+            break
+    return f'{method} {path}'
+
+
+class MockError(Exception):
+    """An error response, with its status code and message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class MockHetznerDNSAPI:
+    """
+    A mock Hetzner DNS API, served from a background thread.
+
+    All state is kept in memory, and every method is thread-safe.
+    """
+
+    def __init__(self, latency=0, error_rate=0, rate_limit=None, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+
+        self.zones = {}
+        # the records of each zone, by zone ID and then by record ID
+        self.records = collections.defaultdict(dict)
+        # the zone of each record, by record ID
+        self.record_zones = {}
+
+        self.requests = []
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+        self.failures = collections.deque()
+        self.rate_limit_window = (0, 0)  # (second, number of requests)
+
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        """The base URL of the API (for HETZNER_DNS_API_URL)."""
+        return f'http://127.0.0.1:{self.server.server_port}/api/v1'
+
+    def start(self):
+        """Start serving requests."""
+        api = self
+
+        class Handler(MockRequestHandler):
+            pass
+
+        Handler.api = api
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving requests."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # data
+
+    def add_zone(self, name, ttl=DEFAULT_TTL):
+        """Add a zone, and return it."""
+        zone = {'id': uuid.uuid4().hex[:22],
+                'name': name,
+                'ttl': ttl,
+                'created': get_timestamp(),
+                'modified': get_timestamp(),
+                'status': 'verified',
+                'records_count': 0}
+        with self.lock:
+            self.zones[zone['id']] = zone
+        return dict(zone)
+
+    def add_record(self, zone_id, name, record_type, value, ttl=None):
+        """Add a record to a zone, and return it."""
+        with self.lock:
+            return dict(self._add_record(zone_id, name, record_type, value,
+                                         ttl))
+
+    def add_records(self, zone_id, count, name='host{i}', record_type='A',
+                    value='10.{a}.{b}.{c}', ttl=None):
+        """
+        Add many records to a zone, and return them.
+
+        '{i}' in the name or value is replaced by the record's number, and
+        '{a}', '{b}' and '{c}' by the bytes of that number.
+        """
+        records = []
+        with self.lock:
+            for i in range(count):
+                parts = {'i': i, 'a': i >> 16 & 255, 'b': i >> 8 & 255,
+                         'c': i & 255}
+                records.append(dict(self._add_record(
+                    zone_id, name.format(**parts), record_type,
+                    value.format(**parts), ttl)))
+        return records
+
+    def _add_record(self, zone_id, name, record_type, value, ttl):
+        zone = self.zones.get(zone_id)
+        if zone is None:
+            raise MockError(422, 'zone not found')
+        record = {'id': uuid.uuid4().hex[:22],
+                  'zone_id': zone_id,
+                  'type': record_type,
+                  'name': name,
+                  'value': value,
+                  'created': get_timestamp(),
+                  'modified': get_timestamp()}
+        if ttl is not None:
+            record['ttl'] = int(ttl)
+        self.records[zone_id][record['id']] = record
+        self.record_zones[record['id']] = zone_id
+        zone['records_count'] += 1
+        zone['modified'] = record['modified']
+        return record
+
+    def _get_record(self, record_id):
+        zone_id = self.record_zones.get(record_id)
+        if zone_id is None:
+            raise MockError(404, 'record not found')
+        return self.records[zone_id][record_id]
+
+    def _delete_record(self, record_id):
+        record = self._get_record(record_id)
+        del self.records[record['zone_id']][record_id]
+        del self.record_zones[record_id]
+        zone = self.zones[record['zone_id']]
+        zone['records_count'] -= 1
+        zone['modified'] = get_timestamp()
+
+    def _update_record(self, record_id, record_dict):
+        record = self._get_record(record_id)
+        if record_dict.get('zone_id', record['zone_id']) != record['zone_id']:
+            raise MockError(422, 'records cannot be moved between zones')
+        for key in ('type', 'name', 'value', 'ttl'):
+            if record_dict.get(key) is not None:
+                record[key] = record_dict[key]
+        record['modified'] = get_timestamp()
+        self.zones[record['zone_id']]['modified'] = record['modified']
+        return record
+
+    # simulation
+
+    def fail_next(self, count=1, status=503):
+        """Make the next 'count' requests fail with a status code."""
+        with self.lock:
+            self.failures.extend([status] * count)
+
+    def get_failure(self):
+        """Return the status code of a simulated failure, or None."""
+        with self.lock:
+            if self.failures:
+                return self.failures.popleft()
+            if self.error_rate and self.random.random() < self.error_rate:
+                return 503
+        return None
+
+    def get_rate_limit_headers(self):
+        """
+        Count a request against the rate limit, and return the rate limit
+        headers of its response (and whether it was throttled).
+        """
+        if not self.rate_limit:
+            return {}, False
+        with self.lock:
+            second = int(time.time())
+            window_second, count = self.rate_limit_window
+            count = count + 1 if window_second == second else 1
+            self.rate_limit_window = (second, count)
+        headers = {'X-RateLimit-Limit-Second': str(self.rate_limit),
+                   'X-RateLimit-Remaining-Second':
+                       str(max(0, self.rate_limit - count))}
+        if count > self.rate_limit:
+            headers['Retry-After'] = '1'
+            return headers, True
+        return headers, False
+
+    # statistics
+
+    @property
+    def request_count(self):
+        """The number of requests received since the last reset."""
+        with self.lock:
+            return len(self.requests)
+
+    def get_request_counts(self):
+        """Return the number of requests received by each endpoint."""
+        with self.lock:
+            return dict(collections.Counter(
+                get_endpoint(method, path) for method, path, _ in
+                self.requests))
+
+    def reset_requests(self):
+        """Forget all requests received so far."""
+        with self.lock:
+            del self.requests[:]
+
+    # routes
+
+    def handle(self, method, path, query, body):
+        """Handle a request, and return its status code and response."""
+        if path == '/zones':
+            if method == 'GET':
+                return self.list_zones(query)
+            if method == 'POST':
+                return 200, {'zone': self.add_zone(body['name'],
+                                                   body.get('ttl',
+                                                            DEFAULT_TTL))}
+        if path == '/zones/file/validate' and method == 'POST':
+            return self.validate_zone_file(body)
+
+        match = re.match(r'^/zones/([^/]+)/(export|import)$', path)
+        if match:
+            zone_id, action = match.groups()
+            if action == 'export' and method == 'GET':
+                return self.export_zone_file(zone_id)
+            if action == 'import' and method == 'POST':
+                return self.import_zone_file(zone_id, body)
+
+        match = re.match(r'^/zones/([^/]+)$', path)
+        if match:
+            with self.lock:
+                zone = self.zones.get(match.group(1))
+                if zone is None:
+                    raise MockError(404, 'zone not found')
+                if method == 'GET':
+                    return 200, {'zone': dict(zone)}
+                if method == 'PUT':
+                    zone.update(name=body.get('name', zone['name']),
+                                ttl=body.get('ttl', zone['ttl']),
+                                modified=get_timestamp())
+                    return 200, {'zone': dict(zone)}
+                if method == 'DELETE':
+                    for record_id in self.records.pop(zone['id'], {}):
+                        del self.record_zones[record_id]
+                    del self.zones[zone['id']]
+                    return 200, {}
+
+        if path == '/records':
+            if method == 'GET':
+                return self.list_records(query)
+            if method == 'POST':
+                return 200, {'record': self.add_record(
+                    body.get('zone_id'), body.get('name', '@'),
+                    body.get('type'), body.get('value'), body.get('ttl'))}
+        if path == '/records/bulk':
+            if method == 'POST':
+                return self.create_records(body)
+            if method == 'PUT':
+                return self.update_records(body)
+
+        match = re.match(r'^/records/([^/]+)$', path)
+        if match:
+            with self.lock:
+                record_id = match.group(1)
+                if method == 'GET':
+                    return 200, {'record': dict(self._get_record(record_id))}
+                if method == 'PUT':
+                    return 200, {'record': dict(
+                        self._update_record(record_id, body))}
+                if method == 'DELETE':
+                    self._delete_record(record_id)
+                    return 200, {}
+
+        raise MockError(404, 'not found')
+
+    def paginate(self, items, key, query, default_per_page=None,
+                 max_per_page=None):
+        """Return a page of items, with its pagination metadata."""
+        per_page = int(query.get('per_page') or default_per_page or
+                       max(1, len(items)))
+        if max_per_page:
+            per_page = min(per_page, max_per_page)
+        page = max(1, int(query.get('page') or 1))
+        last_page = max(1, -(-len(items) // per_page))
+        return 200, {key: items[(page - 1) * per_page:page * per_page],
+                     'meta': {'pagination': {'page': page,
+                                             'per_page': per_page,
+                                             'previous_page': max(1, page - 1),
+                                             'next_page': min(last_page,
+                                                              page + 1),
+                                             'last_page': last_page,
+                                             'total_entries': len(items)}}}
+
+    def list_zones(self, query):
+        with self.lock:
+            zones = [dict(zone) for zone in self.zones.values()
+                     if not query.get('name') or zone['name'] == query['name']]
+        return self.paginate(zones, 'zones', query,
+                             default_per_page=ZONES_MAX_PER_PAGE,
+                             max_per_page=ZONES_MAX_PER_PAGE)
+
+    def list_records(self, query):
+        with self.lock:
+            if query.get('zone_id'):
+                zone_records = [self.records.get(query['zone_id'], {})]
+            else:
+                zone_records = list(self.records.values())
+            records = [dict(record) for records in zone_records
+                       for record in records.values()]
+        return self.paginate(records, 'records', query)
+
+    def create_records(self, body):
+        created = []
+        invalid = []
+        with self.lock:
+            for record_dict in body.get('records') or []:
+                try:
+                    created.append(dict(self._add_record(
+                        record_dict.get('zone_id'),
+                        record_dict.get('name', '@'),
+                        record_dict.get('type'), record_dict.get('value'),
+                        record_dict.get('ttl'))))
+                except MockError:
+                    invalid.append(record_dict)
+        return 200, {'records': created,
+                     'valid_records': created,
+                     'invalid_records': invalid}
+
+    def update_records(self, body):
+        updated = []
+        failed = []
+        with self.lock:
+            for record_dict in body.get('records') or []:
+                try:
+                    updated.append(dict(self._update_record(
+                        record_dict.get('id'), record_dict)))
+                except MockError:
+                    failed.append(record_dict)
+        return 200, {'records': updated, 'failed_records': failed}
+
+    def export_zone_file(self, zone_id):
+        with self.lock:
+            zone = self.zones.get(zone_id)
+            if zone is None:
+                raise MockError(404, 'zone not found')
+            lines = [f"$ORIGIN {zone['name']}.", f"$TTL {zone['ttl']}"]
+            for record in self.records.get(zone_id, {}).values():
+                lines.append(f"{record['name']} {record.get('ttl', '')} IN "
+                             f"{record['type']} {record['value']}")
+        return 200, ('\n'.join(lines) + '\n').encode('utf-8')
+
+    def parse_zone_file(self, zone_file):
+        """Return the valid and invalid records of a zone file."""
+        valid = []
+        invalid = []
+        for line in zone_file.splitlines():
+            if not line.strip() or line.startswith(('$', ';')):
+                continue
+            parts = line.split(None, 4)
+            if len(parts) == 5 and parts[2] == 'IN':
+                name, ttl, _, record_type, value = parts
+                valid.append({'name': name, 'ttl': int(ttl),
+                              'type': record_type, 'value': value})
+            elif len(parts) == 4 and parts[1] == 'IN':
+                name, _, record_type, value = parts
+                valid.append({'name': name, 'ttl': None,
+                              'type': record_type, 'value': value})
+            else:
+                invalid.append(line)
+        return valid, invalid
+
+    def validate_zone_file(self, body):
+        valid, invalid = self.parse_zone_file(body.decode('utf-8'))
+        return 200, {'parsed_records': len(valid) + len(invalid),
+                     'valid_records': valid,
+                     'invalid_records': invalid}
+
+    def import_zone_file(self, zone_id, body):
+        valid, invalid = self.parse_zone_file(body.decode('utf-8'))
+        if invalid:
+            raise MockError(422, 'invalid zone file')
+        with self.lock:
+            zone = self.zones.get(zone_id)
+            if zone is None:
+                raise MockError(404, 'zone not found')
+            for record_id in list(self.records.get(zone_id, {})):
+                self._delete_record(record_id)
+            for record in valid:
+                self._add_record(zone_id, record['name'], record['type'],
+                                 record['value'], record['ttl'])
+            return 200, {'zone': dict(zone)}
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """Passes each request to the handler's MockHetznerDNSAPI."""
+
+    api = None
+    protocol_version = 'HTTP/1.1'
+
+    # the headers and body are written separately, which would otherwise
+    # delay every response on a kept-alive connection by ~40ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass  # don't print every request
+
+    def handle_request(self, method):
+        url = urlparse(self.path)
+        path = url.path
+        if path.startswith('/api/v1'):
+            path = path[len('/api/v1'):]
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        with self.api.lock:
+            self.api.requests.append((method, path, url.query))
+
+        if self.api.latency:
+            time.sleep(self.api.latency)
+
+        headers, throttled = self.api.get_rate_limit_headers()
+        failure = self.api.get_failure()
+        if throttled:
+            status, response = 429, {'message': 'rate limit exceeded'}
+        elif failure:
+            status, response = failure, {'message': 'simulated failure'}
+        elif not self.headers.get('Auth-API-Token'):
+            status, response = 401, {'message': 'Invalid authentication'}
+        else:
+            try:
+                if body and not path.endswith(('/import', '/validate')):
+                    body = json.loads(body)
+                status, response = self.api.handle(method, path, query,
+                                                   body or {})
+            except MockError as err:
+                status = err.status
+                response = {'error': {'message': err.message,
+                                      'code': err.status}}
+            except (ValueError, KeyError, TypeError) as err:
+                status = 422
+                response = {'error': {'message': str(err), 'code': 422}}
+
+        if isinstance(response, bytes):
+            content_type = 'text/plain'
+        else:
+            content_type = 'application/json'
+            response = json.dumps(response).encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(response)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(response)
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def do_PUT(self):
+        self.handle_request('PUT')
+
+    def do_DELETE(self):
+        self.handle_request('DELETE')
@@ -0,0 +1,328 @@
+#!/usr/bin/python3
+"""
+Benchmark the public functions of hetzner-dns-tools against a mock API.
+
+Each case (e.g. 'zone_get_by_name') is run against a zone containing 10,
+1,000 and 50,000 records, plus some smaller zones. For each case and scale,
+the results contain:
+    - requests: the number of API requests made by one operation
+    - requests_by_endpoint: the same, for each endpoint
+    - wall_ms: the median (and fastest) time taken by one operation
+    - peak_memory_kb: the most memory allocated during one operation
+
+Every operation uses a new token, so nothing is cached between operations.
+
+Usage:  python benchmarks/run_benchmarks.py [--scales 10,1k,50k]
+            [--cases 'record_get*'] [--repeat 3] [--latency-ms 0]
+            [--error-rate 0] [--output results.json]
+            [--baseline results.json] [--tolerance 0.25]
+
+Results are printed as JSON (or written to '--output'). If '--baseline' is
+given, the results are compared to an earlier run, and the exit code is 1
+if any case made more requests, or was more than 'tolerance' slower.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+
+# the 'src' directory, so that the benchmark works without installing
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+
+from mock_api import MockHetznerDNSAPI  # noqa: E402
+
+from hetzner_dns_tools.hetzner_dns_client import get_client  # noqa: E402
+from hetzner_dns_tools.record_create import record_create  # noqa: E402
+from hetzner_dns_tools.record_create_bulk import record_create_bulk  # noqa
+from hetzner_dns_tools.record_delete import record_delete  # noqa: E402
+from hetzner_dns_tools.record_get import record_get  # noqa: E402
+from hetzner_dns_tools.record_list import record_list  # noqa: E402
+from hetzner_dns_tools.record_update import record_update  # noqa: E402
+from hetzner_dns_tools.record_update_bulk import record_update_bulk  # noqa
+from hetzner_dns_tools.zone_export import zone_export  # noqa: E402
+from hetzner_dns_tools.zone_get import zone_get  # noqa: E402
+from hetzner_dns_tools.zone_list import zone_list  # noqa: E402
+
+# the number of records in the benchmarked zone, at each scale
+SCALES = {'10': 10, '1k': 1000, '50k': 50000}
+
+# the number of other zones (with 10 records each) at every scale
+OTHER_ZONES = 20
+
+# the number of records created, updated or deleted by the bulk cases
+BULK_SIZE = 100
+
+# the number of records deleted by the multi-delete cases
+DELETE_SIZE = 10
+
+# a case is only slower than its baseline if it is slower by at least this
+# many milliseconds, since very fast cases are mostly noise
+MIN_REGRESSION_MS = 5
+
+
+class Context:
+    """The mock API, the benchmarked zone, and the token of an operation."""
+
+    def __init__(self, api, zone, records):
+        self.api = api
+        self.zone = zone
+        self.records = records
+        self.token = None
+
+    def new_token(self):
+        """Use a new token, so that no cached data is reused."""
+        self.token = f'benchmark-{uuid.uuid4().hex}'
+        return self.token
+
+
+def setup_update_bulk(ctx):
+    return [{'record_id': record['id'], 'zone_id': ctx.zone['id'],
+             'type': 'A', 'name': record['name'], 'value': '10.255.255.1'}
+            for record in ctx.records[:BULK_SIZE]]
+
+
+def setup_delete(ctx):
+    return [record['id'] for record in ctx.api.add_records(
+        ctx.zone['id'], DELETE_SIZE, name='delete-me', value='10.254.0.{c}')]
+
+
+# each case's function, which is given the context and the result of the
+# case's (untimed) setup function
+CASES = {
+    'zone_list': {
+        'run': lambda ctx, _: zone_list(ctx.token),
+    },
+    'zone_get_by_id': {
+        'run': lambda ctx, _: zone_get(ctx.token, zone_id=ctx.zone['id']),
+    },
+    'zone_get_by_name': {
+        'run': lambda ctx, _: zone_get(ctx.token,
+                                       zone_name=ctx.zone['name']),
+    },
+    'record_list_by_zone_id': {
+        'run': lambda ctx, _: record_list(ctx.token, zone_id=ctx.zone['id']),
+    },
+    'record_list_by_zone_name': {
+        'run': lambda ctx, _: record_list(ctx.token,
+                                          zone_name=ctx.zone['name']),
+    },
+    'record_get_by_id': {
+        'run': lambda ctx, _: record_get(ctx.token,
+                                         record_id=ctx.records[-1]['id']),
+    },
+    'record_get_by_name': {
+        'run': lambda ctx, _: record_get(ctx.token,
+                                         zone_name=ctx.zone['name'],
+                                         name=ctx.records[-1]['name'],
+                                         record_type='A'),
+    },
+    'record_get_all_zones': {
+        'run': lambda ctx, _: record_get(ctx.token,
+                                         name='host5',
+                                         record_type='A',
+                                         search_all_zones=True,
+                                         allow_multiple_records=True),
+    },
+    'record_create_by_zone_name': {
+        'run': lambda ctx, _: record_create(ctx.token,
+                                            zone_name=ctx.zone['name'],
+                                            record_type='A',
+                                            name='created',
+                                            value='10.253.0.1'),
+    },
+    'record_create_bulk': {
+        'run': lambda ctx, _: record_create_bulk(
+            ctx.token,
+            records=[{'zone_id': ctx.zone['id'], 'type': 'A',
+                      'name': f'bulk{i}', 'value': '10.252.0.1'}
+                     for i in range(BULK_SIZE)]),
+    },
+    'record_update_by_name': {
+        'run': lambda ctx, _: record_update(ctx.token,
+                                            zone_name=ctx.zone['name'],
+                                            name=ctx.records[-1]['name'],
+                                            record_type='A',
+                                            value='10.251.0.1'),
+    },
+    'record_update_bulk': {
+        'setup': setup_update_bulk,
+        'run': lambda ctx, records: record_update_bulk(ctx.token,
+                                                       records=records),
+    },
+    'record_delete_by_name': {
+        'setup': setup_delete,
+        'run': lambda ctx, _: record_delete(ctx.token,
+                                            zone_name=ctx.zone['name'],
+                                            name='delete-me',
+                                            record_type='A',
+                                            delete_multiple_records=True),
+    },
+    'record_delete_by_ids': {
+        'setup': setup_delete,
+        'run': lambda ctx, record_ids: record_delete(ctx.token,
+                                                     record_ids=record_ids),
+    },
+    'zone_export': {
+        'run': lambda ctx, _: zone_export(ctx.token, zone_id=ctx.zone['id']),
+    },
+}
+
+
+def create_context(api, scale):
+    """Add the benchmarked zone and the other zones to the mock API."""
+    for i in range(OTHER_ZONES):
+        other_zone = api.add_zone(f'other{i}.example.com')
+        api.add_records(other_zone['id'], 10)
+
+    zone = api.add_zone(f'benchmark-{scale}.example.com')
+    records = api.add_records(zone['id'], SCALES[scale])
+    return Context(api, zone, records)
+
+
+def run_operation(ctx, case):
+    """Run a case once, and return the time it took (in milliseconds)."""
+    prepared = case['setup'](ctx) if 'setup' in case else None
+    ctx.new_token()
+    ctx.api.reset_requests()
+    try:
+        start = time.perf_counter()
+        case['run'](ctx, prepared)
+        return (time.perf_counter() - start) * 1000
+    finally:
+        get_client(ctx.token).close()
+
+
+def run_case(ctx, name, case, repeat):
+    """Run a case 'repeat' times, and return its results."""
+    wall_times = [run_operation(ctx, case) for _ in range(repeat)]
+
+    # the requests made by the last operation
+    requests = ctx.api.request_count
+    requests_by_endpoint = ctx.api.get_request_counts()
+
+    # tracemalloc slows everything down, so memory is measured separately
+    tracemalloc.start()
+    try:
+        run_operation(ctx, case)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'case': name,
+            'requests': requests,
+            'requests_by_endpoint': requests_by_endpoint,
+            'wall_ms': round(statistics.median(wall_times), 2),
+            'min_wall_ms': round(min(wall_times), 2),
+            'peak_memory_kb': round(peak_memory / 1024, 1)}
+
+
+def compare_results(results, baseline, tolerance):
+    """Return the regressions of some results, compared to a baseline."""
+    baseline_results = {(result['case'], result['scale']): result
+                        for result in baseline['results']}
+
+    regressions = []
+    for result in results['results']:
+        old = baseline_results.get((result['case'], result['scale']))
+        if old is None:
+            continue
+        if result['requests'] > old['requests']:
+            regressions.append(f"{result['case']} ({result['scale']}): "
+                               f"{old['requests']} -> {result['requests']} "
+                               "requests")
+        if result['wall_ms'] > old['wall_ms'] * (1 + tolerance) \
+                and result['wall_ms'] - old['wall_ms'] >= MIN_REGRESSION_MS:
+            regressions.append(f"{result['case']} ({result['scale']}): "
+                               f"{old['wall_ms']} -> {result['wall_ms']} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hetzner-dns-tools "
+                                                 "against a mock API.")
+    parser.add_argument('--scales', default=','.join(SCALES),
+                        help="the scales to run (default: %(default)s)")
+    parser.add_argument('--cases', default='*',
+                        help="only run cases matching these glob patterns "
+                             "(comma-separated)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="the number of times each case is timed")
+    parser.add_argument('--latency-ms', type=float, default=0,
+                        help="the time added to each response by the mock")
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help="the fraction of requests that fail with a 503")
+    parser.add_argument('--output',
+                        help="write the results to this file")
+    parser.add_argument('--baseline',
+                        help="compare the results to this earlier output")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="how much slower a case may be than its "
+                             "baseline (default: %(default)s)")
+    args = parser.parse_args()
+
+    scales = [scale.strip() for scale in args.scales.split(',')]
+    for scale in scales:
+        if scale not in SCALES:
+            parser.error(f"Invalid scale: '{scale}' "
+                         f"(must be one of: {', '.join(SCALES)})")
+
+    patterns = [pattern.strip() for pattern in args.cases.split(',')]
+    case_names = [name for name in CASES
+                  if any(fnmatch.fnmatch(name, pattern)
+                         for pattern in patterns)]
+
+    # the results must not depend on the caller's settings
+    for key in list(os.environ):
+        if key.startswith('HETZNER_DNS_') or key in (
+                'ZONE_ID', 'ZONE_NAME', 'RECORD_ID', 'NAME', 'TYPE', 'VALUE',
+                'TTL', 'SHOW_HELP', 'DRY_RUN', 'OUTPUT_FILE'):
+            del os.environ[key]
+
+    results = {'meta': {'python': platform.python_version(),
+                        'platform': platform.platform(),
+                        'repeat': args.repeat,
+                        'latency_ms': args.latency_ms,
+                        'error_rate': args.error_rate,
+                        'time': time.strftime('%Y-%m-%dT%H:%M:%SZ',
+                                              time.gmtime())},
+               'results': []}
+
+    for scale in scales:
+        with MockHetznerDNSAPI(latency=args.latency_ms / 1000,
+                               error_rate=args.error_rate) as api:
+            os.environ['HETZNER_DNS_API_URL'] = api.url
+            ctx = create_context(api, scale)
+            for name in case_names:
+                result = run_case(ctx, name, CASES[name], args.repeat)
+                result['scale'] = scale
+                results['results'].append(result)
+                print(f"{name} ({scale}): {result['requests']} requests, "
+                      f"{result['wall_ms']} ms", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""
+Check that hetzner-dns-tools starts quickly.
+
+Each case is run in a new Python process (the same way that Bash scripts run
+hetzner-dns-tools), and its fastest time is compared to the time taken to
+start Python itself. The check fails if any case takes longer than its
+budget, or if importing the package, showing help or validating parameters
+imports a heavy module (e.g. requests).
+
+Usage:  python benchmarks/startup.py [--runs 10] [--budget-scale 1.0]
+
+Results are printed as JSON. The exit code is 1 if any check failed.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# the 'src' directory, so that the benchmark works without installing
+SRC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        '..', 'src')
+
+# modules that must not be imported before a request is sent
+HEAVY_MODULES = ['requests', 'urllib3', 'orjson', 'yaml', 'aiohttp',
+                 'concurrent.futures']
+
+# each case's code, environment, and budget (in milliseconds, on top of
+# the time taken to start Python)
+CASES = {
+    'import': {
+        'code': "import hetzner_dns_tools",
+        'env': {},
+        'budget_ms': 15,
+    },
+    'cli_help': {
+        'code': "from hetzner_dns_tools.cli import main; "
+                "main(['record', 'get', '--help'])",
+        'env': {},
+        'budget_ms': 40,
+    },
+    'module_help': {
+        'code': "import runpy; "
+                "runpy.run_module('hetzner_dns_tools.record_delete', "
+                "run_name='__main__')",
+        'env': {'SHOW_HELP': '1'},
+        'budget_ms': 40,
+    },
+    'validation_error': {
+        'code': "from hetzner_dns_tools.cli import main; "
+                "main(['record', 'get'])",
+        'env': {'HETZNER_DNS_TOKEN': 'invalid'},
+        'budget_ms': 40,
+    },
+}
+
+# prints the heavy modules that were imported, when the case's code is done
+CHECK_IMPORTS_CODE = """
+import atexit, sys
+atexit.register(lambda: sys.stderr.write(
+    'HEAVY_MODULES=' + ','.join(m for m in {heavy_modules!r}
+                                if m in sys.modules) + '\\n'))
+{code}
+"""
+
+
+def get_environment(extra_env):
+    """Return the environment used to run a case."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, [SRC_PATH, os.environ.get('PYTHONPATH')]))
+    # don't let the caller's settings change what is being measured
+    env.pop('PYTHONPROFILEIMPORTTIME', None)
+    env.pop('SHOW_HELP', None)
+    env.update(extra_env)
+    return env
+
+
+def time_code(code, env):
+    """Return the time taken to run some code in a new process."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code],
+                   env=env,
+                   stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def time_case(code, env, runs):
+    """
+    Return the fastest time taken to run some code, minus the fastest time
+    taken to start Python, in milliseconds.
+
+    The two are run alternately, so that both are equally affected by
+    anything else that is running on the machine.
+    """
+    baseline_times = []
+    times = []
+    for _ in range(runs):
+        baseline_times.append(time_code('pass', env))
+        times.append(time_code(code, env))
+    return max(0.0, min(times) - min(baseline_times))
+
+
+def get_heavy_imports(code, env):
+    """Return the heavy modules that are imported by some code."""
+    result = subprocess.run(
+        [sys.executable, '-c', CHECK_IMPORTS_CODE.format(
+            heavy_modules=HEAVY_MODULES, code=code)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True)
+    for line in result.stderr.splitlines():
+        if line.startswith('HEAVY_MODULES='):
+            return [m for m in line.partition('=')[2].split(',') if m]
+    raise RuntimeError(f"Could not run case: {result.stderr.strip()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the startup time "
+                                                 "of hetzner-dns-tools.")
+    parser.add_argument('--runs', type=int, default=10,
+                        help="the number of times each case is run")
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help="multiply every budget (e.g. for slow machines)")
+    args = parser.parse_args()
+
+    results = {'cases': {}}
+    ok = True
+    for name, case in CASES.items():
+        env = get_environment(case['env'])
+        elapsed_ms = time_case(case['code'], env, args.runs)
+        budget_ms = case['budget_ms'] * args.budget_scale
+        heavy_imports = get_heavy_imports(case['code'], env)
+
+        case_ok = elapsed_ms <= budget_ms and not heavy_imports
+        ok = ok and case_ok
+        results['cases'][name] = {'ms': round(elapsed_ms, 1),
+                                  'budget_ms': budget_ms,
+                                  'heavy_imports': heavy_imports,
+                                  'ok': case_ok}
+
+    results['ok'] = ok
+    print(json.dumps(results, indent=2))
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+An asyncio API for Hetzner's DNS API, which mirrors the zone_* and
+record_* functions. Requires aiohttp (pip install hetzner-dns-tools[aio]).
+
+    import asyncio
+    from hetzner_dns_tools.aio import aclose, record_create, zone_get
+
+    async def main():
+        zone_id = await zone_get(zone_name='your-domain.com', id_only=True)
+        await asyncio.gather(*[
+            record_create(zone_id=zone_id, record_type='A',
+                          name=f'host{i}', value='1.1.1.1')
+            for i in range(100)])
+
+        # close the shared connection pool
+        await aclose()
+
+    asyncio.run(main())
+"""
+
+from .client import AsyncHetznerDNSClient, aclose, get_client
+from .record_create import record_create
+from .record_delete import record_delete
+from .record_get import record_get
+from .record_list import record_list
+from .record_update import record_update
+from .zone_get import zone_get
+from .zone_list import zone_list
+
+__all__ = ['AsyncHetznerDNSClient', 'aclose', 'get_client',
+           'record_create', 'record_delete', 'record_get', 'record_list',
+           'record_update', 'zone_get', 'zone_list']
@@ -0,0 +1,384 @@
+import asyncio
+import os
+import time
+import weakref
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is an optional dependency
+    aiohttp = None
+
+from .. import hetzner_dns_helpers as helpers
+from .. import json_codec
+from .. import request_hooks
+from ..hetzner_dns_client import (
+    API_BASE_URL, DEFAULT_CONNECT_TIMEOUT, DEFAULT_MAX_RATE_LIMIT_RETRIES,
+    DEFAULT_MAX_RETRIES, DEFAULT_READ_TIMEOUT, DEFAULT_RETRY_BACKOFF,
+    IDEMPOTENT_METHODS, RETRY_STATUS_CODES, get_backoff_delay)
+from ..rate_limit import get_rate_limiter, get_retry_after
+from ..zone_resolver import DEFAULT_ZONE_CACHE_TTL
+
+# the number of seconds to wait for a request to complete
+DEFAULT_TIMEOUT = 30
+
+
+class AsyncHetznerDNSClient:
+    """
+    An asyncio client for Hetzner's DNS API, built on aiohttp.
+
+    The client owns the API token, the base URL, and a connection pool
+    that is shared by every request made with it, so that many
+    operations can be run concurrently with `asyncio.gather`:
+
+        async with AsyncHetznerDNSClient(hetzner_dns_token='...') as client:
+            zones = await zone_list(client=client)
+
+    * hetzner_dns_token *MUST* be passed in args or as environment
+      variable (HETZNER_DNS_TOKEN).
+
+    - 'limit' is the maximum number of simultaneous connections.
+    - 'timeout' is the maximum number of seconds for each request, after
+      which `asyncio.TimeoutError` is raised. The connect and read
+      timeouts, and the retries of idempotent requests, are the same as
+      `HetznerDNSClient`'s.
+    - The base URL can be overridden with 'base_url' or the
+      HETZNER_DNS_API_URL environment variable.
+    - Requests are paced and retried according to the API's rate limits,
+      in the same way as `HetznerDNSClient`.
+    """
+
+    def __init__(self,
+                 hetzner_dns_token=None,
+                 base_url=None,
+                 limit=100,
+                 timeout=DEFAULT_TIMEOUT,
+                 max_workers=4,
+                 max_rate_limit_retries=None,
+                 connect_timeout=None,
+                 read_timeout=None,
+                 max_retries=None,
+                 retry_backoff=None):
+        if aiohttp is None:
+            raise ImportError("The asyncio API requires aiohttp. Install it "
+                              "with: pip install hetzner-dns-tools[aio]")
+
+        if hetzner_dns_token is None:
+            # get token from environment variable
+            hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+        if base_url is None:
+            # get base URL from environment variable
+            base_url = os.environ.get('HETZNER_DNS_API_URL', API_BASE_URL)
+
+        if max_rate_limit_retries is None:
+            # get max_rate_limit_retries from environment variable
+            max_rate_limit_retries = int(os.environ.get(
+                'HETZNER_DNS_RATE_LIMIT_RETRIES',
+                DEFAULT_MAX_RATE_LIMIT_RETRIES))
+
+        if connect_timeout is None:
+            # get connect_timeout from environment variable
+            connect_timeout = float(os.environ.get(
+                'HETZNER_DNS_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT))
+
+        if read_timeout is None:
+            # get read_timeout from environment variable
+            read_timeout = float(os.environ.get(
+                'HETZNER_DNS_READ_TIMEOUT', DEFAULT_READ_TIMEOUT))
+
+        if max_retries is None:
+            # get max_retries from environment variable
+            max_retries = int(os.environ.get(
+                'HETZNER_DNS_MAX_RETRIES', DEFAULT_MAX_RETRIES))
+
+        if retry_backoff is None:
+            # get retry_backoff from environment variable
+            retry_backoff = float(os.environ.get(
+                'HETZNER_DNS_RETRY_BACKOFF', DEFAULT_RETRY_BACKOFF))
+
+        self.hetzner_dns_token = hetzner_dns_token
+        self.base_url = base_url.rstrip('/')
+        self.limit = limit
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        # shared with every other client that uses the same token
+        self.rate_limiter = get_rate_limiter(hetzner_dns_token)
+        self.max_rate_limit_retries = max_rate_limit_retries
+
+        # the number of pages that may be fetched at the same time
+        self.max_workers = max_workers
+
+        self._session = None
+
+        # zone name -> (zone, time cached), and zone lookups in progress
+        self._zones = {}
+        self._zone_lookups = {}
+        self.zone_cache_ttl = float(os.environ.get(
+            'HETZNER_DNS_ZONE_CACHE_TTL', DEFAULT_ZONE_CACHE_TTL))
+
+    @property
+    def session(self):
+        # the session must be created inside the event loop that uses it
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={'Auth-API-Token': self.hetzner_dns_token},
+                connector=aiohttp.TCPConnector(limit=self.limit),
+                timeout=aiohttp.ClientTimeout(
+                    total=self.timeout,
+                    sock_connect=self.connect_timeout,
+                    sock_read=self.read_timeout))
+        return self._session
+
+    async def request(self, method, path, params=None, data=None,
+                      retry=None):
+        """
+        Send a request to the API, and return the response's status code
+        and decoded JSON body.
+
+        - 'path' is relative to the base URL, e.g. '/zones'.
+        - If 'data' is given, it will be encoded as JSON.
+        - If 'retry' is truthy, the request is retried after transient
+          failures. By default, only idempotent requests are retried.
+        """
+        headers = None
+        if data is not None:
+            data = json_codec.dumps_bytes(data)
+            headers = {'Content-Type': 'application/json'}
+
+        if retry is None:
+            retry = method.upper() in IDEMPOTENT_METHODS
+        max_retries = self.max_retries if retry else 0
+
+        retries = 0
+        throttled_retries = 0
+        while True:
+            # wait for our turn to send a request
+            delay = self.rate_limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            # only describe the request if anything will use the description
+            request_info = None
+            if request_hooks.has_hooks():
+                request_info = request_hooks.start_request(
+                    method, path, self.base_url + path,
+                    retries + throttled_retries, data)
+                request_hooks.emit('before_request', request_info)
+
+            start = time.perf_counter()
+            try:
+                async with self.session.request(method,
+                                                self.base_url + path,
+                                                params=params,
+                                                data=data,
+                                                headers=headers) as response:
+                    content = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if request_info is not None:
+                    request_hooks.emit('after_request',
+                                       request_hooks.finish_request(
+                                           request_info,
+                                           time.perf_counter() - start,
+                                           error=err))
+                if not isinstance(err, (aiohttp.ClientConnectionError,
+                                        asyncio.TimeoutError))\
+                        or retries >= max_retries:
+                    raise
+                await asyncio.sleep(
+                    get_backoff_delay(retries, self.retry_backoff))
+                retries += 1
+                continue
+
+            if request_info is not None:
+                request_hooks.emit('after_request',
+                                   request_hooks.finish_request(
+                                       request_info,
+                                       time.perf_counter() - start,
+                                       status=response.status,
+                                       headers=response.headers,
+                                       bytes_received=len(content)))
+
+            self.rate_limiter.update(response.headers)
+
+            if response.status == 429\
+                    and throttled_retries < self.max_rate_limit_retries:
+                # throttled requests are not processed, so they can be retried
+                self.rate_limiter.backoff(get_retry_after(response.headers))
+                throttled_retries += 1
+                continue
+
+            if response.status in RETRY_STATUS_CODES\
+                    and retries < max_retries:
+                await asyncio.sleep(
+                    get_backoff_delay(retries, self.retry_backoff))
+                retries += 1
+                continue
+
+            break
+
+        return response.status, json_codec.loads(content or b'{}')
+
+    async def get_json(self, path, params=None):
+        """Send a GET request and return the decoded JSON response."""
+        _, response_dict = await self.request('GET', path, params=params)
+        return response_dict
+
+    async def get_all_pages(self, path, key, params=None, per_page=None):
+        """
+        Get every page of a paginated listing, and merge them into a
+        single response dictionary.
+
+        The first page is used to find the last page, then the remaining
+        pages are fetched concurrently (up to 'max_workers' at a time).
+        """
+        params = dict(params or {})
+        if per_page:
+            params['per_page'] = per_page
+
+        response_dict = await self.get_json(path, params=dict(params, page=1))
+        if key not in response_dict:
+            return response_dict
+
+        pagination = response_dict.get('meta', {}).get('pagination') or {}
+        last_page = int(pagination.get('last_page') or 1)
+
+        items = list(response_dict[key])
+        if last_page > 1:
+            semaphore = asyncio.Semaphore(self.max_workers)
+
+            async def get_page(page):
+                async with semaphore:
+                    page_dict = await self.get_json(
+                        path, params=dict(params, page=page))
+                helpers.check_response_for_errors(page_dict)
+                return page_dict[key]
+
+            pages = await asyncio.gather(
+                *[get_page(page) for page in range(2, last_page + 1)])
+            for page_items in pages:
+                items.extend(page_items)
+
+        # describe the merged result as a single page
+        response_dict[key] = items
+        response_dict.setdefault('meta', {})['pagination'] = {
+            'page': 1,
+            'per_page': len(items),
+            'last_page': 1,
+            'total_entries': len(items)}
+
+        return response_dict
+
+    async def _fetch_zone(self, zone_name):
+        status, response_dict = await self.request(
+            'GET', '/zones', params={'name': zone_name})
+
+        # the API responds with 404 if no zones match
+        if status == 404:
+            return None
+
+        # check response for errors
+        helpers.check_response_for_errors(response_dict)
+
+        for zone in response_dict.get('zones', []):
+            if zone['name'] == zone_name:
+                self._zones[zone_name] = (zone, time.monotonic())
+                return zone
+
+        return None
+
+    async def get_zone(self, zone_name, refresh=False):
+        """
+        Return the zone with a matching name, or None if none exists.
+
+        Zones are cached by name (see `ZoneResolver`), and concurrent
+        lookups of the same name share a single request.
+        """
+        zone, cached_at = self._zones.get(zone_name, (None, None))
+        if zone is not None and not refresh\
+                and time.monotonic() - cached_at < self.zone_cache_ttl:
+            return zone
+
+        lookup = self._zone_lookups.get(zone_name)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self._fetch_zone(zone_name))
+            self._zone_lookups[zone_name] = lookup
+            lookup.add_done_callback(
+                lambda _: self._zone_lookups.pop(zone_name, None))
+
+        # don't cancel the lookup for other callers if this one is cancelled
+        return await asyncio.shield(lookup)
+
+    async def get_zone_id(self, zone_name):
+        """Return the ID of the zone with a matching name, or None."""
+        zone = await self.get_zone(zone_name)
+        return zone['id'] if zone else None
+
+    def invalidate_zones(self, zone_name=None, zone_id=None):
+        """
+        Remove a zone from the cache by name or ID, or clear the cache if
+        neither is given.
+        """
+        for name, (zone, _) in list(self._zones.items()):
+            if (zone_name is None and zone_id is None)\
+                    or name == zone_name or zone['id'] == zone_id:
+                del self._zones[name]
+
+    async def close(self):
+        """Close all pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+# each event loop gets its own clients, since sessions can't be shared
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_client(hetzner_dns_token=None, client=None):
+    """
+    Get the shared client for a token in the running event loop, creating
+    it if necessary. If 'client' is given, it is returned instead.
+    """
+    if client is not None:
+        return client
+
+    if hetzner_dns_token is None:
+        # get token from environment variable
+        hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+    loop_clients = _clients.setdefault(asyncio.get_event_loop(), {})
+    if hetzner_dns_token not in loop_clients:
+        loop_clients[hetzner_dns_token] =\
+            AsyncHetznerDNSClient(hetzner_dns_token=hetzner_dns_token)
+
+    return loop_clients[hetzner_dns_token]
+
+
+async def aclose(hetzner_dns_token=None):
+    """
+    Close the shared clients (see `get_client`) of the running event loop,
+    and their pooled connections.
+
+    This should be awaited before the event loop is closed, e.g. at the
+    end of the coroutine passed to `asyncio.run`. If 'hetzner_dns_token'
+    is given, only that token's client is closed.
+    """
+    loop_clients = _clients.get(asyncio.get_event_loop(), {})
+    if hetzner_dns_token is not None:
+        clients = [loop_clients.pop(hetzner_dns_token, None)]
+    else:
+        clients = list(loop_clients.values())
+        loop_clients.clear()
+
+    for client in clients:
+        if client is not None:
+            await client.close()
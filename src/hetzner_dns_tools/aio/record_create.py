@@ -0,0 +1,66 @@
+import asyncio
+
+from .. import hetzner_dns_helpers as helpers
+from ..disk_cache import get_disk_cache
+from .client import get_client
+
+
+async def record_create(hetzner_dns_token=None,
+                        record_type=None,
+                        name='@',
+                        value=None,
+                        ttl=86400,
+                        zone_id=None,
+                        zone_name=None,
+                        id_only=False,
+                        retry=False,
+                        client=None):
+    """
+    Create a new record.
+    https://dns.hetzner.com/api-docs/#operation/CreateRecord
+
+    Required Parameters:
+      - `record_type`, `value`, and one of: `zone_id` or `zone_name`
+
+    Optional Parameters:
+      - `name`, `ttl`, `id_only`, `retry`, `client`
+
+
+    The asyncio equivalent of `hetzner_dns_tools.record_create.record_create`.
+
+    - If 'client' is not passed, the shared `AsyncHetznerDNSClient` for
+      the token and the running event loop is used.
+    """
+    client = get_client(hetzner_dns_token, client)
+
+    # if zone_name exists, use it to obtain the zone_id
+    if zone_name and not zone_id:
+        zone_id = await client.get_zone_id(zone_name)
+        if zone_id is None:
+            helpers.exit_with_error("zone not found")
+
+    if not zone_id:
+        helpers.exit_with_error("Must include one of: zone_id, zone_name")
+
+    params = {'ttl': ttl,
+              'type': record_type,
+              'value': value,
+              'zone_id': zone_id}
+    if name:
+        params['name'] = name
+
+    _, response_dict = await client.request('POST', '/records',
+                                            data=params, retry=retry)
+
+    # check response for errors
+    helpers.check_response_for_errors(response_dict)
+
+    # the zone's cached records are now out of date (the cache is on
+    # disk, so it is updated without blocking the event loop)
+    await asyncio.to_thread(
+        get_disk_cache(client.hetzner_dns_token).invalidate_zone, zone_id)
+
+    if id_only:
+        return response_dict['record']['id']
+
+    return response_dict
@@ -0,0 +1,151 @@
+import asyncio
+import functools
+
+from .. import hetzner_dns_helpers as helpers
+from ..disk_cache import get_disk_cache
+from ..record_delete import (DEFAULT_MAX_WORKERS, RecordDeleteError,
+                             get_delete_error_message)
+from .client import aiohttp, get_client
+from .record_get import record_get
+
+
+async def delete_records_by_id(record_ids,
+                               max_workers=DEFAULT_MAX_WORKERS,
+                               continue_on_error=False,
+                               client=None):
+    """
+    Delete many records concurrently, and return the result for each one.
+
+    The asyncio equivalent of
+    `hetzner_dns_tools.record_delete.delete_records_by_id`.
+    """
+    semaphore = asyncio.Semaphore(max_workers)
+    failed = False
+
+    async def delete_record(record_id):
+        nonlocal failed
+
+        async with semaphore:
+            if failed and not continue_on_error:
+                return 'skipped'
+
+            try:
+                status, response_dict = await client.request(
+                    'DELETE', f'/records/{record_id}')
+
+                # the record may have already been deleted
+                if status == 404:
+                    return 'not found'
+
+                # check response for errors
+                helpers.check_response_for_errors(response_dict)
+
+                return 'deleted'
+
+            except (ValueError, aiohttp.ClientError,
+                    asyncio.TimeoutError) as err:
+                failed = True
+                return f"failed: {err}"
+
+    results = await asyncio.gather(
+        *[delete_record(record_id) for record_id in record_ids])
+
+    return dict(zip(record_ids, results))
+
+
+async def record_delete(hetzner_dns_token=None,
+                        record_id=None,
+                        record_ids=None,
+                        zone_id=None,
+                        zone_name=None,
+                        name=None,
+                        record_type=None,
+                        value=None,
+                        first_record_only=False,
+                        delete_multiple_records=False,
+                        search_all_zones=False,
+                        max_workers=DEFAULT_MAX_WORKERS,
+                        continue_on_error=False,
+                        client=None):
+    """
+    Delete an existing record.
+    https://dns.hetzner.com/api-docs/#operation/DeleteRecord
+
+    Required* Parameters: One of: record_id or zone_id or zone_name
+
+    Optional Parameters:
+      Filters: record_type, name, value
+      Options: delete_multiple_records, first_record_only, search_all_zones,
+               max_workers, continue_on_error, client
+
+
+    The asyncio equivalent of `hetzner_dns_tools.record_delete.record_delete`,
+    which has the same lookup rules and return values.
+
+    - If 'client' is not passed, the shared `AsyncHetznerDNSClient` for
+      the token and the running event loop is used.
+    """
+    client = get_client(hetzner_dns_token, client)
+
+    # do an indirect lookup of all relevant records that match the parameters
+    if not record_id and not record_ids:
+        record_get_id_result = await record_get(
+            zone_id=zone_id,
+            zone_name=zone_name,
+            name=name,
+            record_type=record_type,
+            value=value,
+            id_only=True,
+            first_record_only=first_record_only,
+            allow_multiple_records=delete_multiple_records,
+            search_all_zones=search_all_zones,
+            client=client)
+
+        if isinstance(record_get_id_result, list):
+            record_ids = record_get_id_result
+        elif record_get_id_result:
+            record_id = record_get_id_result
+        else:
+            helpers.exit_with_error("record not found")
+
+    if record_id and record_ids:
+        helpers.exit_with_error(
+            "Cannot use 'record_id' and 'record_ids' at the same time.")
+
+    try:
+        if record_id:
+            _, response_dict = await client.request('DELETE',
+                                                    f'/records/{record_id}')
+
+            # check response for errors
+            helpers.check_response_for_errors(response_dict)
+
+            return "OK"
+
+        results = await delete_records_by_id(
+            record_ids,
+            max_workers=max_workers,
+            continue_on_error=continue_on_error,
+            client=client)
+    finally:
+        # the cached records of the affected zones are now out of date
+        # (the cache is on disk, so it is updated without blocking the
+        # event loop)
+        disk_cache = get_disk_cache(client.hetzner_dns_token)
+        if zone_id:
+            await asyncio.to_thread(disk_cache.invalidate_zone, zone_id)
+        else:
+            await asyncio.to_thread(disk_cache.invalidate_records,
+                                    record_ids or [record_id])
+
+    if continue_on_error:
+        return results
+
+    failures = [status for status in results.values()
+                if status.startswith('failed')]
+    if failures:
+        helpers.exit_with_error(
+            get_delete_error_message(results),
+            functools.partial(RecordDeleteError, results=results))
+
+    return "OK"
@@ -0,0 +1,101 @@
+from .. import hetzner_dns_helpers as helpers
+from ..record_get import validate_lookup_params
+from .client import get_client
+from .record_list import record_list
+
+
+async def record_get(hetzner_dns_token=None,
+                     record_id=None,
+                     zone_id=None,
+                     zone_name=None,
+                     record_type=None,
+                     name=None,
+                     value=None,
+                     first_record_only=False,
+                     allow_multiple_records=False,
+                     search_all_zones=False,
+                     id_only=False,
+                     client=None):
+    """
+    Get info about an existing record.
+    https://dns.hetzner.com/api-docs/#operation/GetRecord
+
+    Required* Parameters: One of: `record_id` or `zone_id` or `zone_name`
+
+    Optional Parameters:
+      Filters: record_type, name, value
+      Formats: id_only
+      Options: first_record_only, allow_multiple_records, search_all_zones,
+               client
+
+
+    The asyncio equivalent of `hetzner_dns_tools.record_get.record_get`,
+    which has the same lookup rules and return values.
+
+    - If 'client' is not passed, the shared `AsyncHetznerDNSClient` for
+      the token and the running event loop is used.
+    """
+    client = get_client(hetzner_dns_token, client)
+
+    # if record_id exists, do a direct lookup to obtain the record
+    if record_id:
+        _, response_dict = await client.request('GET',
+                                                f'/records/{record_id}')
+
+        # check response for errors
+        helpers.check_response_for_errors(response_dict)
+
+        return response_dict['record']['id'] if id_only else response_dict
+
+    # BEGIN validation #
+
+    validate_lookup_params(zone_id=zone_id,
+                           zone_name=zone_name,
+                           record_type=record_type,
+                           name=name,
+                           value=value,
+                           first_record_only=first_record_only,
+                           allow_multiple_records=allow_multiple_records,
+                           search_all_zones=search_all_zones)
+
+    # if zone_name passed, lookup the zone that matches it to get zone_id
+    if zone_name:
+        zone_name_id = await client.get_zone_id(zone_name)
+        if zone_name_id is None:
+            helpers.exit_with_error("zone not found")
+        elif not zone_id:
+            zone_id = zone_name_id
+        elif zone_id != zone_name_id:
+            helpers.exit_with_error(
+                "The zone_id you entered does not match the zone_id of "
+                "the zone_name you entered.")
+
+    # END validation #
+
+    records = await record_list(zone_id=zone_id,
+                                as_record_set=True,
+                                client=client)
+
+    # get the records that match all of the given parameters
+    filtered_records = [record.to_dict() for record in
+                        records.query(name=name,
+                                      record_type=record_type,
+                                      value=value)]
+
+    # if no records found, return empty dictionary
+    if not filtered_records:
+        return {}
+
+    if len(filtered_records) == 1 or first_record_only:
+        return filtered_records[0]['id'] if id_only else filtered_records[0]
+
+    if allow_multiple_records:
+        if id_only:
+            return [record['id'] for record in filtered_records]
+        return filtered_records
+
+    helpers.exit_with_error(
+        f"Found {len(filtered_records)} records. Assign a truthy "
+        "value to 'allow_multiple_records' To get all relevant "
+        "records, or use 'first_record_only' to get only the "
+        "first record.")
@@ -0,0 +1,47 @@
+from .. import hetzner_dns_helpers as helpers
+from ..record_set import RecordSet
+from .client import get_client
+
+
+async def record_list(hetzner_dns_token=None,
+                      zone_id=None,
+                      zone_name=None,
+                      per_page=None,
+                      as_record_set=False,
+                      client=None):
+    """
+    Get list of all records.
+    https://dns.hetzner.com/api-docs/#operation/GetRecords
+
+    Required Parameters: One of: `zone_id` or `zone_name`
+    Optional Parameters: `per_page`, `as_record_set`, `client`
+
+
+    The asyncio equivalent of `hetzner_dns_tools.record_list.record_list`.
+
+    - If 'client' is not passed, the shared `AsyncHetznerDNSClient` for
+      the token and the running event loop is used.
+    """
+    client = get_client(hetzner_dns_token, client)
+
+    if zone_name and not zone_id:
+        # get the ID of the matching zone
+        zone_id = await client.get_zone_id(zone_name)
+        if zone_id is None:
+            helpers.exit_with_error("zone not found")
+
+    params = {}
+    if zone_id:
+        params['zone_id'] = zone_id
+
+    response_dict = await client.get_all_pages('/records', 'records',
+                                               params=params,
+                                               per_page=per_page)
+
+    # check response for errors
+    helpers.check_response_for_errors(response_dict)
+
+    if as_record_set:
+        return RecordSet(response_dict['records'])
+
+    return response_dict
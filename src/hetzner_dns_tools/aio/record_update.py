@@ -0,0 +1,99 @@
+import asyncio
+
+from .. import hetzner_dns_helpers as helpers
+from ..disk_cache import get_disk_cache
+from .client import get_client
+from .record_list import record_list
+
+
+async def record_update(hetzner_dns_token=None,
+                        record_type=None,
+                        name=None,
+                        record_id=None,
+                        value=None,
+                        ttl=86400,
+                        zone_id=None,
+                        zone_name=None,
+                        client=None):
+    """
+    Update a record.
+    https://dns.hetzner.com/api-docs/#operation/UpdateRecord
+
+    Required Parameters:
+      - `record_type`, `value`, and one of: `zone_id` or `zone_name`
+
+    Optional Parameters:
+      - `record_id`, `name`, `ttl`, `client`
+
+
+    The asyncio equivalent of `hetzner_dns_tools.record_update.record_update`.
+
+    - If 'record_id' is not passed, then the record is found by its 'name'
+      (default: '@') and 'record_type', using the records of the given
+      zone only. If 'record_id' is passed without a 'name', the record
+      keeps its current name.
+
+    - If 'client' is not passed, the shared `AsyncHetznerDNSClient` for
+      the token and the running event loop is used.
+    """
+    client = get_client(hetzner_dns_token, client)
+
+    # if zone_name exists, use it to obtain the zone_id
+    if zone_name and not zone_id:
+        zone_id = await client.get_zone_id(zone_name)
+        if zone_id is None:
+            helpers.exit_with_error("zone not found")
+
+    if not zone_id:
+        helpers.exit_with_error("Must include one of: zone_id, zone_name")
+
+    if not name and record_id:
+        # keep the record's current name, since a PUT replaces every field
+        _, response_dict = await client.request('GET',
+                                                f'/records/{record_id}')
+
+        # check response for errors
+        helpers.check_response_for_errors(response_dict)
+
+        name = response_dict['record']['name']
+    elif not name:
+        name = '@'
+
+    # if name exists, use it to obtain the record_id (skip if record_id exists)
+    if name and not record_id:
+        records = await record_list(zone_id=zone_id,
+                                    as_record_set=True,
+                                    client=client)
+        matching_records = records.query(name=name, record_type=record_type)
+
+        if not matching_records:
+            helpers.exit_with_error("name not found in records")
+        if len(matching_records) > 1:
+            helpers.exit_with_error(
+                "more than one record found for name and type, record_id "
+                "must be provided")
+
+        record_id = matching_records[0].id
+
+    if not record_id:
+        helpers.exit_with_error(
+            "Must include (or able to retrieve): record_id")
+
+    params = {'ttl': ttl,
+              'type': record_type,
+              'value': value,
+              'name': name,
+              'zone_id': zone_id}
+
+    _, response_dict = await client.request('PUT', f'/records/{record_id}',
+                                            data=params)
+
+    # check response for errors
+    helpers.check_response_for_errors(response_dict)
+
+    # the zone's cached records are now out of date (the cache is on
+    # disk, so it is updated without blocking the event loop)
+    await asyncio.to_thread(
+        get_disk_cache(client.hetzner_dns_token).invalidate_zone, zone_id)
+
+    return response_dict
@@ -0,0 +1,48 @@
+from .. import hetzner_dns_helpers as helpers
+from .client import get_client
+
+
+async def zone_get(hetzner_dns_token=None,
+                   zone_id=None,
+                   name=None,
+                   zone_name=None,
+                   id_only=False,
+                   client=None):
+    """
+    Get info about an existing zone.
+    https://dns.hetzner.com/api-docs/#operation/GetZone
+
+    Required Parameters: One of: `zone_id` or `name/zone_name`
+      - `name` and `zone_name` are interchangeable in all zone functions
+    Optional Parameters: `id_only`, `client`
+
+
+    The asyncio equivalent of `hetzner_dns_tools.zone_get.zone_get`.
+
+    - If 'client' is not passed, the shared `AsyncHetznerDNSClient` for
+      the token and the running event loop is used.
+    """
+    client = get_client(hetzner_dns_token, client)
+
+    if zone_name is None:
+        # allow zone_name and name to be used interchangeably
+        zone_name = name
+
+    if zone_id is None and zone_name:
+        # a cached zone is good enough if only the zone ID is needed
+        zone = await client.get_zone(zone_name, refresh=not id_only)
+        if zone is None:
+            helpers.exit_with_error("zone not found")
+        response_dict = {'zone': zone}
+    elif zone_id:
+        _, response_dict = await client.request('GET', f'/zones/{zone_id}')
+
+        # check response for errors
+        helpers.check_response_for_errors(response_dict)
+    else:
+        helpers.exit_with_error("Must specify one of: zone_id, zone_name")
+
+    if id_only:
+        return response_dict['zone']['id']
+
+    return response_dict
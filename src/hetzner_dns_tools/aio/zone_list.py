@@ -0,0 +1,29 @@
+from .. import hetzner_dns_helpers as helpers
+from ..hetzner_dns_client import ZONES_MAX_PER_PAGE
+from .client import get_client
+
+
+async def zone_list(hetzner_dns_token=None,
+                    per_page=ZONES_MAX_PER_PAGE,
+                    client=None):
+    """
+    Get list of all zones.
+    https://dns.hetzner.com/api-docs/#operation/GetZones
+
+    Optional Parameters: `per_page`, `client`
+
+
+    The asyncio equivalent of `hetzner_dns_tools.zone_list.zone_list`.
+
+    - If 'client' is not passed, the shared `AsyncHetznerDNSClient` for
+      the token and the running event loop is used.
+    """
+    client = get_client(hetzner_dns_token, client)
+
+    response_dict = await client.get_all_pages('/zones', 'zones',
+                                               per_page=per_page)
+
+    # check response for errors
+    helpers.check_response_for_errors(response_dict)
+
+    return response_dict
@@ -0,0 +1,409 @@
+#!/usr/bin/python3
+
+import collections.abc
+import contextlib
+import importlib
+import os
+import sys
+
+from . import json_codec
+from . import request_hooks
+from .hetzner_dns_helpers import requests
+
+# the actions that are available for each noun
+COMMANDS = {'zone': ['list', 'create', 'get', 'delete', 'sync', 'drift',
+                     'export', 'import'],
+            'record': ['list', 'create', 'get', 'delete', 'update',
+                       'create-bulk', 'update-bulk']}
+
+# the actions that can stream their results with '--output ndjson'
+STREAMING_COMMANDS = [('zone', 'list'), ('record', 'list'), ('record', 'get')]
+
+# the actions that can return a response unchanged, as the raw bytes that
+# were received, which are printed as-is instead of being parsed and
+# serialized again
+RAW_OUTPUT_COMMANDS = [('record', 'get')]
+
+# the actions that can print their planned requests with '--explain'
+EXPLAIN_COMMANDS = [('record', 'list'), ('record', 'get'),
+                    ('record', 'delete'), ('record', 'update')]
+
+# the actions whose results can report failures of individual items (e.g.
+# records), which make the command exit with an error
+PARTIAL_FAILURE_COMMANDS = [('record', 'create-bulk'),
+                            ('record', 'update-bulk'),
+                            ('record', 'delete'),
+                            ('zone', 'sync'),
+                            ('zone', 'drift')]
+
+# flags that are switched on by being passed, and never take a value (e.g.
+# '--dry-run'), so that the next argument isn't mistaken for their value
+BOOLEAN_FLAGS = {'allow-multiple-records', 'continue-on-error', 'debug',
+                 'delete-multiple-records', 'dry-run', 'explain',
+                 'first-record-only', 'full', 'id-only', 'keep-fingerprints',
+                 'raw', 'retry', 'search-all-zones', 'stop-on-error',
+                 'validate'}
+
+# the formats that results can be printed in
+OUTPUT_FORMATS = ['json', 'ndjson']
+
+# environment variables that are set by default for some actions
+DEFAULT_ENVIRONMENT = {('zone', 'export'): {'OUTPUT_FILE': '-'}}
+
+USAGE = """hetzner-dns-tools
+Usage:  hetzner-dns-tools [zone|record] [action] [ -h | --help ]
+        hetzner-dns-tools batch [file] [--stop-on-error]
+
+Actions: list create get delete update create-bulk update-bulk sync drift
+         export import
+
+Examples:
+  - hetzner-dns-tools zone list
+  - hetzner-dns-tools record list
+
+Setting parameters for requests:
+  - Using command line flags
+    - hetzner-dns-tools zone create --name your-domain.com
+    - hetzner-dns-tools record get --zone-id your-zone-id --first-record-only
+  - Using environment variables:
+    - NAME=your-domain.com hetzner-dns-tools zone create
+    - ZONE_ID=your-zone-id FIRST_RECORD_ONLY=1 hetzner-dns-tools zone get
+
+Creating or updating many records at once (JSON, NDJSON or CSV):
+  - hetzner-dns-tools record create-bulk < records.csv
+  - hetzner-dns-tools record update-bulk < changes.csv
+
+Making a zone's records match a file (JSON, NDJSON or YAML):
+  - hetzner-dns-tools zone sync --zone-name your-domain.com --dry-run \\
+      < zone.yaml
+
+Exporting and importing BIND zone files:
+  - hetzner-dns-tools zone export --zone-name your-domain.com > zone.txt
+  - hetzner-dns-tools zone import --zone-name your-domain.com --validate \\
+      < zone.txt
+
+Finding zones that changed since the last check:
+  - hetzner-dns-tools zone drift
+
+Printing one zone or record per line (NDJSON), as soon as each is fetched:
+  - hetzner-dns-tools record list --zone-name your-domain.com --output ndjson
+  - hetzner-dns-tools record get --zone-name your-domain.com --type A \\
+      --allow-multiple-records --output ndjson
+
+Showing the requests that a record lookup would make, without making them:
+  - hetzner-dns-tools record delete --zone-name your-domain.com --name www \\
+      --type A --explain
+
+Type '-h' or '--help' after any action to view the help file for that action.
+  - e.g. hetzner-dns-tools zone get --help
+
+Running many operations in a single process:
+  - hetzner-dns-tools batch operations.ndjson
+  - cat operations.ndjson | hetzner-dns-tools batch
+
+  Each line of input must be a JSON object containing an 'op' (e.g.
+  'record.create') and the Python parameters for that operation, e.g.
+    {"op": "record.create", "zone_name": "your-domain.com",
+     "record_type": "A", "name": "www", "value": "1.1.1.1"}
+
+  One JSON result is printed per line of input, e.g.
+    {"line": 1, "op": "record.create", "ok": true, "result": {...}}
+
+Typing any invalid hetzner-dns-tools command will display this help file.
+"""
+
+
+def get_command(noun, action):
+    """Return the function that handles a noun/action pair."""
+    # allow e.g. 'create-bulk' and 'create_bulk' to be used interchangeably
+    action = (action or '').replace('_', '-')
+    if action not in COMMANDS.get(noun, []):
+        raise ValueError(f"Invalid operation: '{noun}.{action}'")
+
+    function_name = f"{noun}_{action}".replace('-', '_')
+    module = importlib.import_module(f".{function_name}", __package__)
+    return getattr(module, function_name)
+
+
+def parse_flags(args):
+    """
+    Convert command line flags to environment variable names and values.
+
+    - e.g. '--zone-id your-zone-id' -> {'ZONE_ID': 'your-zone-id'}
+    - Flags without a value (and BOOLEAN_FLAGS, unless given a value with
+      '=') are given a truthy value of '1'.
+      - e.g. '--first-record-only' -> {'FIRST_RECORD_ONLY': '1'}
+    - '-h' or '--help', anywhere in the arguments, sets SHOW_HELP.
+    """
+    flags = {}
+    positional_args = []
+
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg in ('-h', '--help'):
+            flags['SHOW_HELP'] = '1'
+        elif arg.startswith('--'):
+            key, _, value = arg[2:].partition('=')
+            if not value:
+                if key not in BOOLEAN_FLAGS and i + 1 < len(args)\
+                        and not args[i + 1].startswith('--'):
+                    # use the next argument as the value
+                    value = args[i + 1]
+                    i += 1
+                else:
+                    value = '1'
+            flags[key.replace('-', '_').upper()] = value
+        else:
+            positional_args.append(arg)
+        i += 1
+
+    return flags, positional_args
+
+
+def add_debug_hook():
+    """Print every request to stderr if DEBUG is set (e.g. '--debug')."""
+    # don't print requests twice if this is called more than once
+    request_hooks.remove_hook('after_request', request_hooks.print_request)
+    if os.environ.get('DEBUG', '0') not in ('', '0'):
+        request_hooks.add_hook('after_request', request_hooks.print_request)
+
+
+def print_result(result):
+    """Print a result the same way that the individual modules do."""
+    if isinstance(result, bytes):
+        # a raw response, which is already JSON
+        json_codec.write_bytes(result)
+    elif isinstance(result, (dict, list)):
+        json_codec.print_json(result)
+    elif result is not None:
+        print(result)
+
+
+def print_ndjson(result):
+    """
+    Print a result as NDJSON, with one zone or record per line.
+
+    - Iterators (e.g. from zone_list(stream=True)) are printed as each
+      item is yielded, so output starts before every page is fetched.
+    """
+    if isinstance(result, dict):
+        for key in ('zones', 'records'):
+            if isinstance(result.get(key), list):
+                result = result[key]
+                break
+        else:
+            result = [result.get('zone') or result.get('record') or result]
+    elif result is None or isinstance(result, str):
+        print_result(result)
+        return
+
+    for item in result:
+        json_codec.print_json(item, flush=True)
+
+
+def get_exit_code(noun, action, result):
+    """
+    Return the exit code of a command's result: 1 if any of its items
+    failed (or if any zones have drifted), otherwise 0.
+
+    - e.g. {'created': 2, 'failed': 1, ...} -> 1
+    - e.g. {'your-record-id': 'failed (404)'} -> 1 (from record_delete)
+    """
+    if (noun, action) not in PARTIAL_FAILURE_COMMANDS\
+            or not isinstance(result, dict):
+        return 0
+
+    if result.get('failed') or result.get('drifted'):
+        return 1
+    if any(isinstance(value, str) and value.startswith('failed')
+           for value in result.values()):
+        return 1
+    return 0
+
+
+@contextlib.contextmanager
+def scoped_environment():
+    """
+    Restore the environment variables when a `with` block exits, so that
+    the flags of one command don't apply to the next one (e.g. when main()
+    is called more than once in the same process).
+    """
+    saved_environment = dict(os.environ)
+    try:
+        yield
+    finally:
+        for key in set(os.environ) - set(saved_environment):
+            del os.environ[key]
+        for key, value in saved_environment.items():
+            if os.environ.get(key) != value:
+                os.environ[key] = value
+
+
+def run_command(noun, action, args):
+    """Run a command, with its flags set as environment variables."""
+    with scoped_environment():
+        return _run_command(noun, action, args)
+
+
+def _run_command(noun, action, args):
+    flags, positional_args = parse_flags(args)
+    if positional_args and not flags.get('SHOW_HELP'):
+        print(f"Invalid argument: '{positional_args[0]}'")
+        print("")
+        print("To view the help files for this function, run: "
+              f"'hetzner-dns-tools {noun} {action} --help'")
+        print("")
+        print("To view generic instructions for hetzner-dns-tools, run: "
+              "'hetzner-dns-tools --help'")
+        return 1
+
+    # flags take precedence over existing environment variables
+    os.environ.update(flags)
+    for key, value in DEFAULT_ENVIRONMENT.get((noun, action), {}).items():
+        os.environ.setdefault(key, value)
+
+    if os.environ.get('SHOW_HELP'):
+        # print the docstring here, without running the command
+        print(get_command(noun, action).__doc__)
+        return 0
+
+    output = os.environ.get('OUTPUT') or 'json'
+    if output not in OUTPUT_FORMATS:
+        print(f"Invalid output format: '{output}' "
+              f"(must be one of: {', '.join(OUTPUT_FORMATS)})")
+        return 1
+
+    if os.environ.get('EXPLAIN') and (noun, action) not in EXPLAIN_COMMANDS:
+        # don't run a command that would ignore '--explain'
+        print(f"'--explain' is not supported by: '{noun} {action}'")
+        return 1
+
+    add_debug_hook()
+
+    try:
+        command = get_command(noun, action)
+
+        # label the command's requests, e.g. for '--debug'
+        with request_hooks.operation(f'{noun}.{action}'):
+            if output == 'ndjson':
+                # streamed results are fetched while they are being printed
+                if (noun, action) in STREAMING_COMMANDS:
+                    result = command(stream=True)
+                else:
+                    result = command()
+                print_ndjson(result)
+            elif (noun, action) in RAW_OUTPUT_COMMANDS:
+                result = command(raw=True)
+                print_result(result)
+            else:
+                result = command()
+                print_result(result)
+    except ValueError as err:
+        # checked first, so that a validation error doesn't import requests
+        print(f"Error: {err}")
+        return 1  # exit with error
+    except requests.exceptions.RequestException as err:
+        print(f"Error: {err}")
+        return 1  # exit with error
+
+    return get_exit_code(noun, action, result)
+
+
+def run_operation(operation):
+    """
+    Run a single batch operation and return its result.
+
+    - e.g. {'op': 'zone.get', 'zone_name': 'your-domain.com'}
+    """
+    if not isinstance(operation, dict) or not operation.get('op'):
+        raise ValueError("Each operation must be an object with an 'op' key")
+
+    params = dict(operation)
+    noun, _, action = params.pop('op').partition('.')
+    command = get_command(noun, action)
+
+    with request_hooks.operation(f'{noun}.{action}'):
+        result = command(**params)
+
+        # streamed results are fetched while they are being read, so any
+        # errors must be raised here
+        if isinstance(result, collections.abc.Iterator):
+            result = list(result)
+
+        return result
+
+
+def run_batch(args):
+    """
+    Run many operations in a single process.
+
+    All operations share the same connection pool, so only the first
+    request for each token needs to open a new connection.
+    """
+    flags, positional_args = parse_flags(args)
+    if flags.get('SHOW_HELP'):
+        print(USAGE)
+        return 0
+
+    stop_on_error = flags.get('STOP_ON_ERROR') \
+        or os.environ.get('STOP_ON_ERROR')
+
+    if positional_args and positional_args[0] != '-':
+        try:
+            input_file = open(positional_args[0])
+        except OSError as err:
+            print(f"Error: {err}")
+            return 1  # exit with error
+    else:
+        input_file = sys.stdin
+
+    add_debug_hook()
+
+    exit_code = 0
+    with input_file:
+        for line_number, line in enumerate(input_file, start=1):
+            if not line.strip():
+                continue
+
+            output = {'line': line_number}
+            try:
+                operation = json_codec.loads(line)
+                output['op'] = operation.get('op') \
+                    if isinstance(operation, dict) else None
+                output['result'] = run_operation(operation)
+                output['ok'] = True
+            except (ValueError, TypeError, KeyError, OSError,
+                    requests.exceptions.RequestException) as err:
+                output['ok'] = False
+                output['error'] = str(err)
+                exit_code = 1
+
+            json_codec.print_json(output, flush=True)
+
+            if not output['ok'] and stop_on_error:
+                break
+
+    return exit_code
+
+
+def main(argv=None):
+    """The entry point for the 'hetzner-dns-tools' command."""
+    if argv is None:
+        argv = sys.argv[1:]
+
+    noun = argv[0] if argv else None
+
+    if noun == 'batch':
+        return run_batch(argv[1:])
+
+    action = argv[1].replace('_', '-') if len(argv) > 1 else None
+    if action not in COMMANDS.get(noun, []):
+        print(USAGE)
+        return 0
+
+    return run_command(noun, action, argv[2:])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
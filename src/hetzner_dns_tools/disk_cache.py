@@ -0,0 +1,198 @@
+import contextlib
+import hashlib
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+from . import json_codec
+
+# the number of seconds that a cached listing is considered valid
+DEFAULT_CACHE_TTL = 300
+
+
+def get_cache_home():
+    """Return the base directory used for cached data."""
+    if os.environ.get('HETZNER_DNS_CACHE_DIR'):
+        return os.environ['HETZNER_DNS_CACHE_DIR']
+
+    xdg_cache_home = os.environ.get('XDG_CACHE_HOME')\
+        or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(xdg_cache_home, 'hetzner-dns-tools')
+
+
+class DiskCache:
+    """
+    An on-disk cache of zone and record listings, which persists between
+    processes (e.g. separate 'hetzner-dns-tools' commands).
+
+    Listings are stored as JSON files in a directory that is keyed by a
+    hash of the token, so that the token itself is never written to disk:
+      - $XDG_CACHE_HOME/hetzner-dns-tools/<token-hash>/zones.json
+      - $XDG_CACHE_HOME/hetzner-dns-tools/<token-hash>/zone-<zone-name>.json
+      - $XDG_CACHE_HOME/hetzner-dns-tools/<token-hash>/records-<zone-id>.json
+
+    - Files are written to a temporary file first and then renamed, so a
+      reader never sees a partially-written file.
+    - Fetching and storing a listing is done while holding a lock on the
+      listing, so parallel processes wait for each other instead of all
+      fetching the same data, and an invalidation can't be overwritten by
+      a fetch that started before it.
+
+    * The cache is only read and written when it is enabled, by passing a
+      truthy 'enabled' value or by setting the HETZNER_DNS_CACHE
+      environment variable. Invalidation always happens, so that other
+      processes that do use the cache never see stale data.
+
+    - The TTL can be set with 'ttl' or the HETZNER_DNS_CACHE_TTL
+      environment variable (default: 300 seconds).
+    - The cache directory can be set with the HETZNER_DNS_CACHE_DIR
+      environment variable.
+    """
+
+    def __init__(self, hetzner_dns_token, enabled=None, ttl=None):
+        if enabled is None:
+            # get enabled from environment variable
+            enabled = os.environ.get('HETZNER_DNS_CACHE', '') not in ('', '0')
+
+        if ttl is None:
+            # get ttl from environment variable
+            ttl = float(os.environ.get('HETZNER_DNS_CACHE_TTL',
+                                       DEFAULT_CACHE_TTL))
+
+        self.enabled = bool(enabled)
+        self.ttl = ttl
+
+        token_hash = hashlib.sha256(hetzner_dns_token.encode('utf-8'))
+        self.path = os.path.join(get_cache_home(),
+                                 token_hash.hexdigest()[:32])
+
+    def _get_file_path(self, key):
+        return os.path.join(self.path, f"{key}.json")
+
+    @contextlib.contextmanager
+    def _lock(self, key):
+        """Hold an exclusive lock on a key, across processes."""
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+
+        with open(os.path.join(self.path, f"{key}.lock"), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, key):
+        """Return the cached value for a key, or None if it has expired."""
+        file_path = self._get_file_path(key)
+        try:
+            if time.time() - os.path.getmtime(file_path) >= self.ttl:
+                return None
+            with open(file_path, 'rb') as cache_file:
+                return json_codec.loads(cache_file.read())
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, value):
+        """Atomically store a value for a key."""
+        import tempfile  # only needed when the cache is written to
+
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.path,
+                                                      suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as f:
+                f.write(json_codec.dumps_bytes(value))
+            os.replace(temp_path, self._get_file_path(key))
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+            raise
+
+    def get_or_fetch(self, key, fetch, refresh=False):
+        """
+        Return the cached value for a key, or call 'fetch' to get it.
+
+        - Responses that contain an error are returned but not cached.
+        - If 'refresh' is truthy, the cached value is ignored and replaced.
+        """
+        if not self.enabled:
+            return fetch()
+
+        with self._lock(key):
+            value = None if refresh else self.get(key)
+            if value is None:
+                value = fetch()
+                if not value.get('error') and not value.get('message'):
+                    self.set(key, value)
+
+        return value
+
+    def invalidate(self, key):
+        """Remove the cached value for a key."""
+        if not os.path.isdir(self.path):
+            return
+
+        with self._lock(key):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._get_file_path(key))
+
+    def invalidate_zone(self, zone_id):
+        """Remove the cached record listing for a zone."""
+        self.invalidate(f"records-{zone_id}")
+
+    def invalidate_zone_names(self, zone_name=None, zone_id=None):
+        """
+        Remove the cached results of zone lookups by name, for a zone name
+        or for any lookup that found a zone with a given ID.
+        """
+        if zone_name:
+            self.invalidate(f"zone-{zone_name}")
+
+        if zone_id is None or not os.path.isdir(self.path):
+            return
+
+        for file_name in os.listdir(self.path):
+            if not file_name.startswith('zone-')\
+                    or not file_name.endswith('.json'):
+                continue
+
+            key = file_name[:-len('.json')]
+            zones = (self.get(key) or {}).get('zones', [])
+            if any(zone['id'] == zone_id for zone in zones):
+                self.invalidate(key)
+
+    def invalidate_records(self, record_ids):
+        """
+        Remove the cached record listing for any zone that contains one of
+        the given records, for when the records' zone_id is not known.
+        """
+        if not os.path.isdir(self.path):
+            return
+
+        record_ids = set(record_ids)
+
+        for file_name in os.listdir(self.path):
+            if not file_name.startswith('records-')\
+                    or not file_name.endswith('.json'):
+                continue
+
+            key = file_name[:-len('.json')]
+            records = (self.get(key) or {}).get('records', [])
+            if any(record['id'] in record_ids for record in records):
+                self.invalidate(key)
+
+
+def get_disk_cache(hetzner_dns_token=None, enabled=None):
+    """Get the on-disk cache for a token."""
+    if hetzner_dns_token is None:
+        # get token from environment variable
+        hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+    return DiskCache(hetzner_dns_token, enabled=enabled)
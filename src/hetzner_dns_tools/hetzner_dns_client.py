@@ -0,0 +1,496 @@
+import collections
+import itertools
+import os
+import random
+import threading
+import time
+
+from . import hetzner_dns_helpers as helpers
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from . import request_hooks
+from .rate_limit import get_rate_limiter, get_retry_after
+
+API_BASE_URL = 'https://dns.hetzner.com/api/v1'
+
+# the largest page size allowed by the API when listing zones
+ZONES_MAX_PER_PAGE = 100
+
+# the number of times a request is retried after a 429 (Too Many Requests)
+DEFAULT_MAX_RATE_LIMIT_RETRIES = 5
+
+# the number of seconds to wait for a connection, and for a response
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+
+# the number of times a request is retried after a transient failure, and
+# the base and maximum number of seconds to wait between retries
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+MAX_RETRY_BACKOFF = 30
+
+# requests with these methods can safely be sent more than once
+IDEMPOTENT_METHODS = ('GET', 'PUT', 'DELETE')
+
+# responses with these status codes are (usually) transient failures
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+
+def get_backoff_delay(retries, retry_backoff=DEFAULT_RETRY_BACKOFF):
+    """
+    Return the number of seconds to wait before the next retry, using
+    exponential backoff with full jitter.
+    """
+    return random.uniform(
+        0, min(MAX_RETRY_BACKOFF, retry_backoff * 2 ** retries))
+
+
+class InFlightRequest:
+    """
+    The result of a request that other threads can wait for, so that
+    identical requests sent at the same time share a single response.
+    """
+
+    def __init__(self):
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+
+    def set_result(self, result):
+        self.result = result
+        self._done.set()
+
+    def set_error(self, error):
+        self.error = error
+        self._done.set()
+
+    def wait(self):
+        """Wait for the request to finish, and return its result."""
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class HetznerDNSClient:
+    """
+    A reusable client for Hetzner's DNS API.
+
+    The client owns the API token, the base URL and a keep-alive
+    connection pool, so that consecutive requests reuse the same
+    TCP/TLS connection instead of opening a new one every time.
+
+    All of the zone_* and record_* functions route their requests through
+    a shared client (see `get_client`), but a client can also be used
+    directly:
+
+        client = HetznerDNSClient(hetzner_dns_token='your-token')
+        response = client.get('/zones')
+
+    * hetzner_dns_token *MUST* be passed in args or as environment
+      variable (HETZNER_DNS_TOKEN).
+
+    - The base URL can be overridden with 'base_url' or the
+      HETZNER_DNS_API_URL environment variable.
+
+    - Requests are paced according to the rate limit headers returned by
+      the API (see `RateLimiter`), and throttled requests (429) are
+      retried after waiting for the 'Retry-After' time, up to
+      'max_rate_limit_retries' times (default: 5, or the
+      HETZNER_DNS_RATE_LIMIT_RETRIES environment variable).
+
+    - 'connect_timeout' and 'read_timeout' are the number of seconds to
+      wait for a connection and for a response (default: 5 and 30, or the
+      HETZNER_DNS_CONNECT_TIMEOUT and HETZNER_DNS_READ_TIMEOUT environment
+      variables).
+    - Idempotent requests (GET, PUT, DELETE) that fail because of a
+      connection error, a timeout or a 5xx response are retried up to
+      'max_retries' times (default: 3, or the HETZNER_DNS_MAX_RETRIES
+      environment variable), with exponential backoff and jitter starting
+      at 'retry_backoff' seconds (default: 0.5, or the
+      HETZNER_DNS_RETRY_BACKOFF environment variable). POST requests are
+      only retried if 'retry=True' is passed to `request` or `post`.
+
+    - Identical GET requests made with `get_json` at the same time (e.g.
+      by several threads looking up the same zone) are only sent once,
+      and every caller gets the same response (see `get_status_and_json`).
+    """
+
+    def __init__(self,
+                 hetzner_dns_token=None,
+                 base_url=None,
+                 pool_maxsize=10,
+                 max_workers=4,
+                 max_rate_limit_retries=None,
+                 connect_timeout=None,
+                 read_timeout=None,
+                 max_retries=None,
+                 retry_backoff=None):
+        if hetzner_dns_token is None:
+            # get token from environment variable
+            hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+        if base_url is None:
+            # get base URL from environment variable
+            base_url = os.environ.get('HETZNER_DNS_API_URL', API_BASE_URL)
+
+        if max_rate_limit_retries is None:
+            # get max_rate_limit_retries from environment variable
+            max_rate_limit_retries = int(os.environ.get(
+                'HETZNER_DNS_RATE_LIMIT_RETRIES',
+                DEFAULT_MAX_RATE_LIMIT_RETRIES))
+
+        if connect_timeout is None:
+            # get connect_timeout from environment variable
+            connect_timeout = float(os.environ.get(
+                'HETZNER_DNS_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT))
+
+        if read_timeout is None:
+            # get read_timeout from environment variable
+            read_timeout = float(os.environ.get(
+                'HETZNER_DNS_READ_TIMEOUT', DEFAULT_READ_TIMEOUT))
+
+        if max_retries is None:
+            # get max_retries from environment variable
+            max_retries = int(os.environ.get(
+                'HETZNER_DNS_MAX_RETRIES', DEFAULT_MAX_RETRIES))
+
+        if retry_backoff is None:
+            # get retry_backoff from environment variable
+            retry_backoff = float(os.environ.get(
+                'HETZNER_DNS_RETRY_BACKOFF', DEFAULT_RETRY_BACKOFF))
+
+        self.hetzner_dns_token = hetzner_dns_token
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        # the number of pages that may be fetched at the same time
+        self.max_workers = max_workers
+
+        # rate limits apply to the token, so the limiter is shared
+        self.rate_limiter = get_rate_limiter(hetzner_dns_token)
+        self.max_rate_limit_retries = max_rate_limit_retries
+
+        # identical GET requests that are in flight, by path and params
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+        # keep connections alive between requests
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1,
+                                               pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Auth-API-Token': hetzner_dns_token})
+
+    def request(self,
+                method,
+                path,
+                params=None,
+                data=None,
+                headers=None,
+                retry=None,
+                stream=False):
+        """
+        Send a request to the API and return the `requests.Response`.
+
+        - 'path' is relative to the base URL, e.g. '/zones'.
+        - If 'data' is not a string or a file object, it will be encoded as
+          JSON. File objects are streamed instead of being read into
+          memory.
+        - If 'stream' is truthy, the response body is not downloaded until
+          it is read (e.g. with `response.iter_content`).
+        - If the rate limit has been reached, this waits until the request
+          can be sent. If the request is throttled anyway, it is retried
+          after the 'Retry-After' time, and the last response is returned
+          if it is still throttled after every retry.
+        - If 'retry' is truthy, the request is retried after transient
+          failures (see above). By default, only idempotent requests are
+          retried. The last exception is raised (or the last response is
+          returned) if it still fails after every retry.
+        """
+        if data is not None and not isinstance(data, (str, bytes))\
+                and not hasattr(data, 'read'):
+            data = json_codec.dumps_bytes(data)
+            headers = dict(headers or {})
+            headers.setdefault('Content-Type', 'application/json')
+
+        if retry is None:
+            retry = method.upper() in IDEMPOTENT_METHODS
+        max_retries = self.max_retries if retry else 0
+        max_rate_limit_retries = self.max_rate_limit_retries
+
+        # file objects must be rewound before they can be sent again
+        data_position = None
+        if hasattr(data, 'read'):
+            if hasattr(data, 'seekable') and data.seekable():
+                data_position = data.tell()
+            else:
+                max_retries = max_rate_limit_retries = 0
+
+        retries = 0
+        throttled_retries = 0
+        while True:
+            # wait for our turn to send a request
+            delay = self.rate_limiter.reserve()
+            if delay > 0:
+                time.sleep(delay)
+
+            if data_position is not None:
+                data.seek(data_position)
+
+            # only describe the request if anything will use the description
+            request_info = None
+            if request_hooks.has_hooks():
+                request_info = request_hooks.start_request(
+                    method, path, self.base_url + path,
+                    retries + throttled_retries, data)
+                request_hooks.emit('before_request', request_info)
+
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method,
+                                                self.base_url + path,
+                                                params=params,
+                                                data=data,
+                                                headers=headers,
+                                                timeout=self.timeout,
+                                                stream=stream)
+            except requests.exceptions.RequestException as err:
+                if request_info is not None:
+                    request_hooks.emit('after_request',
+                                       request_hooks.finish_request(
+                                           request_info,
+                                           time.perf_counter() - start,
+                                           error=err))
+                if not isinstance(err, (requests.exceptions.ConnectionError,
+                                        requests.exceptions.Timeout))\
+                        or retries >= max_retries:
+                    raise
+                time.sleep(get_backoff_delay(retries, self.retry_backoff))
+                retries += 1
+                continue
+
+            if request_info is not None:
+                if stream:
+                    content_length = response.headers.get('Content-Length')
+                    bytes_received = int(content_length)\
+                        if content_length else None
+                else:
+                    bytes_received = len(response.content)
+                request_hooks.emit('after_request',
+                                   request_hooks.finish_request(
+                                       request_info,
+                                       time.perf_counter() - start,
+                                       status=response.status_code,
+                                       headers=response.headers,
+                                       bytes_received=bytes_received))
+
+            self.rate_limiter.update(response.headers)
+
+            if response.status_code == 429\
+                    and throttled_retries < max_rate_limit_retries:
+                # throttled requests are not processed, so they can be retried
+                response.close()
+                self.rate_limiter.backoff(get_retry_after(response.headers))
+                throttled_retries += 1
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES\
+                    and retries < max_retries:
+                response.close()
+                time.sleep(get_backoff_delay(retries, self.retry_backoff))
+                retries += 1
+                continue
+
+            return response
+
+    def get(self, path, params=None, stream=False):
+        return self.request('GET', path, params=params, stream=stream)
+
+    def post(self, path, data=None, retry=False):
+        return self.request('POST', path, data=data, retry=retry)
+
+    def put(self, path, data=None):
+        return self.request('PUT', path, data=data)
+
+    def delete(self, path):
+        return self.request('DELETE', path)
+
+    def get_json(self, path, params=None):
+        """
+        Send a GET request and return the decoded JSON response.
+
+        - Identical requests that are sent at the same time (see
+          `get_status_and_json`) share a single response, which must not
+          be modified.
+        """
+        _, response_dict = self.get_status_and_json(path, params=params)
+        return response_dict
+
+    def get_status_and_json(self, path, params=None):
+        """
+        Send a GET request, and return the response's status code and
+        decoded JSON body.
+
+        If an identical request (with the same path and params) is already
+        in flight, e.g. in another thread, no request is sent. Instead,
+        this waits for that request, and returns the same status code and
+        response dictionary (or raises the same exception). Since every
+        caller gets the same dictionary, it must not be modified.
+        """
+        key = (path, tuple(sorted((params or {}).items())))
+        with self._in_flight_lock:
+            in_flight_request = self._in_flight.get(key)
+            is_leader = in_flight_request is None
+            if is_leader:
+                in_flight_request = InFlightRequest()
+                self._in_flight[key] = in_flight_request
+
+        if not is_leader:
+            return in_flight_request.wait()
+
+        try:
+            response = self.get(path, params=params)
+            in_flight_request.set_result(
+                (response.status_code,
+                 json_codec.loads(response.content or b'{}')))
+        except BaseException as err:
+            in_flight_request.set_error(err)
+            raise
+        finally:
+            # later requests are sent again, so they see any changes
+            with self._in_flight_lock:
+                del self._in_flight[key]
+
+        return in_flight_request.result
+
+    def iter_pages(self, path, key, params=None, per_page=None):
+        """
+        Yield each page of a paginated listing, in order, as a response
+        dictionary.
+
+        - 'key' is the name of the list in each page, e.g. 'zones'.
+        - The first page is used to find the last page, then the
+          remaining pages are fetched concurrently (up to 'max_workers'
+          at a time, ahead of the page being yielded), so that only a few
+          pages are held in memory at once.
+        - If the first response contains an error, it is yielded as-is so
+          that it can be checked by the caller. Errors in later pages are
+          raised as a ValueError.
+        """
+        params = dict(params or {})
+        if per_page:
+            params['per_page'] = per_page
+
+        response_dict = self.get_json(path, params=dict(params, page=1))
+        yield response_dict
+        if key not in response_dict:
+            return
+
+        pagination = response_dict.get('meta', {}).get('pagination') or {}
+        last_page = int(pagination.get('last_page') or 1)
+        if last_page <= 1:
+            return
+
+        # pages are fetched by other threads, as part of the same operation
+        @request_hooks.in_current_context
+        def get_page(page):
+            page_dict = self.get_json(path, params=dict(params, page=page))
+            helpers.check_response_for_errors(page_dict)
+            return page_dict
+
+        # threads are only needed if there is more than one page
+        from concurrent.futures import ThreadPoolExecutor
+
+        pages = iter(range(2, last_page + 1))
+        max_workers = min(self.max_workers, last_page - 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = collections.deque(
+                executor.submit(get_page, page)
+                for page in itertools.islice(pages, max_workers))
+            try:
+                while futures:
+                    page_dict = futures.popleft().result()
+
+                    # keep 'max_workers' pages in flight
+                    next_page = next(pages, None)
+                    if next_page is not None:
+                        futures.append(executor.submit(get_page, next_page))
+
+                    yield page_dict
+            finally:
+                # don't fetch any more pages if the caller stops early
+                for future in futures:
+                    future.cancel()
+
+    def iter_items(self, path, key, params=None, per_page=None):
+        """
+        Yield each item of a paginated listing, in order, as soon as the
+        page that contains it has been fetched.
+
+        - Errors are raised as a ValueError.
+        """
+        for page_dict in self.iter_pages(path, key, params, per_page):
+            helpers.check_response_for_errors(page_dict)
+            yield from page_dict[key]
+
+    def get_all_pages(self, path, key, params=None, per_page=None):
+        """
+        Get every page of a paginated listing, and merge them into a
+        single response dictionary.
+
+        - 'key' is the name of the list in each page, e.g. 'zones'.
+        - The pages are fetched with `iter_pages`, and merged in order.
+        - If the first response contains an error, it is returned as-is
+          so that it can be checked by the caller.
+        """
+        pages = self.iter_pages(path, key, params, per_page)
+        response_dict = next(pages)
+        if key not in response_dict:
+            return response_dict
+
+        items = list(response_dict[key])
+        for page_dict in pages:
+            items.extend(page_dict[key])
+
+        # describe the merged result as a single page (in a copy, since the
+        # first page may be shared with other callers)
+        meta = dict(response_dict.get('meta') or {})
+        meta['pagination'] = {
+            'page': 1,
+            'per_page': len(items),
+            'last_page': 1,
+            'total_entries': len(items)}
+
+        return dict(response_dict, **{key: items, 'meta': meta})
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(hetzner_dns_token=None):
+    """
+    Get the shared client for a token, creating it if necessary.
+
+    Each token gets a single client, so every function called with the
+    same token in the same process shares one connection pool.
+    """
+    if hetzner_dns_token is None:
+        # get token from environment variable
+        hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+    with _clients_lock:
+        client = _clients.get(hetzner_dns_token)
+        if client is None:
+            client = HetznerDNSClient(hetzner_dns_token=hetzner_dns_token)
+            _clients[hetzner_dns_token] = client
+
+    return client
@@ -1,7 +1,30 @@
-import requests
+import importlib
 import sys
 
 
+class LazyModule:
+    """
+    A module that is only imported when one of its attributes is first used.
+
+    Importing `requests` takes longer than the rest of hetzner-dns-tools
+    combined, so it is only imported when a request is sent (or a request
+    exception is handled). Showing help and validating parameters don't
+    need it.
+        - e.g. requests = LazyModule('requests')
+    """
+
+    def __init__(self, name):
+        self.__name = name
+
+    def __getattr__(self, attr):
+        # import_module() is thread-safe, and returns the module from
+        # sys.modules after the first import
+        return getattr(importlib.import_module(self.__name), attr)
+
+
+requests = LazyModule('requests')
+
+
 def check_response_for_errors(response_dict):
     """
     Check a response dictionary for errors.
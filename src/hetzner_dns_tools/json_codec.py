@@ -0,0 +1,94 @@
+import functools
+import json
+import os
+import sys
+
+# the JSON backends that can be used
+JSON_BACKENDS = ('orjson', 'json')
+
+
+@functools.lru_cache(maxsize=None)
+def get_orjson():
+    """
+    Return the orjson module, or None if it isn't installed.
+
+    orjson is only imported when JSON is first parsed or serialized, since
+    importing it takes longer than showing help or validating parameters.
+    """
+    try:
+        import orjson
+    except ImportError:  # orjson is an optional dependency
+        return None
+    return orjson
+
+
+def get_backend():
+    """
+    Return the name of the JSON backend that is used.
+
+    orjson is used if it is installed, unless the HETZNER_DNS_JSON_BACKEND
+    environment variable is set to 'json' (the standard library).
+    """
+    backend = os.environ.get('HETZNER_DNS_JSON_BACKEND') \
+        or ('orjson' if get_orjson() is not None else 'json')
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"Invalid JSON backend: '{backend}' "
+                         f"(must be one of: {', '.join(JSON_BACKENDS)})")
+    if backend == 'orjson' and get_orjson() is None:
+        raise ValueError("The 'orjson' JSON backend requires orjson. "
+                         "Install it with: "
+                         "pip install hetzner-dns-tools[fast]")
+    return backend
+
+
+def loads(data):
+    """
+    Parse JSON from bytes (e.g. `response.content`) or a string.
+
+    Bytes are parsed directly, without being decoded into a string first.
+    """
+    if get_backend() == 'orjson':
+        return get_orjson().loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(value):
+    """Serialize a value to JSON, as UTF-8 bytes."""
+    if get_backend() == 'orjson':
+        return get_orjson().dumps(value)
+    return json.dumps(value).encode('utf-8')
+
+
+def dumps(value):
+    """Serialize a value to a JSON string."""
+    if get_backend() == 'orjson':
+        return get_orjson().dumps(value).decode('utf-8')
+    return json.dumps(value)
+
+
+def write_bytes(data, file=None, flush=False):
+    """
+    Write a line of bytes (e.g. a raw API response) to a file, or to
+    stdout, without decoding it first.
+    """
+    if file is None:
+        file = sys.stdout
+
+    buffer = getattr(file, 'buffer', None)
+    if buffer is None:
+        # e.g. io.StringIO, which only accepts strings
+        file.write(data.decode('utf-8') + '\n')
+        if flush:
+            file.flush()
+        return
+
+    # anything already written as text must come first
+    file.flush()
+    buffer.write(data + b'\n')
+    if flush:
+        buffer.flush()
+
+
+def print_json(value, file=None, flush=False):
+    """Serialize a value to JSON and write it as a line to stdout."""
+    write_bytes(dumps_bytes(value), file=file, flush=flush)
@@ -0,0 +1,332 @@
+import fnmatch
+import os
+import re
+
+from .disk_cache import get_disk_cache
+from .zone_resolver import get_zone_resolver
+
+
+class LookupPlan:
+    """
+    The API requests that an operation will make, in the order that they
+    will be made, and the ones that will be skipped because their result
+    is already known.
+
+    Each step is a dictionary containing:
+      - 'request': the request, e.g. 'GET /records'
+      - 'params': its query parameters (or None)
+      - 'reason': why the request is needed
+      - 'source': 'api' if the request will be sent, or where its result
+        will come from instead ('memory cache' or 'disk cache')
+      - 'requests': the number of requests that will be sent (e.g. one for
+        each page of results)
+      - 'exact': False if 'requests' is only the minimum, since it depends
+        on results that aren't known yet
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.steps = []
+
+    def add_step(self, request, reason, params=None, source='api',
+                 requests=1, exact=True):
+        """Add a request to the plan."""
+        if source != 'api':
+            requests = 0
+        self.steps.append({'request': request,
+                           'params': params,
+                           'reason': reason,
+                           'source': source,
+                           'requests': requests,
+                           'exact': exact})
+
+    @property
+    def estimated_requests(self):
+        """The number of requests that will be sent (or the minimum)."""
+        return sum(step['requests'] for step in self.steps)
+
+    @property
+    def exact(self):
+        """Whether 'estimated_requests' is exact, rather than a minimum."""
+        return all(step['exact'] for step in self.steps)
+
+    def to_dict(self):
+        """Return the plan and its estimated cost as a dictionary."""
+        return {'operation': self.operation,
+                'steps': list(self.steps),
+                'estimated_requests': self.estimated_requests,
+                'estimate': 'exact' if self.exact else 'minimum',
+                'requests_saved': sum(step['source'] != 'api'
+                                      for step in self.steps)}
+
+
+def get_page_count(item_count, per_page):
+    """Return the number of pages needed for a number of items."""
+    return max(1, -(-item_count // per_page))
+
+
+def describe_filters(filters):
+    """
+    Return a description of the filters that records are matched by, e.g.
+    {'name': 'www', 'record_type': 'A'} -> " matching name 'www', type 'A'"
+    """
+    descriptions = [f"{key.replace('record_', '')} '{value}'"
+                    for key, value in (filters or {}).items() if value]
+    return f" matching {', '.join(descriptions)}" if descriptions else ""
+
+
+def plan_zone_lookup(plan, hetzner_dns_token, zone_id=None, zone_name=None,
+                     verify=False):
+    """
+    Add the steps needed to find a zone's ID by name, and return the zone's
+    ID and the zone itself (or None if it isn't known yet).
+
+    - If 'zone_id' is given, the zone is only looked up if 'verify' is
+      truthy (i.e. to check that 'zone_id' matches 'zone_name').
+    - Zones that are cached (see `ZoneResolver`) are never requested.
+    """
+    if not zone_name or (zone_id and not verify):
+        return zone_id, None
+
+    reason = f"find the ID of zone '{zone_name}'" if not zone_id \
+        else f"check that zone '{zone_name}' has the ID '{zone_id}'"
+    zone, source = get_zone_resolver(hetzner_dns_token)\
+        .get_cached_zone(zone_name)
+    plan.add_step('GET /zones', reason,
+                  params={'name': zone_name},
+                  source=source or 'api')
+
+    if zone is None:
+        return zone_id, None
+    return zone_id or zone['id'], zone
+
+
+def plan_record_listing(plan, hetzner_dns_token, zone_id=None, zone=None,
+                        zone_name=None, per_page=None, use_cache=None,
+                        stream=False, filters=None):
+    """
+    Add the steps needed to list the records of a zone (or of all zones,
+    if neither 'zone_id' nor 'zone_name' is given).
+
+    - 'zone' is the zone, if it is known, whose 'records_count' is used to
+      count the pages of records.
+    - 'zone_name' is used to describe a zone whose ID isn't known yet.
+    - 'filters' are the parameters that the listed records are matched by
+      (e.g. 'name'), which are only used to describe the step.
+    """
+    params = {}
+    if zone_id:
+        params['zone_id'] = zone_id
+    elif zone_name:
+        params['zone_id'] = f"<ID of zone '{zone_name}'>"
+    if per_page:
+        params['per_page'] = per_page
+
+    reason = f"list the records of zone '{zone_name or zone_id}'"\
+        if params.get('zone_id') else "list the records of every zone"
+    reason += describe_filters(filters)
+
+    # only listings for a single zone are cached, and never when streamed
+    disk_cache = get_disk_cache(hetzner_dns_token, enabled=use_cache)
+    if zone_id and not stream and disk_cache.enabled\
+            and disk_cache.get(f"records-{zone_id}") is not None:
+        plan.add_step('GET /records', reason, params=params,
+                      source='disk cache')
+        return
+
+    # without 'per_page', every record is returned in a single page
+    if not per_page:
+        plan.add_step('GET /records', reason, params=params)
+    elif zone and zone.get('records_count') is not None:
+        plan.add_step('GET /records', reason, params=params,
+                      requests=get_page_count(zone['records_count'],
+                                              per_page))
+    else:
+        plan.add_step('GET /records', f"{reason} (one request per page)",
+                      params=params, exact=False)
+
+
+def plan_zone_names_listing(plan, hetzner_dns_token, zone_names,
+                            per_page=None, use_cache=None, filters=None):
+    """
+    Add the steps needed to list the records of every zone whose name
+    matches one of 'zone_names' (see `record_list`).
+    """
+    from .hetzner_dns_client import ZONES_MAX_PER_PAGE
+
+    if isinstance(zone_names, str):
+        zone_names = re.split(r'[\s,]+', zone_names.strip())
+    patterns = [zone_name for zone_name in zone_names if zone_name]
+
+    disk_cache = get_disk_cache(hetzner_dns_token, enabled=use_cache)
+    zones_dict = disk_cache.get('zones') if disk_cache.enabled else None
+
+    reason = f"find the zones that match: {', '.join(patterns)}"
+    if zones_dict is None:
+        plan.add_step('GET /zones', f"{reason} (one request per page)",
+                      params={'per_page': ZONES_MAX_PER_PAGE}, exact=False)
+        plan.add_step('GET /records',
+                      "list the records of each matching zone"
+                      f"{describe_filters(filters)} (one request per zone, "
+                      "made concurrently)",
+                      params={'zone_id': '<ID of each matching zone>'},
+                      requests=0, exact=False)
+        return
+
+    plan.add_step('GET /zones', reason,
+                  params={'per_page': ZONES_MAX_PER_PAGE},
+                  source='disk cache')
+    for zone in zones_dict['zones']:
+        if any(fnmatch.fnmatchcase(zone['name'], pattern)
+               for pattern in patterns):
+            plan_record_listing(plan, hetzner_dns_token,
+                                zone_id=zone['id'],
+                                zone=zone,
+                                zone_name=zone['name'],
+                                per_page=per_page,
+                                use_cache=use_cache,
+                                filters=filters)
+
+
+def plan_record_list(hetzner_dns_token=None,
+                     zone_id=None,
+                     zone_name=None,
+                     per_page=None,
+                     use_cache=None,
+                     stream=False,
+                     zone_names=None):
+    """Return the plan of a call to `record_list`."""
+    if hetzner_dns_token is None:
+        # get token from environment variable
+        hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+    plan = LookupPlan('record.list')
+
+    if zone_names and not zone_id and not zone_name:
+        plan_zone_names_listing(plan, hetzner_dns_token, zone_names,
+                                per_page=per_page,
+                                use_cache=use_cache)
+        return plan
+
+    zone_id, zone = plan_zone_lookup(plan, hetzner_dns_token,
+                                     zone_id=zone_id,
+                                     zone_name=zone_name)
+    plan_record_listing(plan, hetzner_dns_token,
+                        zone_id=zone_id,
+                        zone=zone,
+                        zone_name=zone_name,
+                        per_page=per_page,
+                        use_cache=use_cache,
+                        stream=stream)
+    return plan
+
+
+def plan_record_get(hetzner_dns_token=None,
+                    record_id=None,
+                    zone_id=None,
+                    zone_name=None,
+                    record_type=None,
+                    name=None,
+                    value=None,
+                    search_all_zones=False,
+                    stream=False,
+                    zone_names=None,
+                    operation='record.get'):
+    """Return the plan of a call to `record_get`."""
+    if hetzner_dns_token is None:
+        # get token from environment variable
+        hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+    plan = LookupPlan(operation)
+
+    if record_id:
+        plan.add_step('GET /records/{id}', f"get record '{record_id}'")
+        return plan
+
+    # a zone_name is always looked up, to check that it matches zone_id
+    zone_id, zone = plan_zone_lookup(plan, hetzner_dns_token,
+                                     zone_id=zone_id,
+                                     zone_name=zone_name,
+                                     verify=True)
+
+    filters = {'name': name, 'record_type': record_type, 'value': value}
+    if zone_names and not zone_id and not zone_name:
+        plan_zone_names_listing(plan, hetzner_dns_token, zone_names,
+                                filters=filters)
+    elif zone_id or zone_name or search_all_zones:
+        plan_record_listing(plan, hetzner_dns_token,
+                            zone_id=zone_id,
+                            zone=zone,
+                            zone_name=zone_name,
+                            stream=stream,
+                            filters=filters)
+
+    return plan
+
+
+def plan_record_delete(hetzner_dns_token=None,
+                       record_id=None,
+                       record_ids=None,
+                       zone_id=None,
+                       zone_name=None,
+                       record_type=None,
+                       name=None,
+                       value=None,
+                       delete_multiple_records=False,
+                       search_all_zones=False):
+    """Return the plan of a call to `record_delete`."""
+    if record_id or record_ids:
+        plan = LookupPlan('record.delete')
+        record_ids = record_ids or [record_id]
+        plan.add_step('DELETE /records/{id}',
+                      f"delete {len(record_ids)} record(s)",
+                      requests=len(record_ids))
+        return plan
+
+    plan = plan_record_get(hetzner_dns_token=hetzner_dns_token,
+                           zone_id=zone_id,
+                           zone_name=zone_name,
+                           record_type=record_type,
+                           name=name,
+                           value=value,
+                           search_all_zones=search_all_zones,
+                           operation='record.delete')
+    if delete_multiple_records:
+        plan.add_step('DELETE /records/{id}',
+                      "delete the matching records (one request per "
+                      "record, made concurrently)", exact=False)
+    else:
+        plan.add_step('DELETE /records/{id}', "delete the matching record")
+    return plan
+
+
+def plan_record_update(hetzner_dns_token=None,
+                       record_id=None,
+                       zone_id=None,
+                       zone_name=None,
+                       record_type=None,
+                       name=None):
+    """Return the plan of a call to `record_update`."""
+    if hetzner_dns_token is None:
+        # get token from environment variable
+        hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+    plan = LookupPlan('record.update')
+
+    zone_id, zone = plan_zone_lookup(plan, hetzner_dns_token,
+                                     zone_id=zone_id,
+                                     zone_name=zone_name)
+    if not record_id:
+        plan_record_listing(plan, hetzner_dns_token,
+                            zone_id=zone_id,
+                            zone=zone,
+                            zone_name=zone_name,
+                            filters={'name': name,
+                                     'record_type': record_type})
+        plan.add_step('PUT /records/{id}', "update the matching record")
+    else:
+        if not name:
+            plan.add_step('GET /records/{id}',
+                          f"get the current name of record '{record_id}'")
+        plan.add_step('PUT /records/{id}', f"update record '{record_id}'")
+    return plan
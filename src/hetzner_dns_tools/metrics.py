@@ -0,0 +1,220 @@
+import threading
+
+from . import json_codec
+from . import request_hooks
+
+# the upper bounds of the latency histogram's buckets, in seconds
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                           2.5, 5.0, 10.0)
+
+# the prefix of every Prometheus metric name
+PROMETHEUS_PREFIX = 'hetzner_dns'
+
+
+def escape_label_value(value):
+    """Escape a Prometheus label value."""
+    return str(value).replace('\\', r'\\').replace('"', r'\"') \
+        .replace('\n', r'\n')
+
+
+def format_labels(labels):
+    """Format a dictionary of labels, e.g. '{method="GET"}'."""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{escape_label_value(value)}"'
+                          for key, value in labels.items()) + '}'
+
+
+def format_number(value):
+    """Format a number the way that Prometheus expects it."""
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsCollector:
+    """
+    Counts the requests sent by every client, and how long they took.
+
+        collector = MetricsCollector().install()
+        record_get(zone_name='your-domain.com', name='www', record_type='A')
+        print(collector.to_prometheus())
+
+    Requests are grouped by their operation (see `request_hooks.operation`),
+    method and endpoint (e.g. 'GET /zones/{id}'). For each group, the
+    collector counts the requests, the failed requests (with a status code
+    of 400 or more, or no response at all), the retries, the number of
+    each status code, and the bytes sent and received, and keeps a
+    histogram of the latencies.
+
+    The most recent 'rate_limit_remaining' is also kept.
+    """
+
+    def __init__(self, latency_buckets=DEFAULT_LATENCY_BUCKETS):
+        self.latency_buckets = tuple(sorted(latency_buckets))
+        self.groups = {}
+        self.rate_limit_remaining = None
+        self._lock = threading.Lock()
+
+    def install(self):
+        """Start collecting metrics for every request."""
+        request_hooks.add_hook('after_request', self.record_request)
+        return self
+
+    def uninstall(self):
+        """Stop collecting metrics."""
+        request_hooks.remove_hook('after_request', self.record_request)
+
+    def reset(self):
+        """Forget every request collected so far."""
+        with self._lock:
+            self.groups = {}
+            self.rate_limit_remaining = None
+
+    def record_request(self, request_info):
+        """Add a request to the metrics (an 'after_request' callback)."""
+        key = (request_info['operation'] or '', request_info['method'],
+               request_info['endpoint'])
+        status = request_info['status']
+        latency = request_info['latency'] or 0.0
+
+        with self._lock:
+            group = self.groups.get(key)
+            if group is None:
+                group = {'requests': 0,
+                         'errors': 0,
+                         'retries': 0,
+                         'status_codes': {},
+                         'bytes_sent': 0,
+                         'bytes_received': 0,
+                         'latency_count': 0,
+                         'latency_sum': 0.0,
+                         'latency_buckets': [0] * len(self.latency_buckets)}
+                self.groups[key] = group
+
+            group['requests'] += 1
+            if status is None or status >= 400:
+                group['errors'] += 1
+            if request_info['retries']:
+                group['retries'] += 1
+            status_code = str(status) if status is not None else 'error'
+            group['status_codes'][status_code] = \
+                group['status_codes'].get(status_code, 0) + 1
+            group['bytes_sent'] += request_info['bytes_sent'] or 0
+            group['bytes_received'] += request_info['bytes_received'] or 0
+
+            group['latency_count'] += 1
+            group['latency_sum'] += latency
+            for i, upper_bound in enumerate(self.latency_buckets):
+                if latency <= upper_bound:
+                    group['latency_buckets'][i] += 1
+                    break
+
+            if request_info['rate_limit_remaining'] is not None:
+                self.rate_limit_remaining = \
+                    request_info['rate_limit_remaining']
+
+    def to_dict(self):
+        """
+        Return the metrics as a dictionary, with one item in 'requests' for
+        each operation, method and endpoint.
+
+        The latency histogram's buckets are cumulative, as in Prometheus,
+        e.g. {'0.1': 5} means that 5 requests took 0.1 seconds or less.
+        """
+        with self._lock:
+            requests = []
+            for (operation, method, endpoint), group in \
+                    sorted(self.groups.items()):
+                buckets = {}
+                count = 0
+                for upper_bound, bucket_count in zip(
+                        self.latency_buckets, group['latency_buckets']):
+                    count += bucket_count
+                    buckets[format_number(upper_bound)] = count
+                buckets['+Inf'] = group['latency_count']
+
+                requests.append({
+                    'operation': operation or None,
+                    'method': method,
+                    'endpoint': endpoint,
+                    'requests': group['requests'],
+                    'errors': group['errors'],
+                    'retries': group['retries'],
+                    'status_codes': dict(group['status_codes']),
+                    'bytes_sent': group['bytes_sent'],
+                    'bytes_received': group['bytes_received'],
+                    'latency_seconds': {'count': group['latency_count'],
+                                        'sum': group['latency_sum'],
+                                        'buckets': buckets}})
+
+            return {'requests': requests,
+                    'rate_limit_remaining': self.rate_limit_remaining}
+
+    def to_json(self):
+        """Return the metrics as a JSON string (see `to_dict`)."""
+        return json_codec.dumps(self.to_dict())
+
+    def to_prometheus(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        metrics = self.to_dict()
+        prefix = PROMETHEUS_PREFIX
+
+        lines = []
+
+        def add_metric(name, metric_type, help_text, samples):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {metric_type}')
+            for suffix, labels, value in samples:
+                lines.append(f'{prefix}_{name}{suffix}{format_labels(labels)} '
+                             f'{format_number(value)}')
+
+        def get_labels(group):
+            return {'operation': group['operation'] or '',
+                    'method': group['method'],
+                    'endpoint': group['endpoint']}
+
+        add_metric('requests_total', 'counter',
+                   'Requests sent to the Hetzner DNS API.',
+                   [('', dict(get_labels(group), status=status), count)
+                    for group in metrics['requests']
+                    for status, count in sorted(
+                        group['status_codes'].items())])
+        add_metric('request_errors_total', 'counter',
+                   'Requests that failed, or returned a status of 400 or '
+                   'more.',
+                   [('', get_labels(group), group['errors'])
+                    for group in metrics['requests']])
+        add_metric('request_retries_total', 'counter',
+                   'Requests that were retries of an earlier request.',
+                   [('', get_labels(group), group['retries'])
+                    for group in metrics['requests']])
+        add_metric('request_sent_bytes_total', 'counter',
+                   'Bytes sent in request bodies.',
+                   [('', get_labels(group), group['bytes_sent'])
+                    for group in metrics['requests']])
+        add_metric('response_received_bytes_total', 'counter',
+                   'Bytes received in response bodies.',
+                   [('', get_labels(group), group['bytes_received'])
+                    for group in metrics['requests']])
+
+        samples = []
+        for group in metrics['requests']:
+            labels = get_labels(group)
+            latency = group['latency_seconds']
+            for upper_bound, count in latency['buckets'].items():
+                samples.append(('_bucket', dict(labels, le=upper_bound),
+                                count))
+            samples.append(('_sum', labels, latency['sum']))
+            samples.append(('_count', labels, latency['count']))
+        add_metric('request_duration_seconds', 'histogram',
+                   'Time taken to receive a response.', samples)
+
+        if metrics['rate_limit_remaining'] is not None:
+            add_metric('rate_limit_remaining', 'gauge',
+                       'Requests remaining in the current rate limit window.',
+                       [('', {}, metrics['rate_limit_remaining'])])
+
+        return '\n'.join(lines) + '\n'
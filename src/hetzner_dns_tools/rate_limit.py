@@ -0,0 +1,251 @@
+import math
+import threading
+import time
+
+# the windows used by 'X-RateLimit-Limit-<window>' headers, in seconds
+RATE_LIMIT_WINDOWS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+# the number of seconds to wait after a 429 response without a Retry-After
+DEFAULT_RETRY_AFTER = 1
+
+# the length of a 'RateLimit-Limit' window, in seconds, if the API doesn't
+# say (with a 'RateLimit-Policy' header, e.g. '100;w=60')
+DEFAULT_RATE_LIMIT_WINDOW = 60
+
+
+def get_header_number(headers, name):
+    """Return the value of a numeric header, or None."""
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def get_retry_after(headers):
+    """
+    Return the number of seconds to wait before retrying a throttled
+    request, using the 'Retry-After' (in seconds or as an HTTP date) or
+    'RateLimit-Reset' headers.
+    """
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            # only needed for HTTP dates, which the API rarely sends
+            import email.utils
+            try:
+                retry_at = email.utils.parsedate_to_datetime(retry_after)
+                return max(0.0, retry_at.timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    reset = get_header_number(headers, 'RateLimit-Reset')
+    if reset is not None:
+        return max(0.0, reset)
+
+    return DEFAULT_RETRY_AFTER
+
+
+def get_rate_limit_remaining(headers):
+    """
+    Return the number of requests remaining in the most restrictive rate
+    limit window of a response, or None if it has no rate limit headers.
+    """
+    remaining = [get_header_number(
+        headers, f'X-RateLimit-Remaining-{window_name.capitalize()}')
+        for window_name in RATE_LIMIT_WINDOWS]
+    remaining.append(get_header_number(headers, 'RateLimit-Remaining'))
+    remaining = [value for value in remaining if value is not None]
+    return int(min(remaining)) if remaining else None
+
+
+def get_policy_window(headers):
+    """
+    Return the length of the window (in seconds) of a 'RateLimit-Policy'
+    header, e.g. '100;w=60' -> 60, or None.
+    """
+    policy = headers.get('RateLimit-Policy') or ''
+    for parameter in policy.split(',')[0].split(';')[1:]:
+        key, _, value = parameter.strip().partition('=')
+        if key == 'w':
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+class RateLimitWindow:
+    """
+    A token bucket for a single rate limit window, e.g. 100 requests per
+    minute.
+
+    - Rolling windows (and fixed windows whose reset time isn't known)
+      refill steadily, at 'limit' tokens per 'window' seconds.
+    - Fixed windows are refilled all at once when they reset. Requests
+      that were reserved beyond the limit are a debt, which is paid from
+      the next window's tokens.
+    """
+
+    def __init__(self, limit, window, fixed=False):
+        self.limit = limit
+        self.window = window
+        self.fixed = fixed
+        self.tokens = limit
+        self.reset_at = None  # when a fixed window is refilled
+        self.updated_at = time.monotonic()
+
+    @property
+    def rate(self):
+        """The number of tokens added per second, when refilled steadily."""
+        return self.limit / self.window
+
+    def refill(self, now):
+        if self.fixed and self.reset_at is not None:
+            if now >= self.reset_at:
+                # any debt is carried forward into the new window
+                resets = math.floor((now - self.reset_at) / self.window) + 1
+                self.tokens = min(self.limit,
+                                  self.tokens + resets * self.limit)
+                self.reset_at += resets * self.window
+        else:
+            self.tokens = min(self.limit, self.tokens
+                              + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def get_delay(self, now):
+        """
+        Return the number of seconds until the tokens that have been
+        reserved are available.
+        """
+        if self.tokens >= 0:
+            return 0.0
+        if self.fixed and self.reset_at is not None:
+            # each reset pays back up to 'limit' tokens of the debt
+            resets = math.ceil(-self.tokens / self.limit)
+            return self.reset_at - now + (resets - 1) * self.window
+        return -self.tokens / self.rate
+
+    def update(self, now, limit, window, remaining=None, reset=None):
+        self.refill(now)
+        self.limit = limit
+        self.window = window
+        if reset is not None:
+            self.reset_at = now + reset
+        if remaining is not None:
+            # the server knows best how many requests are left
+            self.tokens = min(self.tokens, remaining)
+
+
+class RateLimiter:
+    """
+    Token buckets that pace requests according to the rate limits that
+    the API advertises in its response headers.
+
+    Until a response with rate limit headers has been seen, requests are
+    not paced at all. After that, every advertised window has its own
+    bucket (see `RateLimitWindow`), and a request must wait until it fits
+    in all of them:
+      - 'X-RateLimit-Limit-<Second|Minute|Hour|Day>' and
+        'X-RateLimit-Remaining-<...>' headers are rolling windows.
+      - 'RateLimit-Limit', 'RateLimit-Remaining' and 'RateLimit-Reset'
+        headers are a fixed window, which is refilled when it resets. Its
+        length is taken from the 'RateLimit-Policy' header (default:
+        DEFAULT_RATE_LIMIT_WINDOW), and is used to pace requests if the
+        API doesn't send 'RateLimit-Reset'.
+
+    Callers reserve a token with `reserve`, which returns the number of
+    seconds they must wait before sending their request. Reservations are
+    handed out in order, so excess requests are queued behind each other
+    instead of all being sent (and throttled) at once.
+
+    After a 429 response, `backoff` stops all requests from being sent
+    until the 'Retry-After' time has passed.
+    """
+
+    def __init__(self):
+        self.windows = {}  # window name -> RateLimitWindow
+        self.blocked_until = 0.0
+
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Reserve a token for a request, and return the number of seconds
+        to wait before sending it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self.blocked_until - now)
+
+            for window in self.windows.values():
+                window.refill(now)
+                window.tokens -= 1
+                delay = max(delay, window.get_delay(now))
+
+            return delay
+
+    def update(self, headers):
+        """Update the buckets using the rate limit headers of a response."""
+        updates = {}  # window name -> (limit, remaining, reset, seconds)
+
+        # rolling windows, e.g. 'X-RateLimit-Limit-Minute'
+        for window_name, window in RATE_LIMIT_WINDOWS.items():
+            limit = get_header_number(
+                headers, f'X-RateLimit-Limit-{window_name.capitalize()}')
+            if limit:
+                updates[window_name] = (limit, get_header_number(
+                    headers,
+                    f'X-RateLimit-Remaining-{window_name.capitalize()}'),
+                    None, window)
+
+        # fixed windows, e.g. 'RateLimit-Limit'
+        limit = get_header_number(headers, 'RateLimit-Limit')
+        if limit:
+            updates['fixed'] = (
+                limit,
+                get_header_number(headers, 'RateLimit-Remaining'),
+                get_header_number(headers, 'RateLimit-Reset'),
+                get_policy_window(headers) or DEFAULT_RATE_LIMIT_WINDOW)
+
+        if not updates:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            for window_name, (limit, remaining, reset, seconds) in \
+                    updates.items():
+                window = self.windows.get(window_name)
+                if window is None:
+                    window = RateLimitWindow(limit, seconds,
+                                             fixed=window_name == 'fixed')
+                    self.windows[window_name] = window
+                window.update(now, limit, seconds,
+                              remaining=remaining, reset=reset)
+
+    def backoff(self, delay):
+        """Stop all requests from being sent for 'delay' seconds."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until,
+                                     time.monotonic() + delay)
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(hetzner_dns_token):
+    """
+    Get the shared rate limiter for a token, creating it if necessary.
+
+    Rate limits apply to the token, so every client that uses the same
+    token (including asyncio clients) shares the same rate limiter.
+    """
+    with _rate_limiters_lock:
+        rate_limiter = _rate_limiters.get(hetzner_dns_token)
+        if rate_limiter is None:
+            rate_limiter = RateLimiter()
+            _rate_limiters[hetzner_dns_token] = rate_limiter
+
+    return rate_limiter
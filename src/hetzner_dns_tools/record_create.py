@@ -1,12 +1,14 @@
 #!/usr/bin/python3
 
-import json
 import os
-import requests
 import sys
 
 from . import hetzner_dns_helpers as helpers
-from .zone_list import zone_list
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from .disk_cache import get_disk_cache
+from .hetzner_dns_client import get_client
+from .zone_resolver import get_zone_resolver
 
 
 def record_create(hetzner_dns_token=None,
@@ -16,7 +18,8 @@ def record_create(hetzner_dns_token=None,
                   ttl=None,
                   zone_id=None,
                   zone_name=None,
-                  id_only=False):
+                  id_only=False,
+                  retry=False):
     """
     Create a new record.
     https://dns.hetzner.com/api-docs/#operation/CreateRecord
@@ -25,7 +28,7 @@ def record_create(hetzner_dns_token=None,
       - `hetzner_dns_token`, `record_type`, `value`, `zone_id`
 
     Optional Parameters:
-      - `zone_name`, `name`, `ttl`, `id_only`
+      - `zone_name`, `name`, `ttl`, `id_only`, `retry`
 
 
     * hetzner_dns_token *MUST* be passed in args or as environment
@@ -43,6 +46,11 @@ def record_create(hetzner_dns_token=None,
         - e.g. '1 2 3 your-domain.com' # priority: 1, weight: 2,
                                        # port: 3, target: your-domain.com
 
+    - If 'retry' passed in args or as environment variable (RETRY), retry
+      the request after connection errors, timeouts and 5xx responses.
+      This is not done by default, since the record may be created twice
+      if the first request reached the API.
+
     - If using Bash environment variables, ensure that values are assigned
       in ALL_CAPS.
         - e.g. zone_id in Python -> ZONE_ID in environment variable
@@ -84,18 +92,8 @@ def record_create(hetzner_dns_token=None,
     # if zone_name exists, use it to obtain the zone_id
     if zone_name:
 
-        # get list of zones
-        response_dict = zone_list()
-
-        # check response for errors
-        helpers.check_response_for_errors(response_dict)
-
-        # check for matching zone
-        dns_zones = response_dict['zones']
-        for zone in dns_zones:
-            if zone['name'] == zone_name:
-                zone_id = zone['id']
-                break
+        # get the ID of the matching zone
+        zone_id = get_zone_resolver(hetzner_dns_token).get_zone_id(zone_name)
 
         # if no matching zone found, then exit with error
         if zone_id is None:
@@ -116,17 +114,19 @@ def record_create(hetzner_dns_token=None,
         if name:
             params['name'] = name
 
-        response = requests.post(url='https://dns.hetzner.com/api/v1/records',
-                                 headers={'Content-Type': 'application/json',
-                                          'Auth-API-Token': hetzner_dns_token},
-                                 data=json.dumps(params))
+        response = get_client(hetzner_dns_token).post(
+            '/records',
+            data=params,
+            retry=retry or os.environ.get('RETRY') == '1')
 
-        decoded_response = response.content.decode('utf-8')
-        response_dict = json.loads(decoded_response)
+        response_dict = json_codec.loads(response.content)
 
         # check response for errors
         helpers.check_response_for_errors(response_dict)
 
+        # the zone's cached records are now out of date
+        get_disk_cache(hetzner_dns_token).invalidate_zone(zone_id)
+
         # return the expected result
         if id_only or os.environ.get('ID_ONLY') == '1':
             # return the zone_id
@@ -140,7 +140,7 @@ def record_create(hetzner_dns_token=None,
         else:
             # return all zone data
             if __name__ == '__main__':
-                print(json.dumps(response_dict))
+                json_codec.print_json(response_dict)
                 sys.exit(0)  # exit successfully
 
             return response_dict
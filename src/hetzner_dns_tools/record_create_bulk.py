@@ -0,0 +1,249 @@
+#!/usr/bin/python3
+
+import csv
+import io
+import os
+import sys
+
+from . import hetzner_dns_helpers as helpers
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from . import record_set
+from .disk_cache import get_disk_cache
+from .hetzner_dns_client import get_client
+from .zone_resolver import get_zone_resolver
+
+# the number of records sent in each bulk request
+DEFAULT_CHUNK_SIZE = 100
+
+
+def parse_records(text):
+    """
+    Parse a list of records from a string.
+
+    The format is detected automatically, and may be any of:
+      - A JSON list of records, or a JSON object with a 'records' list
+      - NDJSON (one JSON record per line)
+      - CSV with a header row, e.g. 'zone_name,record_type,name,value,ttl'
+    """
+    text = text.strip()
+    if not text:
+        return []
+
+    if text.startswith('[') or text.startswith('{'):
+        try:
+            parsed = json_codec.loads(text)
+        except ValueError:
+            # not a single JSON document, so try parsing it as NDJSON
+            return [json_codec.loads(line) for line in text.splitlines()
+                    if line.strip()]
+        return parsed['records'] if isinstance(parsed, dict) else parsed
+
+    return [{key: value for key, value in row.items() if value}
+            for row in csv.DictReader(io.StringIO(text))]
+
+
+def chunk_list(items, chunk_size):
+    """Split a list into lists of (at most) 'chunk_size' items."""
+    return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def get_record_key(record):
+    """
+    Return a key that identifies a record in a bulk response.
+
+    - Names and values are normalized (see `record_set.get_record_key`),
+      since the API may return them differently from how they were sent.
+    """
+    return (record.get('zone_id'),) + record_set.get_record_key(record)
+
+
+def match_records(chunk, response_dict):
+    """
+    Match the records in a bulk response to the records that were sent,
+    and return a dictionary of {index: result}.
+
+    - Records are matched by key (see `get_record_key`), and any that
+      remain are matched by position, in the order that they were sent,
+      to a record in the same zone and of the same type.
+    """
+    matched = {}
+    unmatched = []  # (status, response record)
+
+    indexes_by_key = {}
+    for index, data in chunk:
+        indexes_by_key.setdefault(get_record_key(data), []).append(index)
+
+    for status, response_records in (
+            ('created', response_dict.get('records') or []),
+            ('invalid', response_dict.get('invalid_records') or [])):
+        for response_record in response_records:
+            indexes = indexes_by_key.get(get_record_key(response_record))
+            if indexes:
+                matched[indexes.pop(0)] = {'status': status,
+                                           'record': response_record}
+            else:
+                unmatched.append((status, response_record))
+
+    remaining = [(index, data) for index, data in chunk
+                 if index not in matched]
+    for status, response_record in unmatched:
+        zone_id, _, record_type, _ = get_record_key(response_record)
+        for position, (index, data) in enumerate(remaining):
+            if data['zone_id'] == zone_id \
+                    and str(data['type'] or '').upper() == record_type:
+                matched[index] = {'status': status, 'record': response_record}
+                del remaining[position]
+                break
+
+    return matched
+
+
+def record_create_bulk(hetzner_dns_token=None,
+                       records=None,
+                       chunk_size=None):
+    """
+    Create many records, using as few requests as possible.
+    https://dns.hetzner.com/api-docs/#operation/BulkCreateRecords
+
+    Required Parameters: `records`
+
+    Optional Parameters: `chunk_size`
+
+
+    * hetzner_dns_token *MUST* be passed in args or as environment
+      variable (HETZNER_DNS_TOKEN). You can get a DNS API token
+      here: https://dns.hetzner.com/settings/api-token
+
+    * records may be a list of dictionaries, or a string containing
+      JSON, NDJSON or CSV (with a header row). In Bash, they are read
+      from stdin, or from the file in the RECORDS_FILE environment
+      variable.
+        - Each record uses the same parameters as record_create:
+          'record_type' (or 'type'), 'name', 'value', 'ttl', and one of
+          'zone_id' or 'zone_name'.
+        - e.g. [{"zone_name": "your-domain.com", "record_type": "A",
+                 "name": "www", "value": "1.1.1.1"}]
+
+    * If name is not passed, then '@' will be used.
+
+    - Each zone_name is only looked up once, no matter how many records
+      use it.
+
+    - Records are sent in bulk requests of 'chunk_size' records each
+      (default: 100).
+
+    - Returns a dictionary containing the number of records that were
+      'created' and that 'failed', and a list of 'results' (in the same
+      order as 'records'). Each result has a 'status' of 'created' (with
+      the new 'record'), 'invalid' (rejected by the API), or 'failed'
+      (with an 'error').
+
+    - If using Bash environment variables, ensure that values are assigned
+      in ALL_CAPS.
+        - e.g. zone_id in Python -> ZONE_ID in environment variable
+    """
+    if os.environ.get('SHOW_HELP'):
+        # print the docstring and exit
+        print(record_create_bulk.__doc__)
+        sys.exit(0)
+
+    if hetzner_dns_token is None:
+        # get token from environment variable
+        hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+    if records is None:
+        # get records from a file or from stdin
+        if os.environ.get('RECORDS_FILE'):
+            with open(os.environ['RECORDS_FILE']) as records_file:
+                records = records_file.read()
+        else:
+            records = sys.stdin.read()
+
+    if isinstance(records, str):
+        records = parse_records(records)
+
+    if chunk_size is None:
+        # get chunk_size from environment variable
+        chunk_size = int(os.environ.get('CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+
+    results = [None] * len(records)
+
+    # build the request data for each record
+    zone_resolver = get_zone_resolver(hetzner_dns_token)
+    valid_records = []  # (index, request data)
+    for index, record in enumerate(records):
+        zone_id = record.get('zone_id')
+        if not zone_id and record.get('zone_name'):
+            # get the ID of the matching zone
+            zone_id = zone_resolver.get_zone_id(record['zone_name'])
+            if zone_id is None:
+                results[index] = {'status': 'failed',
+                                  'error': "zone not found"}
+                continue
+        if not zone_id:
+            results[index] = {
+                'status': 'failed',
+                'error': "Must include one of: zone_id, zone_name"}
+            continue
+
+        try:
+            ttl = int(record.get('ttl') or 86400)
+        except (TypeError, ValueError):
+            results[index] = {'status': 'failed',
+                              'error': f"invalid ttl: {record.get('ttl')!r}"}
+            continue
+
+        data = {'zone_id': zone_id,
+                'type': record.get('record_type') or record.get('type'),
+                'name': record.get('name') or '@',
+                'value': record.get('value'),
+                'ttl': ttl}
+        valid_records.append((index, data))
+
+    # send the records in bulk requests
+    client = get_client(hetzner_dns_token)
+    for chunk in chunk_list(valid_records, chunk_size):
+        try:
+            response = client.post(
+                '/records/bulk', data={'records': [d for _, d in chunk]})
+
+            response_dict = json_codec.loads(response.content)
+
+            # check response for errors
+            helpers.check_response_for_errors(response_dict)
+
+        except (ValueError, requests.exceptions.RequestException) as err:
+            for index, _ in chunk:
+                results[index] = {'status': 'failed', 'error': str(err)}
+            continue
+
+        # match the records in the response to the records that were sent
+        for index, result in match_records(chunk, response_dict).items():
+            results[index] = result
+
+        for index, _ in chunk:
+            if results[index] is None:
+                results[index] = {'status': 'failed',
+                                  'error': "record was not created"}
+
+    # the cached records of the affected zones are now out of date
+    disk_cache = get_disk_cache(hetzner_dns_token)
+    for zone_id in {data['zone_id'] for _, data in valid_records}:
+        disk_cache.invalidate_zone(zone_id)
+
+    created_count = sum(result['status'] == 'created' for result in results)
+    result = {'created': created_count,
+              'failed': len(results) - created_count,
+              'results': results}
+
+    # when running via the terminal, print output to console then exit
+    if __name__ == '__main__':
+        json_codec.print_json(result)
+        sys.exit(1 if result['failed'] else 0)
+
+    return result
+
+
+if __name__ == '__main__':
+    record_create_bulk()
@@ -1,22 +1,65 @@
 #!/usr/bin/python3
 
-import json
+import functools
 import os
-import requests
 import sys
+import threading
 
 from . import hetzner_dns_helpers as helpers
-from .record_get import record_get
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from . import lookup_planner
+from . import request_hooks
+from .disk_cache import get_disk_cache
+from .hetzner_dns_client import get_client
+from .record_get import record_get, validate_lookup_params
+
+# the number of records that are deleted at the same time
+DEFAULT_MAX_WORKERS = 4
+
+
+class RecordDeleteError(ValueError):
+    """
+    Raised when some of many records could not be deleted, and
+    'continue_on_error' is not truthy.
+
+    - 'results' contains the status of every record, as returned by
+      `delete_records_by_id`.
+    """
+    def __init__(self, message, results):
+        super().__init__(message)
+        self.results = results
+
+
+def get_delete_error_message(results):
+    """
+    Return the error message for records that could not all be deleted,
+    listing the IDs of the records by their status.
+    """
+    failures = [status for status in results.values()
+                if status.startswith('failed')]
+    deleted_count = sum(status == 'deleted' for status in results.values())
+
+    record_ids_by_status = {}
+    for record_id, status in results.items():
+        status = 'failed' if status.startswith('failed') else status
+        record_ids_by_status.setdefault(status, []).append(record_id)
+    statuses = '; '.join(
+        f"{status}: {', '.join(record_ids_by_status[status])}"
+        for status in ('deleted', 'not found', 'failed', 'skipped')
+        if status in record_ids_by_status)
+
+    return f"Deleted {deleted_count} of {len(results)} records before " \
+        f"an error occurred ({failures[0]}) - {statuses}. Use " \
+        "'continue_on_error' to attempt to delete all of the records."
 
 
 def delete_record_by_id(hetzner_dns_token, record_id):
     try:
-        response = requests.delete(
-            url=f'https://dns.hetzner.com/api/v1/records/{record_id}',
-            headers={'Auth-API-Token': hetzner_dns_token})
+        response = get_client(hetzner_dns_token).delete(
+            f'/records/{record_id}')
 
-        decoded_response = response.content.decode('utf-8')
-        response_dict = json.loads(decoded_response)
+        response_dict = json_codec.loads(response.content)
 
         # check response for errors
         helpers.check_response_for_errors(response_dict)
@@ -31,6 +74,62 @@ def delete_record_by_id(hetzner_dns_token, record_id):
         helpers.handle_request_exception(err)
 
 
+def delete_records_by_id(hetzner_dns_token,
+                         record_ids,
+                         max_workers=DEFAULT_MAX_WORKERS,
+                         continue_on_error=False):
+    """
+    Delete many records concurrently, and return the result for each one.
+
+    The result is a dictionary of record IDs and their status, which is one
+    of: 'deleted', 'not found', 'failed: <error message>', or 'skipped'
+    (if an earlier deletion failed and 'continue_on_error' is not truthy).
+    """
+    client = get_client(hetzner_dns_token)
+    stop_event = threading.Event()
+
+    @request_hooks.in_current_context
+    def delete_record(record_id):
+        if stop_event.is_set():
+            return 'skipped'
+
+        try:
+            response = client.delete(f'/records/{record_id}')
+
+            # the record may have already been deleted
+            if response.status_code == 404:
+                return 'not found'
+
+            response_dict = json_codec.loads(response.content)
+
+            # check response for errors
+            helpers.check_response_for_errors(response_dict)
+
+            return 'deleted'
+
+        except (ValueError, requests.exceptions.RequestException) as err:
+            if not continue_on_error:
+                stop_event.set()
+            return f"failed: {err}"
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(record_ids, executor.map(delete_record, record_ids)))
+
+
+def explain_record_delete(hetzner_dns_token, **kwargs):
+    """Return (or print) the planned requests of a call to record_delete."""
+    plan = lookup_planner.plan_record_delete(
+        hetzner_dns_token=hetzner_dns_token, **kwargs).to_dict()
+
+    # when running via the terminal, print output to console then exit
+    if __name__ == '__main__':
+        json_codec.print_json(plan)
+        sys.exit(0)  # exit successfully
+    return plan
+
+
 def record_delete(hetzner_dns_token=None,
                   record_id=None,
                   record_ids=None,
@@ -41,7 +140,10 @@ def record_delete(hetzner_dns_token=None,
                   value=None,
                   first_record_only=None,
                   delete_multiple_records=False,
-                  search_all_zones=False):
+                  search_all_zones=False,
+                  max_workers=None,
+                  continue_on_error=False,
+                  explain=False):
     """
     Delete an existing record.
     https://dns.hetzner.com/api-docs/#operation/DeleteRecord
@@ -50,7 +152,8 @@ def record_delete(hetzner_dns_token=None,
 
     Optional Parameters:
       Filters: record_type, name, value
-      Options: delete_multiple_records, first_record_only, search_all_zones*
+      Options: delete_multiple_records, first_record_only, search_all_zones*,
+               max_workers, continue_on_error, explain
 
 
     * This function will raise an exception if multiple records are
@@ -64,6 +167,21 @@ def record_delete(hetzner_dns_token=None,
     - If doing a lookup, you must either specify a 'zone_id' or
       'zone_name', or assign a truthy value to 'search_all_zones'.
 
+    - When deleting multiple records, up to 'max_workers' records
+      (default: 4) are deleted at the same time.
+        - If a deletion fails, no more records will be deleted and a
+          RecordDeleteError will be raised, which lists the IDs of the
+          records that were deleted and of those that were not, and has
+          the status of each record ID in its 'results', *unless*
+          'continue_on_error' is truthy. In that case, all records will
+          be attempted, and a dictionary with the status of each record
+          ID ('deleted', 'not found', or 'failed: <error message>') will
+          be returned.
+
+    - If 'explain' passed in args or as environment variable (EXPLAIN),
+      return the requests that would be sent, including the lookup of the
+      records (see `lookup_planner`), without sending any of them.
+
     * hetzner_dns_token *MUST* be passed in args or as environment
       variable (HETZNER_DNS_TOKEN). You can get a DNS API token
       here: https://dns.hetzner.com/settings/api-token
@@ -86,8 +204,8 @@ def record_delete(hetzner_dns_token=None,
         record_id = os.environ['RECORD_ID']
 
     if record_ids is None and os.environ.get('RECORD_IDS'):
-        # get record_ids from environment variable
-        record_ids = os.environ['RECORD_IDS']
+        # get record_ids from environment variable (comma-separated)
+        record_ids = os.environ['RECORD_IDS'].replace(',', ' ').split()
 
     if not first_record_only\
             and os.environ.get('FIRST_RECORD_ONLY'):
@@ -104,9 +222,22 @@ def record_delete(hetzner_dns_token=None,
         # get delete_multiple_records from environment variable
         delete_multiple_records = os.environ['DELETE_MULTIPLE_RECORDS']
 
+    if max_workers is None:
+        # get max_workers from environment variable
+        max_workers = int(os.environ.get('MAX_WORKERS', DEFAULT_MAX_WORKERS))
+
+    if not continue_on_error\
+            and os.environ.get('CONTINUE_ON_ERROR'):
+        # get continue_on_error from environment variable
+        continue_on_error = os.environ['CONTINUE_ON_ERROR']
+
+    if not explain and os.environ.get('EXPLAIN'):
+        # get explain from environment variable
+        explain = os.environ['EXPLAIN']
+
     # do an indirect lookup of all relevant records that match the parameters
     # and allow a single match to be returned
-    if not record_id:
+    if not record_id and not record_ids:
         if zone_id is None and os.environ.get('ZONE_ID'):
             # get zone_id from environment variable
             zone_id = os.environ['ZONE_ID']
@@ -128,10 +259,32 @@ def record_delete(hetzner_dns_token=None,
             # get value from environment variable
             value = os.environ['VALUE']
 
+        # return the planned requests without sending them
+        if explain:
+            validate_lookup_params(
+                zone_id=zone_id,
+                zone_name=zone_name,
+                record_type=record_type,
+                name=name,
+                value=value,
+                first_record_only=first_record_only,
+                allow_multiple_records=delete_multiple_records,
+                search_all_zones=search_all_zones)
+            return explain_record_delete(
+                hetzner_dns_token,
+                zone_id=zone_id,
+                zone_name=zone_name,
+                record_type=record_type,
+                name=name,
+                value=value,
+                delete_multiple_records=delete_multiple_records,
+                search_all_zones=search_all_zones)
+
         # this method will return a string if one record is returned,
         # and a list if multiple records are returned
         record_get_id_result =\
-            record_get(zone_id=zone_id,
+            record_get(hetzner_dns_token=hetzner_dns_token,
+                       zone_id=zone_id,
                        zone_name=zone_name,
                        name=name,
                        record_type=record_type,
@@ -165,14 +318,53 @@ def record_delete(hetzner_dns_token=None,
     if record_id and record_ids:
         helpers.exit_with_error(
             "Cannot use 'record_id' and 'record_ids' at the same time.")
-    elif record_id:
-        delete_record_by_id(hetzner_dns_token, record_id)
-    elif record_ids:
-        for record_id_value in record_ids:
-            delete_record_by_id(hetzner_dns_token, record_id_value)
-    else:
+    elif not record_id and not record_ids:
         helpers.exit_with_error("No 'record_id' or 'record_ids' found.")
 
+    # return the planned requests without sending them
+    if explain:
+        return explain_record_delete(hetzner_dns_token,
+                                     record_id=record_id,
+                                     record_ids=record_ids)
+
+    try:
+        if record_id:
+            return delete_record_by_id(hetzner_dns_token, record_id)
+
+        results = delete_records_by_id(hetzner_dns_token,
+                                       record_ids,
+                                       max_workers=max_workers,
+                                       continue_on_error=continue_on_error)
+    finally:
+        # the cached records of the affected zones are now out of date
+        disk_cache = get_disk_cache(hetzner_dns_token)
+        if zone_id:
+            disk_cache.invalidate_zone(zone_id)
+        else:
+            disk_cache.invalidate_records(record_ids or [record_id])
+
+    failures = [status for status in results.values()
+                if status.startswith('failed')]
+
+    if continue_on_error:
+        # return the status of every record
+        if __name__ == '__main__':
+            json_codec.print_json(results)
+            sys.exit(1 if failures else 0)
+
+        return results
+
+    if failures:
+        helpers.exit_with_error(
+            get_delete_error_message(results),
+            functools.partial(RecordDeleteError, results=results))
+
+    # when running via the terminal, print output to console
+    if __name__ == '__main__':
+        print("OK")
+
+    return "OK"
+
 
 if __name__ == '__main__':
     record_delete()
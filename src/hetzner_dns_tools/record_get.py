@@ -1,13 +1,66 @@
 #!/usr/bin/python3
 
-import json
 import os
-import requests
 import sys
 
 from . import hetzner_dns_helpers as helpers
-from .record_list import record_list
-from .zone_get import zone_get
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from . import lookup_planner
+from .hetzner_dns_client import get_client
+from .record_list import (DEFAULT_MAX_WORKERS, get_matching_zones,
+                          iter_zone_records, record_list)
+from .zone_resolver import get_zone_resolver
+
+
+def record_matches(record, name=None, record_type=None, value=None):
+    """Return True if a record matches all of the given filters."""
+    return (not name or record.get('name') == name)\
+        and (not record_type or record.get('type') == record_type)\
+        and (not value or record.get('value') == value)
+
+
+def validate_lookup_params(record_id=None,
+                           zone_id=None,
+                           zone_name=None,
+                           record_type=None,
+                           name=None,
+                           value=None,
+                           first_record_only=False,
+                           allow_multiple_records=False,
+                           search_all_zones=False,
+                           zone_names=None):
+    """
+    Check the parameters of a record lookup (see `record_get`), and raise
+    a ValueError if they are invalid.
+
+    - Also used by `record_delete` and the asyncio `record_get`, so that
+      every lookup is validated the same way.
+    """
+    if first_record_only and allow_multiple_records:
+        helpers\
+            .exit_with_error("This combination of options doesn't make sense.")
+
+    # if no record_id exists, ensure that zone_name or zone_id exist,
+    # in order to prevent pulling records from multiple zones
+    if not record_id and not zone_name and not zone_id and not zone_names\
+            and not search_all_zones:
+        error_message = "In order to prevent records from being pulled from "\
+            "more than one zone, you must specify one (or more) of: "\
+            "record_id, zone_id, or zone_name. You can override this "\
+            "behavior by assigning a truthy value to 'search_all_zones'."
+        helpers.exit_with_error(error_message)
+
+    # ensure that one or more optional parameters exist before doing
+    # an indirect lookup
+    if not record_id and not search_all_zones and not zone_name\
+            and not zone_names and not name and not record_type\
+            and not value:
+        error_message =\
+            "You must provide a record_id or one or more of the following: "\
+            "name, record_type (environment variable: TYPE), or value, "\
+            "*OR* you must set a truthy value for 'search_all_zones.'"
+        helpers.exit_with_error(error_message)
 
 
 def record_get(hetzner_dns_token=None,
@@ -20,7 +73,12 @@ def record_get(hetzner_dns_token=None,
                first_record_only=False,
                allow_multiple_records=False,
                search_all_zones=False,
-               id_only=False):
+               id_only=False,
+               stream=False,
+               zone_names=None,
+               max_workers=None,
+               explain=False,
+               raw=False):
     """
     Get info about an existing record.
     https://dns.hetzner.com/api-docs/#operation/GetRecord
@@ -29,8 +87,9 @@ def record_get(hetzner_dns_token=None,
 
     Optional Parameters:
       Filters: record_type, name, value
-      Formats: id_only
-      Options: first_record_only, allow_multiple_records, search_all_zones
+      Formats: id_only, raw
+      Options: first_record_only, allow_multiple_records, search_all_zones,
+               stream, zone_names, max_workers, explain
 
 
     * This function will raise an exception if multiple records are
@@ -43,8 +102,21 @@ def record_get(hetzner_dns_token=None,
         - Due to how record_list is structured, 'ttl' is not an
           available filter.
 
-    - If doing an indirect lookup, you must either specify a 'zone_id' or
-      'zone_name', or assign a truthy value to 'search_all_zones'.
+    - If doing an indirect lookup, you must either specify a 'zone_id',
+      'zone_name' or 'zone_names', or assign a truthy value to
+      'search_all_zones'.
+
+    - If 'zone_names' passed in args or as environment variable
+      (ZONE_NAMES), search the records of every zone whose name matches
+      one of them, instead of a single zone. 'zone_names' may be a list,
+      or a string separated by commas, and may contain glob patterns
+      (e.g. '*.staging.example.com').
+        - The zones are found with a single listing of all zones, and
+          their records are fetched concurrently (up to 'max_workers' at
+          a time, default: 4). Each record is tagged with its zone's name,
+          as 'zone_name'.
+        - With 'stream', matching records are yielded as each zone's
+          records are fetched, so zones may be out of order.
 
     - If indirect lookups are performed, an exception will be raised if
       multiple records are returned, *UNLESS* you specify a truthy
@@ -57,6 +129,22 @@ def record_get(hetzner_dns_token=None,
       - If 'id_only' and 'allow_multiple_records' are truthy, then return
         a list of record IDs.
 
+    - If 'raw' passed in args or as environment variable (RAW), and the
+      record is found directly by 'record_id', return the response's JSON
+      as bytes, exactly as it was received, instead of a dictionary. (The
+      'hetzner-dns-tools' command uses this to print the response without
+      serializing it again.) Indirect lookups ignore 'raw'.
+
+    - If 'stream' and 'allow_multiple_records' are truthy, return an
+      iterator that yields each matching record (or record ID) as soon as
+      the page that contains it has been fetched, instead of a list. (In
+      Bash, use 'hetzner-dns-tools record get --output ndjson')
+
+    - If 'explain' passed in args or as environment variable (EXPLAIN),
+      return the requests that would be sent, and how many requests will
+      be skipped because their results are cached (see `lookup_planner`),
+      without sending any of them.
+
     * hetzner_dns_token *MUST* be passed in args or as environment
       variable (HETZNER_DNS_TOKEN). You can get a DNS API token
       here: https://dns.hetzner.com/settings/api-token
@@ -82,17 +170,22 @@ def record_get(hetzner_dns_token=None,
         # get id_only from environment variable
         id_only = os.environ['ID_ONLY']
 
+    if not raw and os.environ.get('RAW'):
+        # get raw from environment variable
+        raw = os.environ['RAW']
+
+    if not explain and os.environ.get('EXPLAIN'):
+        # get explain from environment variable
+        explain = os.environ['EXPLAIN']
+
     # if record_id exists, do a direct lookup to obtain the record
-    if record_id:
+    if record_id and not explain:
         # get response
         try:
-            response = requests.get(
-                url=f'https://dns.hetzner.com/api/v1/records/{record_id}',
-                headers={'Auth-API-Token': hetzner_dns_token,
-                         'Content-Type': 'application/json; charset=utf-8'})
+            response = get_client(hetzner_dns_token).get(
+                f'/records/{record_id}')
 
-            decoded_response = response.content.decode('utf-8')
-            response_dict = json.loads(decoded_response)
+            response_dict = json_codec.loads(response.content)
 
             # check response for errors
             helpers.check_response_for_errors(response_dict)
@@ -105,11 +198,15 @@ def record_get(hetzner_dns_token=None,
                 else:
                     return response_dict['record']['id']
 
-            # when running via the terminal, print output to console then exit
+            # when running via the terminal, echo the response as-is
             if __name__ == '__main__':
-                print(decoded_response)
+                json_codec.write_bytes(response.content)
                 sys.exit(0)  # exit successfully
 
+            # the response is unchanged, so it can be returned as-is
+            if raw:
+                return response.content
+
             return response_dict
 
         except requests.exceptions.RequestException as err:
@@ -147,41 +244,59 @@ def record_get(hetzner_dns_token=None,
         # get allow_multiple_records from environment variable
         allow_multiple_records = os.environ['ALLOW_MULTIPLE_RECORDS']
 
-    if first_record_only and allow_multiple_records:
-        helpers\
-            .exit_with_error("This combination of options doesn't make sense.")
-
     if not search_all_zones\
             and os.environ.get('SEARCH_ALL_ZONES'):
         # get search_all_zones from environment variable
         search_all_zones = os.environ['SEARCH_ALL_ZONES']
 
+    if zone_names is None and os.environ.get('ZONE_NAMES'):
+        # get zone_names from environment variable
+        zone_names = os.environ['ZONE_NAMES']
+
+    if max_workers is None:
+        # get max_workers from environment variable
+        max_workers = int(os.environ.get('MAX_WORKERS', DEFAULT_MAX_WORKERS))
+
     # BEGIN validation #
 
-    # if no record_id exists, ensure that zone_name or zone_id exist,
-    # in order to prevent pulling records from multiple zones
-    if not record_id and not zone_name and not zone_id\
-            and not search_all_zones:
-        error_message = "In order to prevent records from being pulled from "\
-            "more than one zone, you must specify one (or more) of: "\
-            "record_id, zone_id, or zone_name. You can override this "\
-            "behavior by assigning a truthy value to 'search_all_zones'."
-        helpers.exit_with_error(error_message)
+    validate_lookup_params(record_id=record_id,
+                           zone_id=zone_id,
+                           zone_name=zone_name,
+                           record_type=record_type,
+                           name=name,
+                           value=value,
+                           first_record_only=first_record_only,
+                           allow_multiple_records=allow_multiple_records,
+                           search_all_zones=search_all_zones,
+                           zone_names=zone_names)
+
+    # return the planned requests without sending them
+    if explain:
+        plan = lookup_planner.plan_record_get(
+            hetzner_dns_token=hetzner_dns_token,
+            record_id=record_id,
+            zone_id=zone_id,
+            zone_name=zone_name,
+            record_type=record_type,
+            name=name,
+            value=value,
+            search_all_zones=search_all_zones,
+            stream=stream and allow_multiple_records,
+            zone_names=zone_names).to_dict()
 
-    # ensure that one or more optional parameters exist before doing
-    # an indirect lookup
-    if not record_id and not search_all_zones and not zone_name\
-            and not name and not record_type and not value:
-        error_message =\
-            "You must provide a record_id or one or more of the following: "\
-            "name, record_type (environment variable: TYPE), or value, "\
-            "*OR* you must set a truthy value for 'search_all_zones.'"
-        helpers.exit_with_error(error_message)
+        # when running via the terminal, print output to console then exit
+        if __name__ == '__main__':
+            json_codec.print_json(plan)
+            sys.exit(0)  # exit successfully
+        return plan
 
     # if zone_name passed, lookup the zone that matches it to get zone_id
     if zone_name:
-        zone_name_id = zone_get(zone_name=zone_name, id_only=True)
-        if not zone_id:
+        zone_name_id = get_zone_resolver(hetzner_dns_token)\
+            .get_zone_id(zone_name)
+        if zone_name_id is None:
+            helpers.exit_with_error("zone not found")
+        elif not zone_id:
             zone_id = zone_name_id
         elif zone_id != zone_name_id:
             error_message =\
@@ -195,27 +310,45 @@ def record_get(hetzner_dns_token=None,
 
     # END validation #
 
-    records = record_list(hetzner_dns_token=hetzner_dns_token,
-                          zone_id=zone_id)['records']
+    if zone_names and not zone_id:
+        # search the records of many zones, as each zone is fetched
+        zones = get_matching_zones(hetzner_dns_token, zone_names)
+        zone_records = iter_zone_records(hetzner_dns_token,
+                                         zones,
+                                         max_workers=max_workers)
+        matching_records = (record for _, records in zone_records
+                            for record in records
+                            if record_matches(record, name, record_type,
+                                              value))
+
+        if stream and allow_multiple_records:
+            return (record['id'] if id_only else record
+                    for record in matching_records)
+
+        # keep the records in the same order as the zones
+        zone_positions = {zone['name']: i for i, zone in enumerate(zones)}
+        filtered_records = sorted(
+            matching_records,
+            key=lambda record: zone_positions[record['zone_name']])
+
+    elif stream and allow_multiple_records:
+        # filter the records page by page, without listing them all first
+        records = record_list(hetzner_dns_token=hetzner_dns_token,
+                              zone_id=zone_id,
+                              stream=True)
+        return (record['id'] if id_only else record for record in records
+                if record_matches(record, name, record_type, value))
 
-    # iterate over the given parameters, adding any matching records that
-    # are not yet in the list
-    if (zone_id or zone_name) and (not name and not record_type and not value):
-        filtered_records = records
     else:
-        filtered_records = []
-        for record in records:
-            # if record does not meet any one qualifying criterion,
-            # then skip over it and continue the loop
-            if name and record['name'] != name:
-                continue
-            if record_type and record['type'] != record_type:
-                continue
-            if value and record['value'] != value:
-                continue
-            # if the record has not fail any of the qualifications,
-            # then add it to the list
-            filtered_records.append(record)
+        records = record_list(hetzner_dns_token=hetzner_dns_token,
+                              zone_id=zone_id,
+                              as_record_set=True)
+
+        # get the records that match all of the given parameters
+        filtered_records = [record.to_dict() for record in
+                            records.query(name=name,
+                                          record_type=record_type,
+                                          value=value)]
 
     # if no records found, return empty dictionary
     if len(filtered_records) == 0:
@@ -237,7 +370,7 @@ def record_get(hetzner_dns_token=None,
 
         # when running via the terminal, print output to console then exit
         if __name__ == '__main__':
-            print(json.dumps(filtered_records[0]))
+            json_codec.print_json(filtered_records[0])
             sys.exit(0)  # exit successfully
         return filtered_records[0]
 
@@ -256,7 +389,7 @@ def record_get(hetzner_dns_token=None,
 
             # when running via the terminal, print output to console then exit
             if __name__ == '__main__':
-                print(json.dumps(filtered_records[0]))
+                json_codec.print_json(filtered_records[0])
                 sys.exit(0)  # exit successfully
             return filtered_records[0]
         elif id_only and allow_multiple_records:
@@ -265,7 +398,7 @@ def record_get(hetzner_dns_token=None,
                 id_list.append(record['id'])
 
             if __name__ == '__main__':
-                print(json.dumps(id_list))
+                json_codec.print_json(id_list)
                 sys.exit(0)  # exit successfully
             else:
                 return id_list
@@ -274,7 +407,7 @@ def record_get(hetzner_dns_token=None,
             # when running via the terminal, print output to console,
             # then exit
             if __name__ == '__main__':
-                print(json.dumps(filtered_records))
+                json_codec.print_json(filtered_records)
                 sys.exit(0)  # exit successfully
             return filtered_records
         else:
@@ -1,20 +1,96 @@
 #!/usr/bin/python3
 
-import json
+import fnmatch
 import os
+import re
 import sys
-import requests
 
 from . import hetzner_dns_helpers as helpers
-from .zone_get import zone_get
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from . import lookup_planner
+from . import request_hooks
+from .disk_cache import get_disk_cache
+from .hetzner_dns_client import get_client
+from .record_set import RecordSet
+from .zone_list import zone_list
+from .zone_resolver import get_zone_resolver
 
+# the number of zones whose records are fetched at the same time
+DEFAULT_MAX_WORKERS = 4
 
-def record_list(hetzner_dns_token=None, zone_id=None, zone_name=None):
+
+def get_matching_zones(hetzner_dns_token, zone_names, use_cache=None):
+    """
+    Return the zones whose names match any of 'zone_names', using a single
+    listing of all zones.
+
+    - 'zone_names' may be a list, or a string separated by commas and/or
+      whitespace, and may contain glob patterns, e.g. '*.example.com'.
+    """
+    if isinstance(zone_names, str):
+        zone_names = re.split(r'[\s,]+', zone_names.strip())
+    patterns = [zone_name for zone_name in zone_names if zone_name]
+
+    zones = zone_list(hetzner_dns_token=hetzner_dns_token,
+                      use_cache=use_cache)['zones']
+
+    return [zone for zone in zones
+            if any(fnmatch.fnmatchcase(zone['name'], pattern)
+                   for pattern in patterns)]
+
+
+def iter_zone_records(hetzner_dns_token,
+                      zones,
+                      max_workers=DEFAULT_MAX_WORKERS,
+                      per_page=None,
+                      use_cache=None):
+    """
+    Fetch the records of many zones concurrently (up to 'max_workers' at a
+    time), and yield each zone and its list of records as soon as they
+    have been fetched.
+
+    - Each record is tagged with its zone's name, as 'zone_name'.
+    """
+    @request_hooks.in_current_context
+    def get_zone_records(zone):
+        records = record_list(hetzner_dns_token=hetzner_dns_token,
+                              zone_id=zone['id'],
+                              per_page=per_page,
+                              use_cache=use_cache)['records']
+        return [dict(record, zone_name=zone['name']) for record in records]
+
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(get_zone_records, zone): zone
+                   for zone in zones}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # don't fetch any more zones if the caller stops early
+            for future in futures:
+                future.cancel()
+
+
+def record_list(hetzner_dns_token=None,
+                zone_id=None,
+                zone_name=None,
+                per_page=None,
+                use_cache=None,
+                as_record_set=False,
+                stream=False,
+                zone_names=None,
+                max_workers=None,
+                explain=False):
     """
     Get list of all records.
     https://dns.hetzner.com/api-docs/#operation/GetRecords
 
     Required Parameters: One of: `zone_id` or `zone_name`
+    Optional Parameters: `per_page`, `use_cache`, `as_record_set`, `stream`,
+                         `zone_names`, `max_workers`, `explain`
 
 
     - Lookups for individual zones can be done using 'zone_name'
@@ -23,6 +99,41 @@ def record_list(hetzner_dns_token=None, zone_id=None, zone_name=None):
     - If no 'zone_name' or 'zone_id' is given, all records will
       be returned.
 
+    - If 'zone_names' passed in args or as environment variable
+      (ZONE_NAMES), return the records of every zone whose name matches
+      one of them. 'zone_names' may be a list, or a string separated by
+      commas, and may contain glob patterns (e.g. '*.example.com').
+        - The zones are found with a single listing of all zones, and
+          their records are fetched concurrently (up to 'max_workers' at
+          a time, default: 4). Each record is tagged with its zone's name,
+          as 'zone_name'.
+        - If 'stream' is truthy, each zone's records are yielded as soon
+          as they have been fetched, so zones may be out of order.
+
+    - All pages of results are fetched and merged into a single list.
+      The number of records requested per page can be set using
+      'per_page' (default: the API's default page size).
+
+    - If 'use_cache' passed in args or as environment variable
+      (HETZNER_DNS_CACHE), the records for a single zone are cached on
+      disk and reused by later calls (including other processes) until
+      they are older than HETZNER_DNS_CACHE_TTL seconds (default: 300),
+      or until a record in the zone is created, updated or deleted.
+
+    - If 'as_record_set' is truthy, return the records as a `RecordSet`,
+      which is indexed for fast lookups by name, type and value. (Python
+      only)
+
+    - If 'stream' is truthy, return an iterator that yields each record
+      as soon as the page that contains it has been fetched, instead of
+      waiting for all pages. Streamed records are not cached. (In Bash,
+      use 'hetzner-dns-tools record list --output ndjson')
+
+    - If 'explain' passed in args or as environment variable (EXPLAIN),
+      return the requests that would be sent, and how many requests will
+      be skipped because their results are cached (see `lookup_planner`),
+      without sending any of them.
+
     * hetzner_dns_token *MUST* be passed in args or as environment
       variable (HETZNER_DNS_TOKEN). You can get a DNS API token
       here: https://dns.hetzner.com/settings/api-token
@@ -48,22 +159,76 @@ def record_list(hetzner_dns_token=None, zone_id=None, zone_name=None):
         # get zone_name from environment variable
         zone_name = os.environ['ZONE_NAME']
 
+    if per_page is None and os.environ.get('PER_PAGE'):
+        # get per_page from environment variable
+        per_page = int(os.environ['PER_PAGE'])
+
+    if zone_names is None and os.environ.get('ZONE_NAMES'):
+        # get zone_names from environment variable
+        zone_names = os.environ['ZONE_NAMES']
+
+    if max_workers is None:
+        # get max_workers from environment variable
+        max_workers = int(os.environ.get('MAX_WORKERS', DEFAULT_MAX_WORKERS))
+
+    if not explain and os.environ.get('EXPLAIN'):
+        # get explain from environment variable
+        explain = os.environ['EXPLAIN']
+
+    # return the planned requests without sending them
+    if explain:
+        plan = lookup_planner.plan_record_list(
+            hetzner_dns_token=hetzner_dns_token,
+            zone_id=zone_id,
+            zone_name=zone_name,
+            per_page=per_page,
+            use_cache=use_cache,
+            stream=stream,
+            zone_names=zone_names).to_dict()
+
+        # when running via the terminal, print output to console then exit
+        if __name__ == '__main__':
+            json_codec.print_json(plan)
+            sys.exit(0)  # exit successfully
+        return plan
+
+    # fetch the records of many zones at once
+    if zone_names and not zone_id and not zone_name:
+        zones = get_matching_zones(hetzner_dns_token, zone_names, use_cache)
+        zone_records = iter_zone_records(hetzner_dns_token,
+                                         zones,
+                                         max_workers=max_workers,
+                                         per_page=per_page,
+                                         use_cache=use_cache)
+        if stream:
+            return (record for _, records in zone_records
+                    for record in records)
+
+        # merge the records in the same order as the zones
+        records_by_zone_id = {zone['id']: records
+                              for zone, records in zone_records}
+        records = [record for zone in zones
+                   for record in records_by_zone_id[zone['id']]]
+
+        if __name__ == '__main__':
+            # when running via the terminal, print output to console then exit
+            json_codec.print_json({'records': records})
+            sys.exit(0)  # exit successfully
+
+        if as_record_set:
+            return RecordSet(records)
+
+        return {'records': records}
+
     # if zone_name exists, use it to obtain zone (skip if zone_id exists)
     if (zone_name or 'ZONE_NAME' in os.environ) and not zone_id:
 
-        try:
-            # get the desired zone
-            response_dict = zone_get(zone_name=zone_name)
-        except ValueError:
-            # if no matching zone found, halt and notify of error
-            helpers.exit_with_error("record not found")
+        # get the ID of the matching zone
+        zone_id = get_zone_resolver(hetzner_dns_token).get_zone_id(zone_name)
 
-        # check response for errors
-        helpers.check_response_for_errors(response_dict)
-
-        # get the zone_id
-        zone = response_dict['zone']
-        zone_id = zone['id']
+        # if no matching zone found, halt and notify of error
+        if zone_id is None:
+            helpers.exit_with_error("zone not found")
 
     # get zone_id from environment variable
     if zone_id is None:
@@ -75,22 +240,37 @@ def record_list(hetzner_dns_token=None, zone_id=None, zone_name=None):
         if zone_id:
             params['zone_id'] = zone_id
 
-        # get response
-        response = requests.get(url='https://dns.hetzner.com/api/v1/records',
-                                params=params,
-                                headers={'Auth-API-Token': hetzner_dns_token})
+        if stream:
+            return get_client(hetzner_dns_token)\
+                .iter_items('/records', 'records',
+                            params=params,
+                            per_page=per_page)
 
-        decoded_response = response.content.decode('utf-8')
-        response_dict = json.loads(decoded_response)
+        def get_response():
+            return get_client(hetzner_dns_token)\
+                .get_all_pages('/records', 'records',
+                               params=params,
+                               per_page=per_page)
+
+        # get response (only listings for a single zone are cached)
+        if zone_id:
+            response_dict =\
+                get_disk_cache(hetzner_dns_token, enabled=use_cache)\
+                .get_or_fetch(f"records-{zone_id}", get_response)
+        else:
+            response_dict = get_response()
 
         # check response for errors
         helpers.check_response_for_errors(response_dict)
 
         if __name__ == '__main__':
             # when running via the terminal, print output to console then exit
-            print(decoded_response)
+            json_codec.print_json(response_dict)
             sys.exit(0)  # exit successfully
 
+        if as_record_set:
+            return RecordSet(response_dict['records'])
+
         return response_dict
 
     except requests.exceptions.RequestException as err:
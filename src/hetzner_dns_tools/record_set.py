@@ -0,0 +1,136 @@
+def get_record_key(record):
+    """
+    Return the normalized ('name', 'type', 'value') of a record dictionary,
+    which is the same for records that the API treats as equal.
+
+    - The API may return names and values differently from how they were
+      sent (e.g. 'WWW' -> 'www', 'mail.your-domain.com.' ->
+      'mail.your-domain.com', and TXT values with or without quotes).
+    - The type may be given as 'type' or 'record_type'.
+    """
+    record_type = str(record.get('record_type') or record.get('type')
+                      or '').upper()
+    name = str(record.get('name') or '@').rstrip('.').lower()
+    value = str(record.get('value') if record.get('value') is not None
+                else '').strip()
+    if record_type == 'TXT':
+        value = value.strip('"')
+    else:
+        value = value.rstrip('.').lower()
+    return (name, record_type, value)
+
+
+class Record:
+    """
+    A single DNS record.
+
+    Records use `__slots__`, so they take up much less memory than the
+    dictionaries returned by the API. Use `to_dict` to convert a record
+    back into the API's format.
+    """
+
+    __slots__ = ('id', 'zone_id', 'type', 'name', 'value', 'ttl',
+                 'created', 'modified')
+
+    def __init__(self, id=None, zone_id=None, type=None, name=None,
+                 value=None, ttl=None, created=None, modified=None):
+        self.id = id
+        self.zone_id = zone_id
+        self.type = type
+        self.name = name
+        self.value = value
+        self.ttl = ttl
+        self.created = created
+        self.modified = modified
+
+    @classmethod
+    def from_dict(cls, record_dict):
+        """Create a record from a dictionary returned by the API."""
+        return cls(**{key: record_dict.get(key) for key in cls.__slots__})
+
+    def to_dict(self):
+        """Convert the record to the API's format (omitting empty fields)."""
+        return {key: getattr(self, key) for key in self.__slots__
+                if getattr(self, key) is not None}
+
+    def __repr__(self):
+        return f"Record(id={self.id!r}, name={self.name!r}, "\
+            f"type={self.type!r}, value={self.value!r})"
+
+
+class RecordSet:
+    """
+    A list of records with hash indexes on 'name', 'type', 'value' and
+    ('name', 'type'), for fast lookups.
+
+    The indexes are built once, when the RecordSet is created. Queries
+    that use more than one filter are answered by intersecting the
+    matching indexes, instead of comparing every record.
+
+        records = record_list(zone_id='your-zone-id', as_record_set=True)
+        www_records = records.query(name='www', record_type='A')
+
+    - Records are returned in the same order as they were given.
+    """
+
+    def __init__(self, records=()):
+        self.records = [record if isinstance(record, Record)
+                        else Record.from_dict(record) for record in records]
+
+        # each index maps a value to the positions of the matching records
+        self._by_id = {}
+        self._by_name = {}
+        self._by_type = {}
+        self._by_value = {}
+        self._by_name_and_type = {}
+        for position, record in enumerate(self.records):
+            self._by_id[record.id] = position
+            self._by_name.setdefault(record.name, []).append(position)
+            self._by_type.setdefault(record.type, []).append(position)
+            self._by_value.setdefault(record.value, []).append(position)
+            self._by_name_and_type\
+                .setdefault((record.name, record.type), []).append(position)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def get(self, record_id):
+        """Return the record with a matching ID, or None."""
+        position = self._by_id.get(record_id)
+        return None if position is None else self.records[position]
+
+    def query(self, name=None, record_type=None, value=None):
+        """
+        Return a list of records that match all of the given filters.
+
+        If no filters are given, all records are returned.
+        """
+        indexes = []
+        if name and record_type:
+            indexes.append(self._by_name_and_type.get((name, record_type), []))
+        elif name:
+            indexes.append(self._by_name.get(name, []))
+        elif record_type:
+            indexes.append(self._by_type.get(record_type, []))
+        if value:
+            indexes.append(self._by_value.get(value, []))
+
+        if not indexes:
+            return list(self.records)
+
+        # intersect the indexes, starting with the smallest one
+        indexes.sort(key=len)
+        positions = indexes[0]
+        for index in indexes[1:]:
+            if not positions:
+                break
+            positions = set(positions).intersection(index)
+
+        return [self.records[position] for position in sorted(positions)]
+
+    def to_list(self):
+        """Convert all records to the API's format."""
+        return [record.to_dict() for record in self.records]
@@ -2,11 +2,15 @@
 
 import json
 import os
-import requests
 import sys
 
 from . import hetzner_dns_helpers as helpers
-from .zone_list import zone_list
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from . import lookup_planner
+from .disk_cache import get_disk_cache
+from .hetzner_dns_client import get_client
+from .zone_resolver import get_zone_resolver
 from .record_list import record_list
 
 
@@ -19,7 +23,8 @@ def record_update(hetzner_dns_token=None,
                   zone_id=None,
                   zone_name=None,
                   debug=0,
-                  id_only=False):
+                  id_only=False,
+                  explain=False):
     """
     Update a record.
     https://dns.hetzner.com/api-docs/#operation/UpdateRecord
@@ -28,14 +33,24 @@ def record_update(hetzner_dns_token=None,
       - `hetzner_dns_token`, `record_type`, `value`, `zone_id`, `record_id`
 
     Optional Parameters:
-      - `ttl`
+      - `ttl`, `explain`
 
 
     * hetzner_dns_token *MUST* be passed in args or as environment
       variable (HETZNER_DNS_TOKEN). You can get a DNS API token
       here: https://dns.hetzner.com/settings/api-token
 
-    * If name is not passed, then '@' will be used.
+    * If name is not passed, then '@' will be used, unless 'record_id' is
+      passed, in which case the record keeps its current name.
+
+    - If 'record_id' is not passed, then the record is found by its 'name'
+      and 'record_type', using the records of the given zone only.
+
+    - If 'zone_id' is passed, then 'zone_name' is not looked up.
+
+    - If 'explain' passed in args or as environment variable (EXPLAIN),
+      return the requests that would be sent (see `lookup_planner`),
+      without sending any of them.
 
     * MX records must be given a priority and server using the
       'value' field.
@@ -61,16 +76,15 @@ def record_update(hetzner_dns_token=None,
 
     if record_type is None:
         # get record_type from environment variable
-        record_type = os.environ['RECORD_TYPE']\
-            if os.environ.get('RECORD_TYPE') else os.environ['TYPE']
+        record_type = os.environ.get('RECORD_TYPE') or os.environ.get('TYPE')
 
-    if name is None:
+    if name is None and os.environ.get('NAME'):
         # get name from environment variable
-        name = os.environ['NAME'] if os.environ.get('NAME') else '@'
+        name = os.environ['NAME']
 
     if value is None:
         # get value from environment variable
-        value = os.environ['VALUE']
+        value = os.environ.get('VALUE')
 
     if ttl is None:
         if os.environ.get('TTL'):
@@ -84,73 +98,106 @@ def record_update(hetzner_dns_token=None,
         # get zone name from environment variable
         zone_name = os.environ['ZONE_NAME']
 
-    if name is None and os.environ.get('NAME'):
-        # get record name from environment variable
-        name = os.environ['NAME']
-
     if debug == 0 and os.environ.get('DEBUG'):
         # get debug from environment variable
         debug = int(os.environ['DEBUG'])
 
-    # if zone_name exists, use it to obtain the zone_id
-    if zone_name:
+    if zone_id is None and os.environ.get('ZONE_ID'):
+        # get zone_id from environment variable
+        zone_id = os.environ['ZONE_ID']
 
-        # get list of zones
-        response_dict = zone_list()
+    if record_id is None and os.environ.get('RECORD_ID'):
+        # get record_id from environment variable
+        record_id = os.environ['RECORD_ID']
 
-        # check response for errors
-        helpers.check_response_for_errors(response_dict)
+    if not explain and os.environ.get('EXPLAIN'):
+        # get explain from environment variable
+        explain = os.environ['EXPLAIN']
 
-        # check for matching zone
-        dns_zones = response_dict['zones']
-        for zone in dns_zones:
-            if zone['name'] == zone_name:
-                zone_id = zone['id']
-                break
+    if not zone_name and not zone_id:
+        # if neither zone_name or zone_id exist, then exit with error
+        helpers.exit_with_error("Must include one of: zone_id, zone_name")
+
+    # return the planned requests without sending them
+    if explain:
+        plan = lookup_planner.plan_record_update(
+            hetzner_dns_token=hetzner_dns_token,
+            record_id=record_id,
+            zone_id=zone_id,
+            zone_name=zone_name,
+            record_type=record_type,
+            name=name or (None if record_id else '@')).to_dict()
+
+        # when running via the terminal, print output to console then exit
+        if __name__ == '__main__':
+            json_codec.print_json(plan)
+            sys.exit(0)  # exit successfully
+        return plan
+
+    # the planned requests don't depend on the new record, so it is only
+    # checked when the record is actually updated
+    if not record_type:
+        helpers.exit_with_error(
+            "Must include: record_type (environment variable: TYPE)")
+
+    if not value:
+        helpers.exit_with_error("Must include: value")
+
+    # if zone_name exists, use it to obtain the zone_id (skip if zone_id
+    # exists)
+    if zone_name and not zone_id:
+
+        # get the ID of the matching zone
+        zone_id = get_zone_resolver(hetzner_dns_token).get_zone_id(zone_name)
 
         # if no matching zone found, then exit with error
         if zone_id is None:
             helpers.exit_with_error("zone not found")
 
-    if not zone_name and not zone_id and not os.environ.get('ZONE_ID'):
-        # if neither zone_name or zone_id exist, then exit with error
-        helpers.exit_with_error("Must include one of: zone_id, zone_name")
-    if zone_id is None:
-        # get zone_id from environment variable
-        zone_id = os.environ['ZONE_ID']
-
-    # if name exists, use it to obtain the record_id
-    if name:
-
-        # get list of records
-        response_dict = record_list()
+    if not name and record_id:
+        # keep the record's current name, since a PUT replaces every field
+        try:
+            response_dict = get_client(hetzner_dns_token).get_json(
+                f'/records/{record_id}')
+        except requests.exceptions.RequestException as err:
+            helpers.handle_request_exception(err)
 
         # check response for errors
         helpers.check_response_for_errors(response_dict)
 
+        name = response_dict['record']['name']
+    elif not name:
+        name = '@'
+
+    # if name exists, use it to obtain the record_id (skip if record_id exists)
+    if name and not record_id:
+
+        # get list of records in the zone
+        records = record_list(hetzner_dns_token=hetzner_dns_token,
+                              zone_id=zone_id,
+                              as_record_set=True)
+
         # check for matching record in zone
-        dns_records = response_dict['records']
-        record_id_count = 0
-        for record in dns_records:
-            if record['name'] == name and record['type'] == record_type:
-                record_id = record['id']
-                record_id_count += 1
+        matching_record_ids = [record.id for record in
+                               records.query(name=name,
+                                             record_type=record_type)]
 
         # if no matching name found, then exit with error
-        if record_id is None:
+        if not matching_record_ids:
             helpers.exit_with_error("name not found in records")
 
-        # if no matching name found, then exit with error
-        if record_id_count > 1:
-            helpers.exit_with_error("more than one record found for name and type, record_id must be provided")
+        # if more than one matching record found, then exit with error
+        if len(matching_record_ids) > 1:
+            helpers.exit_with_error(
+                "more than one record found for name and type, record_id "
+                "must be provided")
 
-    if record_id is None:
-        # get record_id from environment variable
-        record_id = os.environ['RECORD_ID']
+        record_id = matching_record_ids[0]
 
     if record_id is None:
         # if record_id exist, then exit with error
-        helpers.exit_with_error("Must include (or able to retrieve): record_id")
+        helpers.exit_with_error(
+            "Must include (or able to retrieve): record_id")
 
     try:
         params = {'ttl': ttl,
@@ -163,13 +210,10 @@ def record_update(hetzner_dns_token=None,
             print("DEBUG : request: record_id=%s" % record_id, file=sys.stderr)
             print(json.dumps(params), file=sys.stderr)
 
-        response = requests.put(url='https://dns.hetzner.com/api/v1/records/' + record_id,
-                                 headers={'Content-Type': 'application/json',
-                                          'Auth-API-Token': hetzner_dns_token},
-                                 data=json.dumps(params))
+        response = get_client(hetzner_dns_token).put(
+            f'/records/{record_id}', data=params)
 
-        decoded_response = response.content.decode('utf-8')
-        response_dict = json.loads(decoded_response)
+        response_dict = json_codec.loads(response.content)
         if debug > 0:
             print("DEBUG : response:", file=sys.stderr)
             print(json.dumps(response_dict), file=sys.stderr)
@@ -177,9 +221,12 @@ def record_update(hetzner_dns_token=None,
         # check response for errors
         helpers.check_response_for_errors(response_dict)
 
+        # the zone's cached records are now out of date
+        get_disk_cache(hetzner_dns_token).invalidate_zone(zone_id)
+
         # return all zone data
         if __name__ == '__main__':
-            print(json.dumps(response_dict))
+            json_codec.print_json(response_dict)
             sys.exit(0)  # exit successfully
 
         return response_dict
@@ -0,0 +1,300 @@
+#!/usr/bin/python3
+
+import collections
+import os
+import sys
+
+from . import hetzner_dns_helpers as helpers
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from .disk_cache import get_disk_cache
+from .hetzner_dns_client import get_client
+from .record_create_bulk import DEFAULT_CHUNK_SIZE, chunk_list, parse_records
+from .record_list import record_list
+from .record_set import RecordSet
+from .zone_resolver import get_zone_resolver
+
+
+def reject_duplicates(results, indexes_and_keys, error):
+    """
+    Mark every record whose key is shared with another record as 'failed'
+    with the given 'error' (formatted with the key), since a record can't
+    be updated twice in the same request.
+
+    - Returns the indexes of the records that were rejected.
+    """
+    indexes_and_keys = [(index, key) for index, key in indexes_and_keys
+                        if key]
+    key_counts = collections.Counter(key for _, key in indexes_and_keys)
+    rejected_indexes = set()
+    for index, key in indexes_and_keys:
+        if key_counts[key] > 1:
+            results[index] = {'status': 'failed',
+                              'error': error.format(key)}
+            rejected_indexes.add(index)
+    return rejected_indexes
+
+
+def record_update_bulk(hetzner_dns_token=None,
+                       records=None,
+                       chunk_size=None):
+    """
+    Update many records, using as few requests as possible.
+    https://dns.hetzner.com/api-docs/#operation/BulkUpdateRecords
+
+    Required Parameters: `records`
+
+    Optional Parameters: `chunk_size`
+
+
+    * hetzner_dns_token *MUST* be passed in args or as environment
+      variable (HETZNER_DNS_TOKEN). You can get a DNS API token
+      here: https://dns.hetzner.com/settings/api-token
+
+    * records may be a list of dictionaries, or a string containing
+      JSON, NDJSON or CSV (with a header row). In Bash, they are read
+      from stdin, or from the file in the RECORDS_FILE environment
+      variable.
+        - Each record is found by its 'record_id' (or 'id'), *OR* by its
+          'name' and 'record_type' (or 'type'), in the zone given by
+          'zone_id' or 'zone_name'. Records that are found by
+          'record_id' without a zone are found in a single listing of
+          the records of all zones.
+        - Each record may only be changed once, whether it is found by
+          'record_id' or by 'name' and 'record_type'.
+        - The new 'value' and/or 'ttl' is given in the same record.
+        - e.g. [{"zone_name": "your-domain.com", "record_type": "A",
+                 "name": "www", "value": "2.2.2.2"}]
+
+    - Each zone's records are only listed once, no matter how many
+      records are updated in it. Records found by 'record_id' that
+      include all of 'zone_id', 'record_type', 'name' and 'value' do not
+      need to be looked up at all.
+
+    - Records are sent in bulk requests of 'chunk_size' records each
+      (default: 100).
+
+    - Returns a dictionary containing the number of records that were
+      'updated' and that 'failed', and a list of 'results' (in the same
+      order as 'records'). Each result has a 'status' of 'updated' (with
+      the updated 'record'), 'invalid' (rejected by the API), or 'failed'
+      (with an 'error', e.g. if the record could not be found).
+
+    - If using Bash environment variables, ensure that values are assigned
+      in ALL_CAPS.
+        - e.g. zone_id in Python -> ZONE_ID in environment variable
+    """
+    if os.environ.get('SHOW_HELP'):
+        # print the docstring and exit
+        print(record_update_bulk.__doc__)
+        sys.exit(0)
+
+    if hetzner_dns_token is None:
+        # get token from environment variable
+        hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+    if records is None:
+        # get records from a file or from stdin
+        if os.environ.get('RECORDS_FILE'):
+            with open(os.environ['RECORDS_FILE']) as records_file:
+                records = records_file.read()
+        else:
+            records = sys.stdin.read()
+
+    if isinstance(records, str):
+        records = parse_records(records)
+
+    if chunk_size is None:
+        # get chunk_size from environment variable
+        chunk_size = int(os.environ.get('CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+
+    results = [None] * len(records)
+
+    # a record can't be updated twice in the same request
+    record_ids = [record.get('record_id') or record.get('id')
+                  for record in records]
+    reject_duplicates(results, enumerate(record_ids),
+                      "record_id '{}' is given more than once")
+
+    # get the ID of each record's zone
+    zone_resolver = get_zone_resolver(hetzner_dns_token)
+    zone_ids = [None] * len(records)
+    for index, record in enumerate(records):
+        if results[index] is not None:
+            continue
+        zone_ids[index] = record.get('zone_id')
+        if not zone_ids[index] and record.get('zone_name'):
+            zone_ids[index] = zone_resolver.get_zone_id(record['zone_name'])
+            if zone_ids[index] is None:
+                results[index] = {'status': 'failed',
+                                  'error': "zone not found"}
+
+    # list the records of each zone that has records that must be looked up
+    record_sets = {}
+    for index, record in enumerate(records):
+        zone_id = zone_ids[index]
+        record_id = record_ids[index]
+        is_complete = record_id and zone_id and record.get('name')\
+            and (record.get('record_type') or record.get('type'))\
+            and record.get('value')
+        if results[index] is None and zone_id and not is_complete\
+                and zone_id not in record_sets:
+            record_sets[zone_id] = record_list(
+                hetzner_dns_token=hetzner_dns_token,
+                zone_id=zone_id,
+                as_record_set=True)
+
+    # find the records that are given by ID without a zone, using a single
+    # listing of the records of all zones (instead of one request per ID)
+    unzoned_indexes = [index for index in range(len(records))
+                       if results[index] is None and record_ids[index]
+                       and not zone_ids[index]]
+    if unzoned_indexes:
+        try:
+            response_dict = get_client(hetzner_dns_token)\
+                .get_all_pages('/records', 'records')
+
+            # check response for errors
+            helpers.check_response_for_errors(response_dict)
+
+            all_records = RecordSet(response_dict['records'])
+
+        except (ValueError, KeyError,
+                requests.exceptions.RequestException) as err:
+            for index in unzoned_indexes:
+                results[index] = {'status': 'failed', 'error': str(err)}
+            all_records = RecordSet()
+
+        for index in unzoned_indexes:
+            existing_record = all_records.get(record_ids[index])
+            if existing_record is not None:
+                zone_ids[index] = existing_record.zone_id
+                record_sets.setdefault(existing_record.zone_id, all_records)
+            elif results[index] is None:
+                results[index] = {'status': 'failed',
+                                  'error': "record not found"}
+
+    # build the request data for each record
+    valid_records = []  # (index, request data)
+    for index, record in enumerate(records):
+        if results[index] is not None:
+            continue
+
+        zone_id = zone_ids[index]
+        record_id = record_ids[index]
+        record_type = record.get('record_type') or record.get('type')
+        name = record.get('name')
+
+        try:
+            ttl = int(record['ttl']) if record.get('ttl') else None
+        except (TypeError, ValueError):
+            results[index] = {'status': 'failed',
+                              'error': f"invalid ttl: {record.get('ttl')!r}"}
+            continue
+
+        # find the existing record
+        existing_record = None
+        if zone_id in record_sets:
+            if record_id:
+                existing_record = record_sets[zone_id].get(record_id)
+            elif name and record_type:
+                matching_records = record_sets[zone_id]\
+                    .query(name=name, record_type=record_type)
+                if len(matching_records) > 1:
+                    results[index] = {
+                        'status': 'failed',
+                        'error': "more than one record found for name and "
+                                 "type, record_id must be provided"}
+                    continue
+                if matching_records:
+                    existing_record = matching_records[0]
+
+        if existing_record is not None:
+            data = existing_record.to_dict()
+            data.pop('created', None)
+            data.pop('modified', None)
+        elif record_id and zone_id and zone_id not in record_sets:
+            # the record is complete, so it doesn't need to be looked up
+            data = {'id': record_id}
+        elif not zone_id:
+            results[index] = {
+                'status': 'failed',
+                'error': "Must include one of: zone_id, zone_name"}
+            continue
+        else:
+            results[index] = {'status': 'failed',
+                              'error': "record not found"}
+            continue
+
+        # apply the changes
+        data['zone_id'] = zone_id
+        for key, value in (('type', record_type),
+                           ('name', name),
+                           ('value', record.get('value')),
+                           ('ttl', ttl)):
+            if value:
+                data[key] = value
+
+        valid_records.append((index, data))
+
+    # two changes may find the same record in different ways, e.g. by ID
+    # and by name, so check again now that every record has been found
+    rejected_indexes = reject_duplicates(
+        results, [(index, data['id']) for index, data in valid_records],
+        "record '{}' is changed more than once")
+    valid_records = [(index, data) for index, data in valid_records
+                     if index not in rejected_indexes]
+
+    # send the records in bulk requests
+    client = get_client(hetzner_dns_token)
+    for chunk in chunk_list(valid_records, chunk_size):
+        try:
+            response = client.put(
+                '/records/bulk', data={'records': [d for _, d in chunk]})
+
+            response_dict = json_codec.loads(response.content)
+
+            # check response for errors
+            helpers.check_response_for_errors(response_dict)
+
+        except (ValueError, requests.exceptions.RequestException) as err:
+            for index, _ in chunk:
+                results[index] = {'status': 'failed', 'error': str(err)}
+            continue
+
+        # match the records in the response to the records that were sent
+        index_by_id = {data['id']: index for index, data in chunk}
+        for status, response_records in (
+                ('updated', response_dict.get('records') or []),
+                ('invalid', response_dict.get('failed_records') or [])):
+            for response_record in response_records:
+                index = index_by_id.get(response_record.get('id'))
+                if index is not None:
+                    results[index] = {'status': status,
+                                      'record': response_record}
+
+        for index, _ in chunk:
+            if results[index] is None:
+                results[index] = {'status': 'failed',
+                                  'error': "record was not updated"}
+
+    # the cached records of the affected zones are now out of date
+    disk_cache = get_disk_cache(hetzner_dns_token)
+    for zone_id in {data['zone_id'] for _, data in valid_records}:
+        disk_cache.invalidate_zone(zone_id)
+
+    updated_count = sum(result['status'] == 'updated' for result in results)
+    result = {'updated': updated_count,
+              'failed': len(results) - updated_count,
+              'results': results}
+
+    # when running via the terminal, print output to console then exit
+    if __name__ == '__main__':
+        json_codec.print_json(result)
+        sys.exit(1 if result['failed'] else 0)
+
+    return result
+
+
+if __name__ == '__main__':
+    record_update_bulk()
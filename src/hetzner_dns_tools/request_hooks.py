@@ -0,0 +1,174 @@
+import contextlib
+import contextvars
+import re
+import sys
+import threading
+
+from .rate_limit import get_rate_limit_remaining
+
+# the events that callbacks can be added for
+HOOK_EVENTS = ('before_request', 'after_request')
+
+# IDs in paths are replaced, so that requests can be grouped by endpoint
+ENDPOINT_PATTERNS = [
+    (re.compile(r'^/zones/(?!file/)[^/]+'), '/zones/{id}'),
+    (re.compile(r'^/records/(?!bulk$)[^/]+$'), '/records/{id}'),
+]
+
+_hooks = {event: () for event in HOOK_EVENTS}
+_hooks_lock = threading.Lock()
+
+_operation = contextvars.ContextVar('hetzner_dns_operation', default=None)
+
+
+def add_hook(event, callback):
+    """
+    Call a function for every request sent by any client (including the
+    asyncio clients).
+
+    - 'before_request' callbacks are called before each request is sent,
+      and 'after_request' callbacks are called after each response is
+      received (or the request fails). Retries are separate requests.
+    - The callback is passed a dictionary describing the request:
+        - 'method', 'path' and 'url' of the request, and its 'endpoint',
+          in which IDs are replaced by '{id}' (e.g. '/zones/{id}')
+        - 'operation': the name given to `operation` (or None)
+        - 'retries': the number of times the request has been retried
+        - 'bytes_sent': the size of the request body (or None if unknown)
+      'after_request' callbacks are also passed:
+        - 'status': the response's status code (or None if it failed)
+        - 'bytes_received': the size of the response body (or None if it
+          is streamed)
+        - 'latency': the number of seconds taken to receive the response
+        - 'rate_limit_remaining': the number of requests remaining in the
+          current rate limit window (or None)
+        - 'error': the error message if the request failed (or None)
+
+    Exceptions raised by a callback are not caught.
+    """
+    if event not in HOOK_EVENTS:
+        raise ValueError(f"Invalid hook event: '{event}' "
+                         f"(must be one of: {', '.join(HOOK_EVENTS)})")
+    with _hooks_lock:
+        _hooks[event] = _hooks[event] + (callback,)
+
+
+def remove_hook(event, callback):
+    """Stop calling a function that was added with `add_hook`."""
+    with _hooks_lock:
+        callbacks = list(_hooks.get(event, ()))
+        if callback in callbacks:
+            callbacks.remove(callback)
+            _hooks[event] = tuple(callbacks)
+
+
+def has_hooks():
+    """Return True if any callbacks have been added."""
+    return any(_hooks.values())
+
+
+def emit(event, request_info):
+    """Call every callback for an event."""
+    for callback in _hooks[event]:
+        callback(request_info)
+
+
+def get_endpoint(path):
+    """Return a path with its IDs replaced, e.g. '/zones/{id}/export'."""
+    for pattern, replacement in ENDPOINT_PATTERNS:
+        path, count = pattern.subn(replacement, path, count=1)
+        if count:
+            break
+    return path
+
+
+def get_body_size(data):
+    """Return the size of a request body in bytes, or None if unknown."""
+    if data is None:
+        return 0
+    if isinstance(data, bytes):
+        return len(data)
+    if isinstance(data, str):
+        return len(data.encode('utf-8'))
+    if hasattr(data, 'seekable') and data.seekable():
+        position = data.tell()
+        size = data.seek(0, 2) - position
+        data.seek(position)
+        return size
+    return None
+
+
+def start_request(method, path, url, retries, data):
+    """Return the information passed to 'before_request' callbacks."""
+    return {'method': method.upper(),
+            'path': path,
+            'url': url,
+            'endpoint': get_endpoint(path),
+            'operation': get_operation(),
+            'retries': retries,
+            'bytes_sent': get_body_size(data),
+            'status': None,
+            'bytes_received': None,
+            'latency': None,
+            'rate_limit_remaining': None,
+            'error': None}
+
+
+def finish_request(request_info, latency, status=None, headers=None,
+                   bytes_received=None, error=None):
+    """Add the result of a request to its information, and return it."""
+    request_info.update(
+        status=status,
+        bytes_received=bytes_received,
+        latency=latency,
+        rate_limit_remaining=get_rate_limit_remaining(headers)
+        if headers is not None else None,
+        error=str(error) if error is not None else None)
+    return request_info
+
+
+@contextlib.contextmanager
+def operation(name):
+    """
+    Label every request sent inside a `with` block with an operation name,
+    so that the requests of each logical operation can be counted.
+        - e.g. with operation('deploy'): record_update(...)
+
+    The name is also used by threads started by hetzner-dns-tools (e.g.
+    when deleting multiple records), and by asyncio tasks.
+    """
+    token = _operation.set(name)
+    try:
+        yield
+    finally:
+        _operation.reset(token)
+
+
+def get_operation():
+    """Return the name of the current operation, or None."""
+    return _operation.get()
+
+
+def in_current_context(function):
+    """
+    Wrap a function, so that it runs with the current operation name when
+    it is called from another thread (e.g. by a ThreadPoolExecutor).
+    """
+    context = contextvars.copy_context()
+
+    def wrapper(*args, **kwargs):
+        # each call gets its own copy, since calls may run at the same time
+        return context.copy().run(function, *args, **kwargs)
+
+    return wrapper
+
+
+def print_request(request_info):
+    """An 'after_request' callback that prints each request to stderr."""
+    status = request_info['status'] or request_info['error']
+    print(f"DEBUG : {request_info['method']} {request_info['path']} -> "
+          f"{status} ({request_info['latency'] * 1000:.1f} ms, "
+          f"{request_info['bytes_received']} bytes, "
+          f"retries={request_info['retries']}, "
+          f"rate_limit_remaining={request_info['rate_limit_remaining']})",
+          file=sys.stderr)
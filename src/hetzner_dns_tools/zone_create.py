@@ -1,25 +1,29 @@
 #!/usr/bin/python3
 
-import json
 import os
 import sys
-import requests
 
 from . import hetzner_dns_helpers as helpers
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from .disk_cache import get_disk_cache
+from .hetzner_dns_client import get_client
+from .zone_resolver import get_zone_resolver
 
 
 def zone_create(hetzner_dns_token=None,
                 name=None,
                 id_only=False,
                 ttl=None,
-                zone_name=None):
+                zone_name=None,
+                retry=False):
     """
     Create a new zone.
     https://dns.hetzner.com/api-docs/#operation/CreateZone
 
     Required Parameters: `name/zone_name`
       - `name` and `zone_name` are interchangeable in all zone functions
-    Optional Parameters: `ttl`
+    Optional Parameters: `ttl`, `retry`
 
 
     * hetzner_dns_token *MUST* be passed in args or as environment
@@ -35,6 +39,11 @@ def zone_create(hetzner_dns_token=None,
     - If 'id_only' passed in args or as environment variable (ID_ONLY),
       return just the zone ID after creating the new zone.
 
+    - If 'retry' passed in args or as environment variable (RETRY), retry
+      the request after connection errors, timeouts and 5xx responses.
+      This is not done by default, since a retried request fails if the
+      first one reached the API and created the zone.
+
     - If using Bash environment variables, ensure that values are assigned
       in ALL_CAPS.
           - e.g. zone_id in Python -> ZONE_ID in environment variable
@@ -66,18 +75,22 @@ def zone_create(hetzner_dns_token=None,
             ttl = 86400
 
     try:
-        response = requests.post(url='https://dns.hetzner.com/api/v1/zones',
-                                 headers={'Content-Type': 'application/json',
-                                          'Auth-API-Token': hetzner_dns_token},
-                                 data=json.dumps({'name': name,
-                                                  'ttl': ttl}))
+        response = get_client(hetzner_dns_token).post(
+            '/zones',
+            data={'name': name, 'ttl': ttl},
+            retry=retry or os.environ.get('RETRY') == '1')
 
-        decoded_response = response.content.decode('utf-8')
-        response_dict = json.loads(decoded_response)
+        response_dict = json_codec.loads(response.content)
 
         # check response for errors
         helpers.check_response_for_errors(response_dict)
 
+        # add the new zone to the zone cache
+        get_zone_resolver(hetzner_dns_token).add_zone(response_dict['zone'])
+        disk_cache = get_disk_cache(hetzner_dns_token)
+        disk_cache.invalidate('zones')
+        disk_cache.invalidate_zone_names(zone_name=name)
+
         # return the expected value
         if id_only or os.environ.get('ID_ONLY') == '1':
             # return the zone_id
@@ -91,7 +104,7 @@ def zone_create(hetzner_dns_token=None,
         else:
             # return all zone data
             if __name__ == '__main__':
-                print(json.dumps(response_dict))
+                json_codec.print_json(response_dict)
                 sys.exit(0)  # exit successfully
 
             return response_dict
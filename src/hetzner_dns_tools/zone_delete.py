@@ -1,12 +1,14 @@
 #!/usr/bin/python3
 
-import json
 import os
 import sys
-import requests
 
 from . import hetzner_dns_helpers as helpers
-from .zone_list import zone_list
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from .disk_cache import get_disk_cache
+from .hetzner_dns_client import get_client
+from .zone_resolver import get_zone_resolver
 
 
 def zone_delete(hetzner_dns_token=None,
@@ -56,18 +58,8 @@ def zone_delete(hetzner_dns_token=None,
     # if zone_name exists, use it to obtain zone (skip if zone_id exists)
     if zone_name and not zone_id:
 
-        # get list of zones
-        response_dict = zone_list()
-
-        # check response for errors
-        helpers.check_response_for_errors(response_dict)
-
-        # check for matching zone
-        dns_zones = response_dict['zones']
-        for zone in dns_zones:
-            if zone['name'] == zone_name:
-                zone_id = zone['id']
-                break
+        # get the ID of the matching zone
+        zone_id = get_zone_resolver(hetzner_dns_token).get_zone_id(zone_name)
 
         # if no matching zone found, halt and notify of error
         if zone_id is None:
@@ -82,16 +74,20 @@ def zone_delete(hetzner_dns_token=None,
         zone_id = os.environ['ZONE_ID']
 
     try:
-        response = requests.delete(
-            url=f'https://dns.hetzner.com/api/v1/zones/{zone_id}',
-            headers={'Auth-API-Token': hetzner_dns_token})
+        response = get_client(hetzner_dns_token).delete(f'/zones/{zone_id}')
 
-        decoded_response = response.content.decode('utf-8')
-        response_dict = json.loads(decoded_response)
+        response_dict = json_codec.loads(response.content)
 
         # check response for errors
         helpers.check_response_for_errors(response_dict)
 
+        # remove the deleted zone from the zone cache
+        get_zone_resolver(hetzner_dns_token).invalidate(zone_id=zone_id)
+        disk_cache = get_disk_cache(hetzner_dns_token)
+        disk_cache.invalidate('zones')
+        disk_cache.invalidate_zone_names(zone_name=zone_name, zone_id=zone_id)
+        disk_cache.invalidate_zone(zone_id)
+
         # when running via the terminal, print output to console
         if __name__ == '__main__':
             print("OK")
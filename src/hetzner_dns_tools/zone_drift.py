@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+
+import collections
+import hashlib
+import json
+import os
+import sys
+
+from . import json_codec
+from . import request_hooks
+from .disk_cache import DiskCache
+from .record_delete import DEFAULT_MAX_WORKERS
+from .record_list import record_list
+from .zone_list import zone_list
+from .record_set import get_record_key
+from .zone_sync import normalize_record
+
+# the disk cache key that the last-known state of each zone is stored in
+FINGERPRINTS_KEY = 'fingerprints'
+
+
+def get_normalized_records(records):
+    """
+    Return a zone's records as a sorted list of [name, type, value, ttl],
+    so that the same records always give the same result, whatever order
+    they were listed in.
+    """
+    normalized_records = []
+    for record in records:
+        normalized_records.append([*get_record_key(record),
+                                   normalize_record(record)['ttl']])
+
+    return sorted(normalized_records, key=json.dumps)
+
+
+def get_fingerprint(normalized_records):
+    """Return a SHA-256 hash of a zone's normalized records."""
+    # always use the standard library, so the output never depends on the
+    # JSON backend that is installed
+    return hashlib.sha256(
+        json.dumps(normalized_records, separators=(',', ':'))
+        .encode('utf-8')).hexdigest()
+
+
+def get_record_diff(old_records, new_records):
+    """
+    Return the normalized records that were 'added' and 'removed' between
+    two lists of normalized records.
+    """
+    old_counts = collections.Counter(tuple(record) for record in old_records)
+    new_counts = collections.Counter(tuple(record) for record in new_records)
+
+    return {'added': [list(record) for record
+                      in (new_counts - old_counts).elements()],
+            'removed': [list(record) for record
+                        in (old_counts - new_counts).elements()]}
+
+
+def zone_drift(hetzner_dns_token=None,
+               full=False,
+               keep_fingerprints=False,
+               max_workers=None):
+    """
+    Find zones whose records changed since the last time they were checked.
+
+    Optional Parameters: `full`, `keep_fingerprints`, `max_workers`
+
+
+    * hetzner_dns_token *MUST* be passed in args or as environment
+      variable (HETZNER_DNS_TOKEN). You can get a DNS API token
+      here: https://dns.hetzner.com/settings/api-token
+
+    - The records of each zone are normalized (to their name, type, value
+      and TTL, sorted, with names and values normalized in the same way as
+      by `zone_sync`), and hashed into a fingerprint. The fingerprints,
+      the normalized records and each zone's 'modified' and
+      'records_count' are stored in the cache directory (see `DiskCache`),
+      and compared to on the next check.
+    - Zones are listed once. A zone whose 'modified' and 'records_count'
+      have not changed since the last check is skipped, without its
+      records being fetched. The records of all other zones are fetched
+      concurrently (up to 'max_workers' at a time).
+    - If 'full' passed in args or as environment variable (FULL), the
+      records of every zone are fetched.
+    - If 'keep_fingerprints' passed in args or as environment variable
+      (KEEP_FINGERPRINTS), the stored fingerprints are not updated, so the
+      same drift will be reported again on the next check.
+
+    - Returns a dictionary containing the number of zones that were
+      'checked' (fetched), 'skipped' and seen for the first time ('new'),
+      and a list of 'drifted' zones. Each drifted zone has a 'status' of
+      'changed' (with the records that were 'added' and 'removed') or
+      'deleted'.
+
+    - If using Bash environment variables, ensure that values are assigned
+      in ALL_CAPS.
+        - e.g. max_workers in Python -> MAX_WORKERS in environment variable
+    """
+    if os.environ.get('SHOW_HELP'):
+        # print the docstring and exit
+        print(zone_drift.__doc__)
+        sys.exit(0)
+
+    if hetzner_dns_token is None:
+        # get token from environment variable
+        hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+    if not full:
+        # get full from environment variable
+        full = os.environ.get('FULL') == '1'
+
+    if not keep_fingerprints:
+        # get keep_fingerprints from environment variable
+        keep_fingerprints = os.environ.get('KEEP_FINGERPRINTS') == '1'
+
+    if max_workers is None:
+        # get max_workers from environment variable
+        max_workers = int(os.environ.get('MAX_WORKERS', DEFAULT_MAX_WORKERS))
+
+    # the stored state is always read and written, and never expires
+    disk_cache = DiskCache(hetzner_dns_token, enabled=True, ttl=float('inf'))
+    stored_zones = disk_cache.get(FINGERPRINTS_KEY) or {}
+
+    # the zone metadata must be up to date, so don't use the disk cache
+    zones = zone_list(hetzner_dns_token=hetzner_dns_token,
+                      use_cache=False)['zones']
+
+    # only fetch the records of zones that may have changed
+    zones_to_check = []
+    skipped = 0
+    for zone in zones:
+        stored_zone = stored_zones.get(zone['id'])
+        if not full and stored_zone\
+                and stored_zone['modified'] == zone.get('modified')\
+                and stored_zone['records_count'] == zone.get('records_count'):
+            skipped += 1
+        else:
+            zones_to_check.append(zone)
+
+    @request_hooks.in_current_context
+    def get_zone_records(zone):
+        records = record_list(hetzner_dns_token=hetzner_dns_token,
+                              zone_id=zone['id'],
+                              use_cache=False,
+                              as_record_set=True)
+        return get_normalized_records(record.to_dict() for record in records)
+
+    zone_records = []
+    if zones_to_check:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            zone_records = list(executor.map(get_zone_records,
+                                             zones_to_check))
+
+    drifted = []
+    new = 0
+    new_zones = {}
+    for zone, records in zip(zones_to_check, zone_records):
+        fingerprint = get_fingerprint(records)
+        stored_zone = stored_zones.get(zone['id'])
+        if stored_zone is None:
+            new += 1
+        elif stored_zone['fingerprint'] != fingerprint:
+            drifted.append(dict(
+                {'zone_id': zone['id'],
+                 'zone_name': zone['name'],
+                 'status': 'changed'},
+                **get_record_diff(stored_zone['records'], records)))
+
+        new_zones[zone['id']] = {'name': zone['name'],
+                                 'modified': zone.get('modified'),
+                                 'records_count': zone.get('records_count'),
+                                 'fingerprint': fingerprint,
+                                 'records': records}
+
+    zone_ids = {zone['id'] for zone in zones}
+    for zone_id, stored_zone in stored_zones.items():
+        if zone_id not in zone_ids:
+            drifted.append({'zone_id': zone_id,
+                            'zone_name': stored_zone['name'],
+                            'status': 'deleted'})
+
+    if not keep_fingerprints:
+        # keep the stored state of skipped zones, and forget deleted zones
+        disk_cache.set(FINGERPRINTS_KEY,
+                       {zone['id']: new_zones.get(zone['id'])
+                        or stored_zones[zone['id']] for zone in zones})
+
+    result = {'checked': len(zones_to_check),
+              'skipped': skipped,
+              'new': new,
+              'drifted': drifted}
+
+    # when running via the terminal, print output to console then exit
+    if __name__ == '__main__':
+        json_codec.print_json(result)
+        sys.exit(1 if drifted else 0)
+
+    return result
+
+
+if __name__ == '__main__':
+    zone_drift()
@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+
+import os
+import sys
+
+from . import hetzner_dns_helpers as helpers
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from .hetzner_dns_client import get_client
+from .zone_resolver import get_zone_resolver
+
+# the number of bytes that are read or written at a time when streaming
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def zone_export(hetzner_dns_token=None,
+                zone_id=None,
+                zone_name=None,
+                output_file=None):
+    """
+    Export a zone as a BIND zone file.
+    https://dns.hetzner.com/api-docs/#operation/ExportZoneFile
+
+    Required Parameters: One of: `zone_id` or `zone_name`
+
+    Optional Parameters: `output_file`
+
+
+    * hetzner_dns_token *MUST* be passed in args or as environment
+      variable (HETZNER_DNS_TOKEN). You can get a DNS API token
+      here: https://dns.hetzner.com/settings/api-token
+
+    - If 'output_file' passed in args or as environment variable
+      (OUTPUT_FILE), the zone file is streamed into it as it is
+      downloaded, without being held in memory, and 'OK' is returned.
+      'output_file' may be a path or a binary file object, and '-' writes
+      to stdout (in which case nothing is returned).
+        - hetzner-dns-tools writes to stdout by default.
+
+    - Otherwise, the zone file is returned as a string.
+
+    - If using Bash environment variables, ensure that values are assigned
+      in ALL_CAPS.
+        - e.g. zone_id in Python -> ZONE_ID in environment variable
+    """
+    if os.environ.get('SHOW_HELP'):
+        # print the docstring and exit
+        print(zone_export.__doc__)
+        sys.exit(0)
+
+    if hetzner_dns_token is None:
+        # get token from environment variable
+        hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+    if zone_id is None and os.environ.get('ZONE_ID'):
+        # get zone_id from environment variable
+        zone_id = os.environ['ZONE_ID']
+
+    if zone_name is None and os.environ.get('ZONE_NAME'):
+        # get zone_name from environment variable
+        zone_name = os.environ['ZONE_NAME']
+
+    if output_file is None and os.environ.get('OUTPUT_FILE'):
+        # get output_file from environment variable
+        output_file = os.environ['OUTPUT_FILE']
+
+    if __name__ == '__main__' and output_file is None:
+        # when running via the terminal, write to stdout
+        output_file = '-'
+
+    if not zone_id and not zone_name:
+        helpers.exit_with_error("Must include one of: zone_id, zone_name")
+
+    if not zone_id:
+        # get the ID of the matching zone
+        zone_id = get_zone_resolver(hetzner_dns_token).get_zone_id(zone_name)
+        if zone_id is None:
+            helpers.exit_with_error("zone not found")
+
+    try:
+        response = get_client(hetzner_dns_token).get(
+            f'/zones/{zone_id}/export', stream=True)
+
+        with response:
+            if response.status_code != 200:
+                # errors are returned as JSON
+                response_dict = json_codec.loads(response.content or b'{}')
+
+                # check response for errors
+                helpers.check_response_for_errors(response_dict)
+                helpers.exit_with_error(
+                    f"export failed with status {response.status_code}")
+
+            if output_file is None:
+                # return the whole zone file
+                return response.content.decode('utf-8')
+
+            # stream the zone file into the output file
+            chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            if output_file == '-':
+                for chunk in chunks:
+                    sys.stdout.buffer.write(chunk)
+                sys.stdout.buffer.flush()
+                return None
+            elif hasattr(output_file, 'write'):
+                for chunk in chunks:
+                    output_file.write(chunk)
+            else:
+                with open(output_file, 'wb') as f:
+                    for chunk in chunks:
+                        f.write(chunk)
+
+        return "OK"
+
+    except requests.exceptions.RequestException as err:
+        helpers.handle_request_exception(err)
+
+
+if __name__ == '__main__':
+    zone_export()
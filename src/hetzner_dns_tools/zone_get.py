@@ -1,13 +1,13 @@
 #!/usr/bin/python3
 
-import json
 import os
-import requests
 import sys
 
 from . import hetzner_dns_helpers as helpers
-
-from .zone_list import zone_list
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from .hetzner_dns_client import get_client
+from .zone_resolver import get_zone_resolver
 
 
 def zone_get(hetzner_dns_token=None,
@@ -35,7 +35,8 @@ def zone_get(hetzner_dns_token=None,
 
     - If (domain) 'name/zone_name' passed in args or as environment
       variable (NAME or ZONE_NAME), then use it to acquire the desired
-      zone.
+      zone. This is done with a single request that uses the API's
+      server-side filtering, instead of listing all zones.
 
     - If 'id_only' passed in args or as environment variable (ID_ONLY),
       return just the zone ID if one exists.
@@ -59,6 +60,10 @@ def zone_get(hetzner_dns_token=None,
         zone_name = os.environ['ZONE_NAME']\
             if os.environ.get('ZONE_NAME') else os.environ.get('NAME')
 
+    if zone_name is None and name:
+        # allow zone_name and name to be used interchangeably
+        zone_name = name
+
     if not id_only and os.environ.get('ID_ONLY'):
         # get id_only from environment variable
         id_only = os.environ['ID_ONLY']
@@ -68,19 +73,12 @@ def zone_get(hetzner_dns_token=None,
     # if zone_name exists, use it to obtain the zone (skip if zone_id exists)
     if (zone_name or 'ZONE_NAME' in os.environ) and zone_id is None:
 
-        # get list of zones
-        response_dict = zone_list()
-
-        # check response for errors
-        helpers.check_response_for_errors(response_dict)
-
-        # check for matching zone
-        dns_zones = response_dict['zones']
-        for dns_zone in dns_zones:
-            if dns_zone['name'] == zone_name:
-                zone = {'zone': dns_zone}
-                zone_id = zone['zone']['id']
-                break
+        # get the matching zone (only a cached zone ID is good enough)
+        dns_zone = get_zone_resolver(hetzner_dns_token)\
+            .get_zone(zone_name, refresh=not id_only)
+        if dns_zone:
+            zone = {'zone': dns_zone}
+            zone_id = dns_zone['id']
 
         # if no matching zone found, halt and notify of error
         if zone is None:
@@ -100,24 +98,20 @@ def zone_get(hetzner_dns_token=None,
     if not zone_id and not zone_name:
         helpers.exit_with_error("Must specify one of: zone_id, zone_name")
 
-    # get response
-    try:
-        response = requests.get(
-            url=f'https://dns.hetzner.com/api/v1/zones/{zone_id}',
-            headers={'Auth-API-Token': hetzner_dns_token,
-                     'Content-Type': 'application/json; charset=utf-8'})
-
-        decoded_response = response.content.decode('utf-8')
-        response_dict = json.loads(decoded_response)
+    # get response (skip if the zone was already found by its name)
+    if zone is None:
+        try:
+            response_dict = get_client(hetzner_dns_token)\
+                .get_json(f'/zones/{zone_id}')
 
-        # check response for errors
-        helpers.check_response_for_errors(response_dict)
+            # check response for errors
+            helpers.check_response_for_errors(response_dict)
 
-        # assign value of response_dict to zone
-        zone = response_dict
+            # assign value of response_dict to zone
+            zone = response_dict
 
-    except requests.exceptions.RequestException as err:
-        helpers.handle_request_exception(err)
+        except requests.exceptions.RequestException as err:
+            helpers.handle_request_exception(err)
 
     # return the expected zone ID or zone
     if id_only:
@@ -132,7 +126,7 @@ def zone_get(hetzner_dns_token=None,
     else:
         # return all zone data
         if __name__ == '__main__':
-            print(json.dumps(zone))
+            json_codec.print_json(zone)
             sys.exit(0)  # exit successfully
 
         return zone
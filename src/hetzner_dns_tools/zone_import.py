@@ -0,0 +1,186 @@
+#!/usr/bin/python3
+
+import contextlib
+import json
+import os
+import shutil
+import sys
+
+from . import hetzner_dns_helpers as helpers
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from .disk_cache import get_disk_cache
+from .hetzner_dns_client import get_client
+from .zone_export import STREAM_CHUNK_SIZE
+from .zone_resolver import get_zone_resolver
+
+# the number of invalid records that are included in a validation error
+MAX_INVALID_RECORDS_SHOWN = 10
+
+
+@contextlib.contextmanager
+def open_zone_file(zone_file=None, input_file=None):
+    """
+    Open a zone file as a seekable binary file object, so that it can be
+    streamed to the API (more than once, if it is validated first).
+
+    - 'zone_file' is the contents of the zone file, as a string or bytes.
+    - 'input_file' is a path, a binary file object, or '-' for stdin.
+      Files that can't be rewound (e.g. stdin) are copied to a temporary
+      file on disk first, in chunks.
+    """
+    if zone_file is not None:
+        if isinstance(zone_file, str):
+            zone_file = zone_file.encode('utf-8')
+        yield zone_file
+        return
+
+    if input_file == '-':
+        input_file = sys.stdin.buffer
+
+    if not hasattr(input_file, 'read'):
+        with open(input_file, 'rb') as f:
+            yield f
+        return
+
+    if hasattr(input_file, 'seekable') and input_file.seekable():
+        yield input_file
+        return
+
+    import tempfile
+
+    with tempfile.TemporaryFile() as temp_file:
+        shutil.copyfileobj(input_file, temp_file, STREAM_CHUNK_SIZE)
+        temp_file.seek(0)
+        yield temp_file
+
+
+def zone_import(hetzner_dns_token=None,
+                zone_id=None,
+                zone_name=None,
+                input_file=None,
+                zone_file=None,
+                validate=False):
+    """
+    Import a BIND zone file into an existing zone, replacing its records.
+    https://dns.hetzner.com/api-docs/#operation/ImportZoneFilePlain
+
+    Required Parameters:
+      - One of: `zone_id` or `zone_name`
+      - One of: `input_file` or `zone_file`
+
+    Optional Parameters: `validate`
+
+
+    * hetzner_dns_token *MUST* be passed in args or as environment
+      variable (HETZNER_DNS_TOKEN). You can get a DNS API token
+      here: https://dns.hetzner.com/settings/api-token
+
+    - 'input_file' may be a path, a binary file object, or '-' for stdin.
+      It is streamed to the API in a single request, without being read
+      into memory. In Bash, it is read from the INPUT_FILE environment
+      variable, or from stdin.
+    - 'zone_file' may be passed instead, as a string containing the zone
+      file.
+
+    - If 'validate' passed in args or as environment variable (VALIDATE),
+      the zone file is validated by the API first, and nothing is imported
+      if any of its records are invalid. The validation is retried after
+      transient failures (the import itself is not).
+      https://dns.hetzner.com/api-docs/#operation/ValidateZoneFilePlain
+
+    - If using Bash environment variables, ensure that values are assigned
+      in ALL_CAPS.
+        - e.g. zone_id in Python -> ZONE_ID in environment variable
+    """
+    if os.environ.get('SHOW_HELP'):
+        # print the docstring and exit
+        print(zone_import.__doc__)
+        sys.exit(0)
+
+    if hetzner_dns_token is None:
+        # get token from environment variable
+        hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+    if zone_id is None and os.environ.get('ZONE_ID'):
+        # get zone_id from environment variable
+        zone_id = os.environ['ZONE_ID']
+
+    if zone_name is None and os.environ.get('ZONE_NAME'):
+        # get zone_name from environment variable
+        zone_name = os.environ['ZONE_NAME']
+
+    if input_file is None and zone_file is None:
+        # get input_file from environment variable, or use stdin
+        input_file = os.environ.get('INPUT_FILE') or '-'
+
+    if not validate:
+        # get validate from environment variable
+        validate = os.environ.get('VALIDATE') == '1'
+
+    if not zone_id and not zone_name:
+        helpers.exit_with_error("Must include one of: zone_id, zone_name")
+
+    if not zone_id:
+        # get the ID of the matching zone
+        zone_id = get_zone_resolver(hetzner_dns_token).get_zone_id(zone_name)
+        if zone_id is None:
+            helpers.exit_with_error("zone not found")
+
+    client = get_client(hetzner_dns_token)
+    headers = {'Content-Type': 'text/plain'}
+
+    try:
+        with open_zone_file(zone_file, input_file) as body:
+            if validate:
+                start_position = body.tell() if hasattr(body, 'tell') else 0
+
+                # validating has no side effects, so it is always retried
+                response = client.request('POST', '/zones/file/validate',
+                                          data=body, headers=headers,
+                                          retry=True)
+
+                response_dict = json_codec.loads(response.content)
+
+                # check response for errors
+                helpers.check_response_for_errors(response_dict)
+
+                invalid_records = response_dict.get('invalid_records') or []
+                if invalid_records:
+                    helpers.exit_with_error(
+                        f"zone file has {len(invalid_records)} invalid "
+                        "record(s): " + json.dumps(
+                            invalid_records[:MAX_INVALID_RECORDS_SHOWN]))
+
+                # send the zone file again from the start
+                if hasattr(body, 'seek'):
+                    body.seek(start_position)
+
+            response = client.request('POST', f'/zones/{zone_id}/import',
+                                      data=body, headers=headers)
+
+        response_dict = json_codec.loads(response.content)
+
+        # check response for errors
+        helpers.check_response_for_errors(response_dict)
+
+        # the zone's records (and its records_count) are now out of date
+        get_zone_resolver(hetzner_dns_token).invalidate(zone_id=zone_id)
+        disk_cache = get_disk_cache(hetzner_dns_token)
+        disk_cache.invalidate('zones')
+        disk_cache.invalidate_zone_names(zone_name=zone_name, zone_id=zone_id)
+        disk_cache.invalidate_zone(zone_id)
+
+        # when running via the terminal, print output to console then exit
+        if __name__ == '__main__':
+            json_codec.print_json(response_dict)
+            sys.exit(0)  # exit successfully
+
+        return response_dict
+
+    except requests.exceptions.RequestException as err:
+        helpers.handle_request_exception(err)
+
+
+if __name__ == '__main__':
+    zone_import()
@@ -1,23 +1,44 @@
 #!/usr/bin/python3
 
-import json
 import os
 import sys
-import requests
 
 from . import hetzner_dns_helpers as helpers
+from .hetzner_dns_helpers import requests
+from . import json_codec
+from .disk_cache import get_disk_cache
+from .hetzner_dns_client import ZONES_MAX_PER_PAGE, get_client
 
 
-def zone_list(hetzner_dns_token=None):
+def zone_list(hetzner_dns_token=None,
+              per_page=None,
+              use_cache=None,
+              stream=False):
     """
     Get list of all zones.
     https://dns.hetzner.com/api-docs/#operation/GetZones
 
+    Optional Parameters: `per_page`, `use_cache`, `stream`
+
 
     * hetzner_dns_token *MUST* be passed in args or as environment
       variable (HETZNER_DNS_TOKEN). You can get a DNS API token
       here: https://dns.hetzner.com/settings/api-token
 
+    - All pages of results are fetched and merged into a single list.
+      The number of zones requested per page can be set using 'per_page'
+      (default and maximum: 100).
+
+    - If 'use_cache' passed in args or as environment variable
+      (HETZNER_DNS_CACHE), the list of zones is cached on disk and reused
+      by later calls (including other processes) until it is older than
+      HETZNER_DNS_CACHE_TTL seconds (default: 300).
+
+    - If 'stream' is truthy, return an iterator that yields each zone as
+      soon as the page that contains it has been fetched, instead of
+      waiting for all pages. Streamed zones are not cached. (In Bash, use
+      'hetzner-dns-tools zone list --output ndjson')
+
     - If using Bash environment variables, ensure that values are assigned
       in ALL_CAPS.
           - e.g. zone_id in Python -> ZONE_ID in environment variable
@@ -31,20 +52,26 @@ def zone_list(hetzner_dns_token=None):
         # get token from environment variable
         hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
 
+    if per_page is None:
+        # get per_page from environment variable
+        per_page = int(os.environ.get('PER_PAGE', ZONES_MAX_PER_PAGE))
+
+    if stream:
+        return get_client(hetzner_dns_token)\
+            .iter_items('/zones', 'zones', per_page=per_page)
+
     # get response
     try:
-        response = requests.get(url='https://dns.hetzner.com/api/v1/zones',
-                                headers={'Auth-API-Token': hetzner_dns_token})
-
-        decoded_response = response.content.decode('utf-8')
-        response_dict = json.loads(decoded_response)
+        response_dict = get_disk_cache(hetzner_dns_token, enabled=use_cache)\
+            .get_or_fetch('zones', lambda: get_client(hetzner_dns_token)
+                          .get_all_pages('/zones', 'zones', per_page=per_page))
 
         # check response for errors
         helpers.check_response_for_errors(response_dict)
 
         if __name__ == '__main__':
             # when running via the terminal, print output to console
-            print(decoded_response)
+            json_codec.print_json(response_dict)
             sys.exit(0)  # exit successfully
 
         return response_dict
@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+
+from . import hetzner_dns_helpers as helpers
+from .disk_cache import get_disk_cache
+from .hetzner_dns_client import get_client
+
+# the number of seconds that a zone is cached before being fetched again
+DEFAULT_ZONE_CACHE_TTL = 300
+
+
+class ZoneResolver:
+    """
+    Resolve zone names to zones, with an in-memory cache.
+
+    Zones are looked up by name using the API's server-side 'name' filter,
+    so each lookup is a single request that returns a single zone. The
+    zone is then cached by name, and further lookups are answered from the
+    cache without any requests being made, until the cached zone is older
+    than 'ttl' seconds.
+
+    - If the on-disk cache is enabled (see `DiskCache`), zones are looked
+      up in its listing of all zones (if it has one), and the results of
+      lookups by name are shared with other processes.
+    - zone_create and zone_delete keep the cache up to date, and
+      `invalidate` can be used to clear it.
+    - Different zones can be looked up by several threads at the same
+      time, and threads that look up the same zone at the same time share
+      a single request.
+
+    - The TTL can be set with the HETZNER_DNS_ZONE_CACHE_TTL environment
+      variable (default: 300 seconds).
+    """
+
+    def __init__(self, hetzner_dns_token=None, ttl=None):
+        if ttl is None:
+            # get ttl from environment variable
+            ttl = float(os.environ.get('HETZNER_DNS_ZONE_CACHE_TTL',
+                                       DEFAULT_ZONE_CACHE_TTL))
+
+        self.hetzner_dns_token = hetzner_dns_token
+        self.ttl = ttl
+
+        # zone name -> (zone, time cached)
+        self._zones = {}
+        self._lock = threading.Lock()
+
+        # incremented whenever zones are added or removed by other means
+        self._generation = 0
+
+    def _fetch_zone(self, zone_name, refresh=False):
+        """Get a zone by name from the on-disk cache or the API."""
+        disk_cache = get_disk_cache(self.hetzner_dns_token)
+        zones_dict = disk_cache.get('zones')\
+            if disk_cache.enabled and not refresh else None
+        if zones_dict:
+            for zone in zones_dict['zones']:
+                if zone['name'] == zone_name:
+                    return zone
+
+        def get_response():
+            status_code, response_dict = get_client(self.hetzner_dns_token)\
+                .get_status_and_json('/zones', params={'name': zone_name})
+
+            # the API responds with 404 if no zones match
+            if status_code == 404:
+                return {'zones': []}
+
+            return response_dict
+
+        response_dict = disk_cache.get_or_fetch(f"zone-{zone_name}",
+                                                get_response,
+                                                refresh=refresh)
+
+        # check response for errors
+        helpers.check_response_for_errors(response_dict)
+
+        for zone in response_dict.get('zones', []):
+            if zone['name'] == zone_name:
+                return zone
+
+        return None
+
+    def get_zone(self, zone_name, refresh=False):
+        """
+        Return the zone with a matching name, or None if none exists.
+
+        - If 'refresh' is truthy, the zone is always fetched again.
+        """
+        with self._lock:
+            zone, cached_at = self._zones.get(zone_name, (None, None))
+            if not refresh and zone is not None\
+                    and time.monotonic() - cached_at < self.ttl:
+                return zone
+            generation = self._generation
+
+        # the lock isn't held while fetching, so that other zones can be
+        # looked up at the same time (and concurrent lookups of the same
+        # zone share a single request)
+        zone = self._fetch_zone(zone_name, refresh=refresh)
+
+        with self._lock:
+            # don't undo a change to the cache made during the fetch
+            if generation == self._generation:
+                if zone is None:
+                    self._zones.pop(zone_name, None)
+                else:
+                    self._zones[zone_name] = (zone, time.monotonic())
+
+        return zone
+
+    def get_zone_id(self, zone_name):
+        """Return the ID of the zone with a matching name, or None."""
+        zone = self.get_zone(zone_name)
+        return zone['id'] if zone else None
+
+    def get_cached_zone(self, zone_name):
+        """
+        Return a cached zone and where it was found ('memory cache' or
+        'disk cache'), without making any requests.
+
+        - If the zone isn't cached, (None, None) is returned.
+        """
+        with self._lock:
+            zone, cached_at = self._zones.get(zone_name, (None, None))
+            if zone is not None and time.monotonic() - cached_at < self.ttl:
+                return zone, 'memory cache'
+
+        disk_cache = get_disk_cache(self.hetzner_dns_token)
+        if disk_cache.enabled:
+            for key in ('zones', f"zone-{zone_name}"):
+                for zone in (disk_cache.get(key) or {}).get('zones', []):
+                    if zone['name'] == zone_name:
+                        return zone, 'disk cache'
+
+        return None, None
+
+    def add_zone(self, zone):
+        """Add a zone (e.g. a newly-created one) to the cache."""
+        with self._lock:
+            self._zones[zone['name']] = (zone, time.monotonic())
+            self._generation += 1
+
+    def invalidate(self, zone_name=None, zone_id=None):
+        """
+        Remove a zone from the cache by name or ID.
+
+        If neither 'zone_name' or 'zone_id' is given, the entire cache is
+        cleared.
+        """
+        with self._lock:
+            self._generation += 1
+            if zone_name is None and zone_id is None:
+                self._zones = {}
+                return
+
+            for name, (zone, _) in list(self._zones.items()):
+                if name == zone_name or zone['id'] == zone_id:
+                    del self._zones[name]
+
+
+_resolvers = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_zone_resolver(hetzner_dns_token=None):
+    """
+    Get the shared zone resolver for a token, creating it if necessary.
+    """
+    if hetzner_dns_token is None:
+        # get token from environment variable
+        hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+    with _resolvers_lock:
+        resolver = _resolvers.get(hetzner_dns_token)
+        if resolver is None:
+            resolver = ZoneResolver(hetzner_dns_token=hetzner_dns_token)
+            _resolvers[hetzner_dns_token] = resolver
+
+    return resolver
@@ -0,0 +1,306 @@
+#!/usr/bin/python3
+
+import os
+import sys
+
+from . import hetzner_dns_helpers as helpers
+from . import json_codec
+from .disk_cache import get_disk_cache
+from .record_create_bulk import parse_records, record_create_bulk
+from .record_delete import DEFAULT_MAX_WORKERS, delete_records_by_id
+from .record_list import record_list
+from .record_set import get_record_key
+from .record_update_bulk import record_update_bulk
+from .zone_resolver import get_zone_resolver
+
+# the default TTL of new records
+DEFAULT_TTL = 86400
+
+
+def parse_desired_records(text):
+    """
+    Parse a list of desired records from a string containing JSON, NDJSON
+    or YAML (which requires PyYAML).
+
+    The records may be a list, or an object with a 'records' list.
+    """
+    stripped_text = text.strip()
+    if not stripped_text or stripped_text[0] in '[{':
+        return parse_records(stripped_text)
+
+    try:
+        import yaml
+    except ImportError:  # PyYAML is an optional dependency
+        raise ValueError("Reading YAML requires PyYAML. Install it with: "
+                         "pip install hetzner-dns-tools[yaml]") from None
+
+    parsed = yaml.safe_load(stripped_text) or []
+    return parsed['records'] if isinstance(parsed, dict) else parsed
+
+
+def normalize_record(record):
+    """
+    Convert a record to a dictionary containing its 'name', 'type', 'value'
+    and 'ttl' (which is None if it was not given).
+    """
+    ttl = record.get('ttl')
+    return {'name': str(record.get('name') or '@'),
+            'type': str(record.get('record_type')
+                        or record.get('type') or '').upper(),
+            'value': str(record.get('value') if record.get('value')
+                         is not None else ''),
+            'ttl': int(ttl) if ttl not in (None, '') else None}
+
+
+def get_sync_key(record):
+    """
+    Return the key that is used to match desired and current records,
+    which is normalized in the same way as in `record_create_bulk` (see
+    `record_set.get_record_key`).
+    """
+    return get_record_key(record)
+
+
+def is_managed(record, desired_records):
+    """
+    Return True if a current record is managed by the desired records.
+
+    SOA records are always ignored, and the zone's NS records (at '@') are
+    only managed if the desired records include any of them.
+    """
+    if record['type'] == 'SOA':
+        return False
+    if get_sync_key(record)[:2] == ('@', 'NS'):
+        return any(get_sync_key(desired)[:2] == ('@', 'NS')
+                   for desired in desired_records)
+    return True
+
+
+def get_sync_plan(current_records, desired_records):
+    """
+    Compare the current records of a zone to the desired records, and
+    return the changes needed to make them match.
+
+    Records are matched by their normalized ('name', 'type', 'value') (see
+    `get_sync_key`). A record that
+    must be deleted and a record that must be created with the same 'name'
+    and 'type' are combined into a single update of the existing record.
+    Records with a matching key but a different 'ttl' are also updated.
+    """
+    desired_records = [normalize_record(record) for record in desired_records]
+
+    # current records by key, keeping the API's data for each one
+    current_by_key = {}
+    for current_record in current_records:
+        record = dict(normalize_record(current_record),
+                      id=current_record['id'])
+        if is_managed(record, desired_records):
+            current_by_key.setdefault(get_sync_key(record), []).append(record)
+
+    to_create = []
+    to_update = []
+    unchanged = 0
+    for desired in desired_records:
+        matching_records = current_by_key.get(get_sync_key(desired))
+        if not matching_records:
+            to_create.append(desired)
+            continue
+
+        current = matching_records.pop(0)
+        if desired['ttl'] is not None and desired['ttl'] != current['ttl']:
+            to_update.append({'id': current['id'],
+                              'old': current,
+                              'new': dict(desired)})
+        else:
+            unchanged += 1
+
+    to_delete = [record for records in current_by_key.values()
+                 for record in records]
+
+    # replace a delete and a create with the same name and type by an update
+    deletes_by_name_and_type = {}
+    for record in to_delete:
+        deletes_by_name_and_type.setdefault(
+            get_sync_key(record)[:2], []).append(record)
+
+    remaining_creates = []
+    for desired in to_create:
+        deletes = deletes_by_name_and_type.get(get_sync_key(desired)[:2])
+        if deletes:
+            current = deletes.pop(0)
+            new = dict(desired)
+            if new['ttl'] is None:
+                new['ttl'] = current['ttl']
+            to_update.append({'id': current['id'], 'old': current, 'new': new})
+        else:
+            remaining_creates.append(desired)
+
+    updated_ids = {update['id'] for update in to_update}
+    to_delete = [record for record in to_delete
+                 if record['id'] not in updated_ids]
+
+    return {'create': remaining_creates,
+            'update': to_update,
+            'delete': to_delete,
+            'unchanged': unchanged}
+
+
+def zone_sync(hetzner_dns_token=None,
+              zone_id=None,
+              zone_name=None,
+              records=None,
+              dry_run=False,
+              max_workers=None):
+    """
+    Make a zone's records match a desired set of records.
+
+    Required Parameters: `records`, and one of: `zone_id` or `zone_name`
+
+    Optional Parameters: `dry_run`, `max_workers`
+
+
+    * hetzner_dns_token *MUST* be passed in args or as environment
+      variable (HETZNER_DNS_TOKEN). You can get a DNS API token
+      here: https://dns.hetzner.com/settings/api-token
+
+    * records may be a list of dictionaries, or a string containing JSON,
+      NDJSON or YAML (which requires PyYAML). In Bash, they are read from
+      stdin, or from the file in the RECORDS_FILE environment variable.
+        - Each record has a 'name' (default: '@'), a 'record_type' (or
+          'type'), a 'value', and an optional 'ttl'.
+        - e.g. [{"name": "www", "type": "A", "value": "1.1.1.1"}]
+
+    - The zone's current records are listed once, and compared to the
+      desired records by their name, type and value (ignoring the case of
+      names and values, trailing dots, and the quotes of TXT values).
+      Then:
+        - Missing records are created (in bulk).
+        - Records with a different TTL, and records whose value changed
+          (i.e. a record with the same name and type must be both deleted
+          and created), are updated (in bulk).
+        - All other records are deleted (concurrently, up to 'max_workers'
+          at a time).
+    - SOA records are never changed, and the zone's NS records (at '@')
+      are only changed if the desired records include any of them.
+
+    - If 'dry_run' passed in args or as environment variable (DRY_RUN),
+      return the planned changes without making them.
+
+    - Returns a dictionary containing the planned changes ('create',
+      'update', 'delete') and the number of 'unchanged' records. If the
+      changes were made, it also contains the number of records that were
+      'created', 'updated' and 'deleted', and the number that 'failed'.
+
+    - If using Bash environment variables, ensure that values are assigned
+      in ALL_CAPS.
+        - e.g. zone_id in Python -> ZONE_ID in environment variable
+    """
+    if os.environ.get('SHOW_HELP'):
+        # print the docstring and exit
+        print(zone_sync.__doc__)
+        sys.exit(0)
+
+    if hetzner_dns_token is None:
+        # get token from environment variable
+        hetzner_dns_token = os.environ['HETZNER_DNS_TOKEN']
+
+    if zone_id is None and os.environ.get('ZONE_ID'):
+        # get zone_id from environment variable
+        zone_id = os.environ['ZONE_ID']
+
+    if zone_name is None and os.environ.get('ZONE_NAME'):
+        # get zone_name from environment variable
+        zone_name = os.environ['ZONE_NAME']
+
+    if not zone_id and not zone_name:
+        helpers.exit_with_error("Must include one of: zone_id, zone_name")
+
+    if records is None:
+        # get records from a file or from stdin
+        if os.environ.get('RECORDS_FILE'):
+            with open(os.environ['RECORDS_FILE']) as records_file:
+                records = records_file.read()
+        else:
+            records = sys.stdin.read()
+
+    if isinstance(records, str):
+        records = parse_desired_records(records)
+
+    if not dry_run:
+        # get dry_run from environment variable
+        dry_run = os.environ.get('DRY_RUN') == '1'
+
+    if max_workers is None:
+        # get max_workers from environment variable
+        max_workers = int(os.environ.get('MAX_WORKERS', DEFAULT_MAX_WORKERS))
+
+    if not zone_id:
+        # get the ID of the matching zone
+        zone_id = get_zone_resolver(hetzner_dns_token).get_zone_id(zone_name)
+        if zone_id is None:
+            helpers.exit_with_error("zone not found")
+
+    # the current records must be up to date, so don't use the disk cache
+    current_records = record_list(hetzner_dns_token=hetzner_dns_token,
+                                  zone_id=zone_id,
+                                  use_cache=False,
+                                  as_record_set=True)
+
+    plan = get_sync_plan(current_records.to_list(), records)
+    result = dict(plan, zone_id=zone_id, dry_run=bool(dry_run))
+
+    if not dry_run:
+        created = updated = deleted = failed = 0
+
+        if plan['create']:
+            create_result = record_create_bulk(
+                hetzner_dns_token=hetzner_dns_token,
+                records=[{'zone_id': zone_id,
+                          'type': record['type'],
+                          'name': record['name'],
+                          'value': record['value'],
+                          'ttl': record['ttl'] or DEFAULT_TTL}
+                         for record in plan['create']])
+            created = create_result['created']
+            failed += create_result['failed']
+
+        if plan['update']:
+            # the records are complete, so they don't need to be looked up
+            update_result = record_update_bulk(
+                hetzner_dns_token=hetzner_dns_token,
+                records=[{'zone_id': zone_id,
+                          'record_id': update['id'],
+                          'type': update['new']['type'],
+                          'name': update['new']['name'],
+                          'value': update['new']['value'],
+                          'ttl': update['new']['ttl']}
+                         for update in plan['update']])
+            updated = update_result['updated']
+            failed += update_result['failed']
+
+        if plan['delete']:
+            delete_results = delete_records_by_id(
+                hetzner_dns_token,
+                [record['id'] for record in plan['delete']],
+                max_workers=max_workers,
+                continue_on_error=True)
+            deleted = sum(status in ('deleted', 'not found')
+                          for status in delete_results.values())
+            failed += len(delete_results) - deleted
+            get_disk_cache(hetzner_dns_token).invalidate_zone(zone_id)
+
+        result.update(created=created,
+                      updated=updated,
+                      deleted=deleted,
+                      failed=failed)
+
+    # when running via the terminal, print output to console then exit
+    if __name__ == '__main__':
+        json_codec.print_json(result)
+        sys.exit(1 if result.get('failed') else 0)
+
+    return result
+
+
+if __name__ == '__main__':
+    zone_sync()
@@ -0,0 +1,47 @@
+import os
+import uuid
+
+import pytest
+
+from mock_api import MockHetznerDNSAPI
+
+from hetzner_dns_tools.hetzner_dns_client import get_client
+
+# environment variables that the functions read their parameters from
+PARAMETER_VARIABLES = ('ZONE_ID', 'ZONE_NAME', 'ZONE_NAMES', 'RECORD_ID',
+                       'RECORD_IDS', 'NAME', 'TYPE', 'RECORD_TYPE', 'VALUE',
+                       'TTL', 'SHOW_HELP', 'DRY_RUN', 'OUTPUT', 'OUTPUT_FILE',
+                       'EXPLAIN', 'DEBUG', 'RECORDS_FILE', 'STOP_ON_ERROR',
+                       'CONTINUE_ON_ERROR', 'DELETE_MULTIPLE_RECORDS',
+                       'ALLOW_MULTIPLE_RECORDS', 'FIRST_RECORD_ONLY',
+                       'SEARCH_ALL_ZONES', 'ID_ONLY', 'PER_PAGE', 'RAW')
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path):
+    """A mock API, which every function sends its requests to."""
+    for key in list(os.environ):
+        if key.startswith('HETZNER_DNS_') or key in PARAMETER_VARIABLES:
+            monkeypatch.delenv(key)
+    monkeypatch.setenv('HETZNER_DNS_CACHE_DIR', str(tmp_path / 'cache'))
+
+    with MockHetznerDNSAPI() as mock_api:
+        monkeypatch.setenv('HETZNER_DNS_API_URL', mock_api.url)
+        yield mock_api
+
+
+@pytest.fixture
+def token(api, monkeypatch):
+    """A new token, so that nothing is shared with other tests."""
+    hetzner_dns_token = f'test-{uuid.uuid4().hex}'
+    monkeypatch.setenv('HETZNER_DNS_TOKEN', hetzner_dns_token)
+    yield hetzner_dns_token
+    get_client(hetzner_dns_token).close()
+
+
+@pytest.fixture
+def zone(api):
+    """A zone containing 10 A records, named 'host0' to 'host9'."""
+    zone = api.add_zone('example.com')
+    api.add_records(zone['id'], 10)
+    return zone
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from hetzner_dns_tools import aio  # noqa: E402
+from hetzner_dns_tools.aio import client as aio_client  # noqa: E402
+from hetzner_dns_tools.record_delete import RecordDeleteError  # noqa: E402
+
+
+def test_shared_clients_are_closed(api, token, zone):
+    async def main():
+        record = await aio.record_get(zone_name='example.com', name='host1',
+                                      record_type='A')
+        client = aio.get_client()
+        await aio.aclose()
+        return record, client
+
+    record, client = asyncio.run(main())
+
+    assert record['name'] == 'host1'
+    assert client._session.closed
+    assert not any(aio_client._clients.values())
+
+
+def test_record_get_is_validated_like_the_sync_version(api, token, zone):
+    async def main():
+        try:
+            await aio.record_get(zone_id=zone['id'])
+        finally:
+            await aio.aclose()
+
+    with pytest.raises(ValueError, match="You must provide a record_id"):
+        asyncio.run(main())
+    assert api.request_count == 0
+
+
+def test_records_are_created_updated_and_deleted(api, token, zone):
+    async def main():
+        try:
+            record_id = await aio.record_create(
+                zone_id=zone['id'], record_type='A', name='www',
+                value='10.0.0.1', id_only=True)
+            await aio.record_update(zone_id=zone['id'], record_id=record_id,
+                                    record_type='A', name='www',
+                                    value='10.0.0.2')
+            updated = await aio.record_get(record_id=record_id)
+            await aio.record_delete(record_id=record_id)
+            return updated
+        finally:
+            await aio.aclose()
+
+    updated = asyncio.run(main())
+
+    assert updated['record']['value'] == '10.0.0.2'
+    assert zone['id'] in api.zones and api.zones[zone['id']]['records_count'] \
+        == 10
+
+
+def test_record_id_without_a_name_keeps_the_name(api, token, zone):
+    record = api.add_record(zone['id'], 'www', 'A', '10.0.0.1')
+
+    async def main():
+        try:
+            return await aio.record_update(
+                zone_id=zone['id'], record_id=record['id'],
+                record_type='A', value='10.1.0.1')
+        finally:
+            await aio.aclose()
+
+    assert asyncio.run(main())['record']['name'] == 'www'
+
+
+def test_failed_deletions_list_the_status_of_each_record(api, token, zone):
+    records = api.add_records(zone['id'], 2, name='www{i}')
+    record_ids = [record['id'] for record in records]
+
+    async def main():
+        try:
+            api.fail_next(1, 422)
+            await aio.record_delete(record_ids=record_ids, max_workers=1)
+        finally:
+            await aio.aclose()
+
+    with pytest.raises(RecordDeleteError) as exc_info:
+        asyncio.run(main())
+
+    assert exc_info.value.results[record_ids[0]].startswith('failed')
+    assert exc_info.value.results[record_ids[1]] == 'skipped'
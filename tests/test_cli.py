@@ -0,0 +1,143 @@
+import os
+
+from hetzner_dns_tools import cli
+
+
+def test_flags_do_not_leak_into_later_commands(api, token, zone, capsys):
+    assert cli.main(['record', 'get', '--zone-name', 'example.com',
+                     '--name', 'host1', '--type', 'A', '--explain']) == 0
+    assert 'EXPLAIN' not in os.environ
+    assert 'ZONE_NAME' not in os.environ
+
+    capsys.readouterr()
+    assert cli.main(['zone', 'list']) == 0
+    assert 'estimated_requests' not in capsys.readouterr().out
+
+
+def test_environment_is_restored_after_an_error(api, token, monkeypatch):
+    monkeypatch.setenv('ZONE_NAME', 'original.example.com')
+    assert cli.main(['zone', 'get', '--zone-name', 'missing.example.com']) \
+        == 1
+    assert os.environ['ZONE_NAME'] == 'original.example.com'
+
+
+def test_batch_reports_missing_file(api, token, tmp_path, capsys):
+    assert cli.main(['batch', str(tmp_path / 'missing.ndjson')]) == 1
+    assert capsys.readouterr().out.startswith("Error: ")
+
+
+def test_batch_reports_each_failure(api, token, zone, tmp_path, capsys):
+    operations = tmp_path / 'operations.ndjson'
+    operations.write_text(
+        '{"op": "zone.export", "zone_name": "example.com", '
+        f'"output_file": "{tmp_path / "missing" / "zone.txt"}"}}\n'
+        '{"op": "record.get", "zone_name": "example.com", "record_type": "A",'
+        ' "allow_multiple_records": true, "stream": true}\n'
+        '{"op": "record.get", "zone_name": "missing.example.com", '
+        '"record_type": "A", "allow_multiple_records": true, '
+        '"stream": true}\n')
+
+    assert cli.main(['batch', str(operations)]) == 1
+
+    outputs = [cli.json_codec.loads(line)
+               for line in capsys.readouterr().out.splitlines()]
+    assert [output['ok'] for output in outputs] == [False, True, False]
+    assert len(outputs[1]['result']) == 10
+
+
+def test_create_bulk_exits_with_error_if_any_record_failed(
+        api, token, zone, tmp_path, capsys):
+    records_file = tmp_path / 'records.json'
+    records_file.write_text(
+        '[{"zone_name": "example.com", "type": "A", "value": "10.1.0.1"},'
+        ' {"zone_name": "missing.example.com", "type": "A",'
+        ' "value": "10.1.0.2"}]')
+
+    assert cli.main(['record', 'create-bulk',
+                     '--records-file', str(records_file)]) == 1
+    assert cli.json_codec.loads(capsys.readouterr().out)['failed'] == 1
+
+
+def test_create_bulk_exits_without_error_if_every_record_was_created(
+        api, token, zone, tmp_path):
+    records_file = tmp_path / 'records.json'
+    records_file.write_text(
+        '[{"zone_name": "example.com", "type": "A", "value": "10.1.0.1"}]')
+
+    assert cli.main(['record', 'create-bulk',
+                     '--records-file', str(records_file)]) == 0
+
+
+def test_get_exit_code():
+    assert cli.get_exit_code('record', 'update-bulk',
+                             {'updated': 1, 'failed': 1}) == 1
+    assert cli.get_exit_code('zone', 'sync',
+                             {'created': 1, 'failed': 0}) == 0
+    assert cli.get_exit_code('record', 'delete',
+                             {'a': 'deleted', 'b': 'failed (404)'}) == 1
+    # other commands are never checked
+    assert cli.get_exit_code('record', 'get', {'failed': 1}) == 0
+
+
+def test_update_can_be_explained_without_a_type_or_value(api, token, zone,
+                                                         capsys):
+    assert cli.main(['record', 'update', '--zone-name', 'example.com',
+                     '--name', 'www', '--explain']) == 0
+    plan = cli.json_codec.loads(capsys.readouterr().out)
+    assert plan['operation'] == 'record.update'
+
+
+def test_help_anywhere_shows_help_without_running_the_command(
+        api, token, zone, capsys):
+    api.add_record(zone['id'], 'www', 'A', '10.0.0.1')
+    api.reset_requests()
+
+    assert cli.main(['record', 'delete', '--zone-name', 'example.com',
+                     '--name', 'www', '--type', 'A', '--help']) == 0
+    assert cli.main(['record', 'delete', '-h', '--zone-name',
+                     'example.com']) == 0
+
+    assert 'Delete an existing record.' in capsys.readouterr().out
+    assert api.request_count == 0
+
+
+def test_boolean_flags_never_take_a_value():
+    flags, positional_args = cli.parse_flags(
+        ['--stop-on-error', 'operations.ndjson', '--dry-run=0',
+         '--zone-name', 'example.com'])
+
+    assert flags == {'STOP_ON_ERROR': '1', 'DRY_RUN': '0',
+                     'ZONE_NAME': 'example.com'}
+    assert positional_args == ['operations.ndjson']
+
+
+def test_batch_file_can_follow_stop_on_error(api, token, zone, tmp_path,
+                                             capsys):
+    operations = tmp_path / 'operations.ndjson'
+    operations.write_text(
+        '{"op": "zone.get", "zone_name": "missing.example.com"}\n'
+        '{"op": "zone.get", "zone_name": "example.com"}\n')
+
+    assert cli.main(['batch', '--stop-on-error', str(operations)]) == 1
+    assert len(capsys.readouterr().out.splitlines()) == 1
+
+
+def test_records_found_by_id_are_printed_as_they_were_received(
+        api, token, zone, capsysbinary, monkeypatch):
+    record = api.add_record(zone['id'], 'www', 'A', '10.1.0.1')
+
+    def dumps_bytes(value):
+        raise AssertionError("the response was serialized again")
+
+    monkeypatch.setattr(cli.json_codec, 'dumps_bytes', dumps_bytes)
+    assert cli.main(['record', 'get', '--record-id', record['id']]) == 0
+
+    output = capsysbinary.readouterr().out
+    assert cli.json_codec.loads(output)['record']['name'] == 'www'
+
+
+def test_records_found_by_lookup_are_not_raw(api, token, zone, capsys):
+    assert cli.main(['record', 'get', '--zone-id', zone['id'],
+                     '--name', 'host1', '--type', 'A', '--raw']) == 0
+
+    assert cli.json_codec.loads(capsys.readouterr().out)['name'] == 'host1'
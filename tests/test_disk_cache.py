@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+
+import pytest
+
+from hetzner_dns_tools import disk_cache
+from hetzner_dns_tools.disk_cache import DiskCache, get_disk_cache
+from hetzner_dns_tools.record_create import record_create
+from hetzner_dns_tools.record_delete import record_delete
+from hetzner_dns_tools.record_list import record_list
+
+
+@pytest.fixture
+def cache(api, token, monkeypatch):
+    monkeypatch.setenv('HETZNER_DNS_CACHE', '1')
+    return get_disk_cache(token)
+
+
+def test_listings_are_shared_between_calls(api, token, zone, cache):
+    # 'cache' enables the cache for every function
+    record_list(zone_id=zone['id'])
+    api.reset_requests()
+
+    assert len(record_list(zone_id=zone['id'])['records']) == 10
+    assert api.request_count == 0
+
+
+def test_the_token_is_not_written_to_disk(api, token, zone, cache):
+    record_list(zone_id=zone['id'])
+
+    assert token not in cache.path
+    assert os.path.exists(os.path.join(cache.path,
+                                       f"records-{zone['id']}.json"))
+
+
+def test_listings_expire(api, token, zone, cache):
+    expired_cache = DiskCache(token, enabled=True, ttl=0)
+    expired_cache.set('zones', {'zones': []})
+
+    assert expired_cache.get('zones') is None
+
+
+def test_changes_invalidate_the_listing(api, token, zone, cache):
+    record_list(zone_id=zone['id'])
+
+    record_id = record_create(zone_id=zone['id'], record_type='A',
+                              name='www', value='10.1.0.1',
+                              id_only=True)
+    assert len(record_list(zone_id=zone['id'])['records']) == 11
+
+    record_delete(record_id=record_id)
+    assert len(record_list(zone_id=zone['id'])['records']) == 10
+
+
+def test_deleting_by_id_invalidates_the_zone_containing_the_record(
+        api, token, zone, cache):
+    record_list(zone_id=zone['id'])
+    record = api.add_record(zone['id'], 'www', 'A', '10.1.0.1')
+
+    cache.invalidate_records([record['id']])
+    assert cache.get(f"records-{zone['id']}") is not None
+
+    cache.invalidate_records([record_list(zone_id=zone['id'])
+                              ['records'][0]['id']])
+    assert cache.get(f"records-{zone['id']}") is None
+
+
+def test_errors_are_not_cached(api, token, cache):
+    assert cache.get_or_fetch('zones', lambda: {'error': 'failed'}) \
+        == {'error': 'failed'}
+    assert cache.get('zones') is None
+
+
+def test_disabled_cache_is_never_read(api, token, zone):
+    disabled_cache = DiskCache(token, enabled=False)
+    fetched = []
+
+    for _ in range(2):
+        disabled_cache.get_or_fetch(
+            'zones', lambda: fetched.append(1) or {'zones': []})
+
+    assert len(fetched) == 2
+
+
+def fetch_in_process(cache_dir, token, counter):
+    os.environ['HETZNER_DNS_CACHE_DIR'] = cache_dir
+
+    def fetch():
+        with counter.get_lock():
+            counter.value += 1
+        return {'zones': []}
+
+    DiskCache(token, enabled=True).get_or_fetch('zones', fetch)
+
+
+@pytest.mark.skipif(disk_cache.fcntl is None,
+                    reason="files can only be locked with fcntl")
+def test_parallel_processes_fetch_once(api, token, tmp_path):
+    counter = multiprocessing.Value('i', 0)
+    processes = [multiprocessing.Process(
+        target=fetch_in_process,
+        args=(os.environ['HETZNER_DNS_CACHE_DIR'], token, counter))
+        for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert counter.value == 1
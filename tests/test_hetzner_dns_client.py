@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hetzner_dns_tools.hetzner_dns_client import get_client
+from hetzner_dns_tools.record_get import record_get
+from hetzner_dns_tools.record_list import record_list
+from hetzner_dns_tools.zone_resolver import get_zone_resolver
+
+
+def run_at_once(function, count=8):
+    """Call a function from several threads at (nearly) the same time, and
+    return the results, or the exceptions that were raised."""
+    barrier = threading.Barrier(count)
+
+    def call(_):
+        barrier.wait()
+        try:
+            return function()
+        except Exception as err:
+            return err
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        return list(executor.map(call, range(count)))
+
+
+@pytest.fixture
+def slow_api(api):
+    # long enough for every thread to start before the first response
+    api.latency = 0.2
+    return api
+
+
+def test_concurrent_lookups_share_requests(slow_api, token, zone):
+    slow_api.reset_requests()
+    results = run_at_once(lambda: record_get(
+        zone_name='example.com', name='host1', record_type='A'))
+
+    assert all(result == results[0] for result in results)
+    assert results[0]['name'] == 'host1'
+    assert slow_api.get_request_counts() == {'GET /zones': 1,
+                                             'GET /records': 1}
+
+
+def test_concurrent_paginated_listings_are_complete(slow_api, token, zone):
+    slow_api.add_records(zone['id'], 15, name='more{i}')
+    slow_api.reset_requests()
+
+    results = run_at_once(lambda: record_list(zone_id=zone['id'],
+                                              per_page=10))
+
+    assert [len(result['records']) for result in results] == [25] * 8
+    assert slow_api.get_request_counts() == {'GET /records': 3}
+
+
+def test_errors_are_shared(slow_api, token):
+    slow_api.reset_requests()
+    slow_api.fail_next(1, 401)
+
+    results = run_at_once(
+        lambda: get_zone_resolver(token).get_zone_id('example.com'))
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert slow_api.request_count == 1
+
+
+def test_sequential_requests_are_not_shared(api, token, zone):
+    api.reset_requests()
+    client = get_client(token)
+    client.get_json('/zones')
+    client.get_json('/zones')
+
+    assert api.request_count == 2
+
+
+def test_requests_with_different_params_are_not_shared(slow_api, token):
+    slow_api.reset_requests()
+    client = get_client(token)
+
+    run_at_once(lambda: [client.get_json('/zones', params={'page': 1}),
+                         client.get_json('/zones', params={'page': 2})],
+                count=2)
+
+    assert slow_api.request_count == 2
@@ -0,0 +1,122 @@
+"""
+The planner predicts the requests of each operation without running it,
+so these tests run each operation after explaining it, and check that the
+mock API received the planned requests.
+"""
+import collections
+
+import pytest
+
+from hetzner_dns_tools.record_delete import record_delete
+from hetzner_dns_tools.record_get import record_get
+from hetzner_dns_tools.record_list import record_list
+from hetzner_dns_tools.record_update import record_update
+
+
+def get_planned_requests(plan):
+    """Return the number of requests that a plan sends to each endpoint."""
+    planned_requests = collections.Counter()
+    for step in plan['steps']:
+        if step['requests']:
+            planned_requests[step['request']] += step['requests']
+    return dict(planned_requests)
+
+
+# (function, a function that returns its parameters)
+OPERATIONS = {
+    'get by zone name': (record_get, lambda zone, records: {
+        'zone_name': 'example.com', 'name': 'host1', 'record_type': 'A'}),
+    'get by zone id': (record_get, lambda zone, records: {
+        'zone_id': zone['id'], 'name': 'host1'}),
+    'get by zone id and name': (record_get, lambda zone, records: {
+        'zone_id': zone['id'], 'zone_name': 'example.com',
+        'value': '10.0.0.1'}),
+    'get by record id': (record_get, lambda zone, records: {
+        'record_id': records[0]['id']}),
+    'get from every zone': (record_get, lambda zone, records: {
+        'search_all_zones': True, 'name': 'host1'}),
+    'get from matching zones': (record_get, lambda zone, records: {
+        'zone_names': 'example.*', 'name': 'host1'}),
+    'list by zone name': (record_list, lambda zone, records: {
+        'zone_name': 'example.com'}),
+    'list pages by zone name': (record_list, lambda zone, records: {
+        'zone_name': 'example.com', 'per_page': 3}),
+    'list pages by zone id': (record_list, lambda zone, records: {
+        'zone_id': zone['id'], 'per_page': 3}),
+    'delete by name': (record_delete, lambda zone, records: {
+        'zone_name': 'example.com', 'name': 'host1', 'record_type': 'A'}),
+    'delete many by name': (record_delete, lambda zone, records: {
+        'zone_id': zone['id'], 'record_type': 'A',
+        'delete_multiple_records': True}),
+    'delete by record ids': (record_delete, lambda zone, records: {
+        'record_ids': [record['id'] for record in records[:3]]}),
+    'update by name': (record_update, lambda zone, records: {
+        'zone_name': 'example.com', 'name': 'host1', 'record_type': 'A',
+        'value': '10.1.0.1'}),
+    'update by zone id': (record_update, lambda zone, records: {
+        'zone_id': zone['id'], 'name': 'host1', 'record_type': 'A',
+        'value': '10.1.0.1'}),
+    'update by record id': (record_update, lambda zone, records: {
+        'zone_id': zone['id'], 'record_id': records[0]['id'],
+        'name': 'host0', 'record_type': 'A', 'value': '10.1.0.1'}),
+    'update by record id without a name': (record_update,
+                                           lambda zone, records: {
+        'zone_id': zone['id'], 'record_id': records[0]['id'],
+        'record_type': 'A', 'value': '10.1.0.1'}),
+}
+
+
+@pytest.mark.parametrize('cache', ['none', 'memory', 'disk'])
+@pytest.mark.parametrize('operation', OPERATIONS)
+def test_plan_matches_the_requests_sent(api, token, operation, cache,
+                                        monkeypatch):
+    if cache == 'disk':
+        monkeypatch.setenv('HETZNER_DNS_CACHE', '1')
+    zone = api.add_zone('example.com')
+    records = api.add_records(zone['id'], 10)
+    api.add_zone('example.org')
+
+    if cache != 'none':
+        # cache the zone (and, with the disk cache, its records)
+        record_list(zone_name='example.com')
+
+    function, get_params = OPERATIONS[operation]
+    params = get_params(zone, records)
+
+    api.reset_requests()
+    plan = function(explain=True, **params)
+    assert api.request_count == 0
+
+    result = function(**params)
+    if hasattr(result, '__next__'):
+        list(result)
+
+    planned_requests = get_planned_requests(plan)
+    sent_requests = api.get_request_counts()
+    if plan['estimate'] == 'exact':
+        assert sent_requests == planned_requests
+    else:
+        assert set(sent_requests) <= {step['request']
+                                      for step in plan['steps']}
+        for request, count in planned_requests.items():
+            assert sent_requests.get(request, 0) >= count
+
+
+def test_plan_describes_the_filters(api, token, zone):
+    plan = record_delete(zone_name='example.com', name='www',
+                         record_type='TXT', explain=True)
+
+    assert "matching name 'www', type 'TXT'" in plan['steps'][1]['reason']
+
+
+def test_update_can_be_explained_without_a_new_record(api, token, zone,
+                                                      monkeypatch):
+    monkeypatch.setenv('ZONE_NAME', 'example.com')
+    monkeypatch.setenv('NAME', 'www')
+
+    plan = record_update(explain=True)
+
+    assert [step['request'] for step in plan['steps']] \
+        == ['GET /zones', 'GET /records', 'PUT /records/{id}']
+    with pytest.raises(ValueError, match="record_type"):
+        record_update()
@@ -0,0 +1,119 @@
+import pytest
+
+from hetzner_dns_tools import request_hooks
+from hetzner_dns_tools.json_codec import loads
+from hetzner_dns_tools.metrics import MetricsCollector
+from hetzner_dns_tools.record_get import record_get
+from hetzner_dns_tools.zone_list import zone_list
+
+
+@pytest.fixture
+def collector():
+    collector = MetricsCollector().install()
+    yield collector
+    collector.uninstall()
+
+
+def make_request_info(latency=0.0, status=200, retries=0, operation=None,
+                      rate_limit_remaining=None):
+    """Return the information of a request, as passed to 'after_request'."""
+    request_info = request_hooks.start_request(
+        'GET', '/zones', 'https://example.com/zones', retries, None)
+    return dict(request_info, operation=operation, status=status,
+                latency=latency, bytes_received=100,
+                rate_limit_remaining=rate_limit_remaining)
+
+
+def get_group(collector, operation, method, endpoint):
+    """Return the metrics of an operation, method and endpoint."""
+    return next(group for group in collector.to_dict()['requests']
+                if (group['operation'], group['method'], group['endpoint'])
+                == (operation, method, endpoint))
+
+
+def test_requests_are_counted_per_operation(api, token, zone, collector):
+    with request_hooks.operation('list'):
+        zone_list()
+    with request_hooks.operation('lookup'):
+        record_get(zone_id=zone['id'], name='host1', record_type='A')
+        record_get(zone_id=zone['id'], name='host2', record_type='A')
+
+    assert get_group(collector, 'list', 'GET', '/zones')['requests'] == 1
+    lookups = get_group(collector, 'lookup', 'GET', '/records')
+    assert lookups['status_codes'] == {'200': lookups['requests']}
+    assert lookups['errors'] == 0
+    assert lookups['bytes_received'] > 0
+    assert sum(group['requests']
+               for group in collector.to_dict()['requests']) \
+        == api.request_count
+
+
+def test_retries_and_errors_are_counted(api, token, collector):
+    api.fail_next(1, 503)
+
+    zone_list()
+
+    group = get_group(collector, None, 'GET', '/zones')
+    assert (group['requests'], group['errors'], group['retries']) \
+        == (2, 1, 1)
+    assert group['status_codes'] == {'503': 1, '200': 1}
+
+
+def test_latencies_are_counted_in_cumulative_buckets():
+    collector = MetricsCollector(latency_buckets=(1.0, 0.01, 0.1))
+    for latency in (0.003, 0.01, 0.02, 0.2, 20):
+        collector.record_request(make_request_info(latency=latency))
+
+    latency = collector.to_dict()['requests'][0]['latency_seconds']
+    assert latency['buckets'] == {'0.01': 2, '0.1': 3, '1': 4, '+Inf': 5}
+    assert latency['count'] == 5
+    assert latency['sum'] == pytest.approx(20.233)
+
+
+def test_metrics_are_exported_as_json():
+    collector = MetricsCollector()
+    collector.record_request(make_request_info(rate_limit_remaining=42))
+
+    metrics = loads(collector.to_json())
+
+    assert metrics == collector.to_dict()
+    assert metrics['rate_limit_remaining'] == 42
+    assert metrics['requests'][0]['requests'] == 1
+
+
+def test_metrics_are_exported_to_prometheus():
+    collector = MetricsCollector(latency_buckets=(0.1, 1.0))
+    collector.record_request(make_request_info(
+        latency=0.5, operation='say "hi"', rate_limit_remaining=42))
+    collector.record_request(make_request_info(
+        latency=0.05, status=None, retries=1, operation='say "hi"'))
+
+    lines = collector.to_prometheus().splitlines()
+
+    labels = 'operation="say \\"hi\\"",method="GET",endpoint="/zones"'
+    assert '# TYPE hetzner_dns_requests_total counter' in lines
+    assert f'hetzner_dns_requests_total{{{labels},status="200"}} 1' in lines
+    assert f'hetzner_dns_requests_total{{{labels},status="error"}} 1' \
+        in lines
+    assert f'hetzner_dns_request_errors_total{{{labels}}} 1' in lines
+    assert f'hetzner_dns_request_retries_total{{{labels}}} 1' in lines
+    histogram = 'hetzner_dns_request_duration_seconds'
+    assert f'# TYPE {histogram} histogram' in lines
+    assert f'{histogram}_bucket{{{labels},le="0.1"}} 1' in lines
+    assert f'{histogram}_bucket{{{labels},le="1"}} 2' in lines
+    assert f'{histogram}_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f'{histogram}_count{{{labels}}} 2' in lines
+    assert 'hetzner_dns_rate_limit_remaining 42' in lines
+
+
+def test_requests_are_not_counted_after_uninstalling(api, token):
+    collector = MetricsCollector().install()
+    zone_list(use_cache=False)
+    collector.uninstall()
+    zone_list(use_cache=False)
+
+    assert get_group(collector, None, 'GET', '/zones')['requests'] == 1
+
+    collector.reset()
+    assert collector.to_dict() == {'requests': [],
+                                   'rate_limit_remaining': None}
@@ -0,0 +1,46 @@
+from hetzner_dns_tools.hetzner_dns_client import get_client
+from hetzner_dns_tools.record_list import record_list
+from hetzner_dns_tools.zone_list import zone_list
+
+
+def test_every_page_of_zones_is_fetched(api, token):
+    for i in range(250):
+        api.add_zone(f'zone{i}.example.com')
+    api.reset_requests()
+
+    zones = zone_list()['zones']
+
+    # 100 zones per page
+    assert len(zones) == 250
+    assert len({zone['id'] for zone in zones}) == 250
+    assert api.get_request_counts() == {'GET /zones': 3}
+
+
+def test_every_page_of_records_is_fetched_in_order(api, token, zone):
+    records = api.add_records(zone['id'], 45, name='more{i}')
+    api.reset_requests()
+
+    listed = record_list(zone_id=zone['id'], per_page=10)['records']
+
+    assert [record['id'] for record in listed[10:]] \
+        == [record['id'] for record in records]
+    assert api.get_request_counts() == {'GET /records': 6}
+
+
+def test_a_single_page_is_fetched_once(api, token, zone):
+    api.reset_requests()
+
+    assert len(record_list(zone_id=zone['id'], per_page=100)['records']) \
+        == 10
+    assert api.request_count == 1
+
+
+def test_the_first_page_is_not_modified(api, token, zone):
+    client = get_client(token)
+    params = {'zone_id': zone['id']}
+
+    records = client.get_all_pages('/records', 'records', params=params,
+                                   per_page=4)['records']
+
+    assert len(records) == 10
+    assert params == {'zone_id': zone['id']}
@@ -0,0 +1,93 @@
+import pytest
+
+from hetzner_dns_tools import rate_limit
+from hetzner_dns_tools.rate_limit import RateLimiter
+
+
+class Clock:
+    """A replacement for the `time` module, whose time only moves when
+    it is told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, 'time', clock)
+    return clock
+
+
+def test_requests_are_not_paced_without_headers(clock):
+    rate_limiter = RateLimiter()
+    assert [rate_limiter.reserve() for _ in range(100)] == [0.0] * 100
+
+
+def test_every_window_is_tracked(clock):
+    rate_limiter = RateLimiter()
+    # the minute window is exhausted, although the second window isn't
+    rate_limiter.update({'X-RateLimit-Limit-Second': '10',
+                         'X-RateLimit-Remaining-Second': '9',
+                         'X-RateLimit-Limit-Minute': '60',
+                         'X-RateLimit-Remaining-Minute': '0'})
+
+    assert rate_limiter.reserve() == pytest.approx(1.0)
+    assert rate_limiter.reserve() == pytest.approx(2.0)
+
+
+def test_fixed_window_debt_is_carried_forward(clock):
+    rate_limiter = RateLimiter()
+    rate_limiter.update({'RateLimit-Limit': '2',
+                         'RateLimit-Remaining': '2',
+                         'RateLimit-Reset': '5',
+                         'RateLimit-Policy': '2;w=10'})
+
+    delays = [rate_limiter.reserve() for _ in range(5)]
+
+    # 2 requests fit in this window, 2 in the next, and 1 in the one after
+    assert delays == [0.0, 0.0, 5.0, 5.0, 15.0]
+
+    # after the first reset, the 2 requests that waited for it have used
+    # up the new window
+    clock.now += 5
+    assert rate_limiter.reserve() == pytest.approx(10.0)
+
+    # after every request has been paid for, the window is full again
+    clock.now += 100
+    assert [rate_limiter.reserve() for _ in range(2)] == [0.0, 0.0]
+
+
+def test_fixed_window_without_reset_is_paced_over_the_window(clock):
+    rate_limiter = RateLimiter()
+    rate_limiter.update({'RateLimit-Limit': '10',
+                         'RateLimit-Remaining': '0',
+                         'RateLimit-Policy': '10;w=20'})
+
+    # 10 requests per 20 seconds
+    assert rate_limiter.reserve() == pytest.approx(2.0)
+    assert rate_limiter.reserve() == pytest.approx(4.0)
+
+
+def test_fixed_window_length_defaults_when_unknown(clock):
+    rate_limiter = RateLimiter()
+    rate_limiter.update({'RateLimit-Limit': '30',
+                         'RateLimit-Remaining': '0'})
+
+    assert rate_limiter.reserve() == pytest.approx(
+        rate_limit.DEFAULT_RATE_LIMIT_WINDOW / 30)
+
+
+def test_backoff_pauses_every_request(clock):
+    rate_limiter = RateLimiter()
+    rate_limiter.backoff(3)
+    assert rate_limiter.reserve() == 3.0
+
+    clock.now += 3
+    assert rate_limiter.reserve() == 0.0
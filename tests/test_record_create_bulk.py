@@ -0,0 +1,73 @@
+from hetzner_dns_tools.record_create_bulk import match_records, \
+    record_create_bulk
+
+
+def test_records_are_created_in_a_single_request(api, token, zone):
+    api.reset_requests()
+    result = record_create_bulk(records=[
+        {'zone_name': 'example.com', 'type': 'A', 'name': f'new{i}',
+         'value': f'10.1.0.{i}'} for i in range(5)])
+
+    assert result['created'] == 5
+    assert result['failed'] == 0
+    assert [r['record']['name'] for r in result['results']] \
+        == [f'new{i}' for i in range(5)]
+    assert api.get_request_counts() == {'GET /zones': 1,
+                                        'POST /records/bulk': 1}
+
+
+def test_invalid_ttl_is_a_failure_of_that_record(api, token, zone):
+    result = record_create_bulk(records=[
+        {'zone_name': 'example.com', 'type': 'A', 'name': 'bad',
+         'value': '10.1.0.1', 'ttl': 'one hour'},
+        {'zone_name': 'example.com', 'type': 'A', 'name': 'good',
+         'value': '10.1.0.2', 'ttl': '3600'}])
+
+    assert [r['status'] for r in result['results']] == ['failed', 'created']
+    assert 'ttl' in result['results'][0]['error']
+    assert result['results'][1]['record']['ttl'] == 3600
+
+
+def test_invalid_records_are_matched(api, token, zone):
+    result = record_create_bulk(records=[
+        {'zone_id': 'missing', 'type': 'A', 'name': 'www',
+         'value': '10.1.0.1'},
+        {'zone_id': zone['id'], 'type': 'A', 'name': 'www',
+         'value': '10.1.0.1'}])
+
+    assert [r['status'] for r in result['results']] == ['invalid', 'created']
+    assert result['failed'] == 1
+
+
+def test_records_are_matched_when_normalized_by_the_api():
+    chunk = [(0, {'zone_id': 'z', 'type': 'TXT', 'name': 'WWW',
+                  'value': 'hello'}),
+             (1, {'zone_id': 'z', 'type': 'CNAME', 'name': 'mail',
+                  'value': 'mail.example.com.'})]
+    response_dict = {'records': [
+        {'zone_id': 'z', 'type': 'CNAME', 'name': 'mail',
+         'value': 'mail.example.com'},
+        {'zone_id': 'z', 'type': 'TXT', 'name': 'www',
+         'value': '"hello"'}]}
+
+    matched = match_records(chunk, response_dict)
+
+    assert matched[0]['record']['type'] == 'TXT'
+    assert matched[1]['record']['type'] == 'CNAME'
+
+
+def test_records_are_matched_by_position_if_their_keys_differ():
+    chunk = [(0, {'zone_id': 'z', 'type': 'A', 'name': 'a',
+                  'value': '10.0.0.1'}),
+             (1, {'zone_id': 'z', 'type': 'A', 'name': 'b',
+                  'value': '10.0.0.2'})]
+    response_dict = {'records': [
+        {'id': 'first', 'zone_id': 'z', 'type': 'A',
+         'name': 'a.example.com', 'value': '10.0.0.1'},
+        {'id': 'second', 'zone_id': 'z', 'type': 'A',
+         'name': 'b.example.com', 'value': '10.0.0.2'}]}
+
+    matched = match_records(chunk, response_dict)
+
+    assert matched[0]['record']['id'] == 'first'
+    assert matched[1]['record']['id'] == 'second'
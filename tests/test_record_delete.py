@@ -0,0 +1,73 @@
+import pytest
+
+from hetzner_dns_tools import cli, request_hooks
+from hetzner_dns_tools.record_delete import RecordDeleteError, record_delete
+
+
+@pytest.fixture
+def fail_deletion(api):
+    """Make the deletion of a record fail."""
+    record_ids = []
+
+    def before_request(request_info):
+        if request_info['method'] == 'DELETE' \
+                and request_info['path'].split('/')[-1] in record_ids:
+            api.fail_next(1, 422)
+
+    request_hooks.add_hook('before_request', before_request)
+    yield record_ids.append
+    request_hooks.remove_hook('before_request', before_request)
+
+
+def test_records_not_found_are_not_counted_as_deleted(api, token, zone,
+                                                      fail_deletion):
+    record = api.add_record(zone['id'], 'www', 'A', '10.0.0.1')
+    fail_deletion(record['id'])
+
+    # the first record isn't found, the second fails, and the third is
+    # skipped
+    with pytest.raises(ValueError, match="Deleted 0 of 3 records"):
+        record_delete(record_ids=['missing', record['id'], 'other'],
+                      max_workers=1)
+
+
+def test_error_lists_the_records_that_were_and_were_not_deleted(
+        api, token, zone, fail_deletion):
+    records = api.add_records(zone['id'], 3, name='www{i}')
+    fail_deletion(records[1]['id'])
+    record_ids = [record['id'] for record in records] + ['missing']
+
+    with pytest.raises(RecordDeleteError) as exc_info:
+        record_delete(record_ids=record_ids, max_workers=1)
+
+    assert exc_info.value.results[records[0]['id']] == 'deleted'
+    assert exc_info.value.results[records[1]['id']].startswith('failed')
+    assert exc_info.value.results[records[2]['id']] == 'skipped'
+    assert exc_info.value.results['missing'] == 'skipped'
+    message = str(exc_info.value)
+    assert f"deleted: {records[0]['id']};" in message
+    assert f"failed: {records[1]['id']};" in message
+    assert f"skipped: {records[2]['id']}, missing." in message
+
+
+def test_continue_on_error_exits_with_error_if_any_deletion_failed(
+        api, token, zone, fail_deletion, capsys):
+    record = api.add_record(zone['id'], 'www', 'A', '10.0.0.1')
+    fail_deletion(record['id'])
+
+    assert cli.main(['record', 'delete', '--max-workers', '1',
+                     '--record-ids', f"{record['id']},missing",
+                     '--continue-on-error']) == 1
+
+    results = cli.json_codec.loads(capsys.readouterr().out)
+    assert results[record['id']].startswith('failed')
+    assert results['missing'] == 'not found'
+
+
+def test_continue_on_error_exits_without_error_if_every_record_was_deleted(
+        api, token, zone):
+    records = api.add_records(zone['id'], 2, name='www{i}')
+
+    assert cli.main(['record', 'delete', '--continue-on-error',
+                     '--record-ids',
+                     ','.join(record['id'] for record in records)]) == 0
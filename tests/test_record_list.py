@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+from hetzner_dns_tools import cli, request_hooks
+from hetzner_dns_tools.record_get import record_get
+from hetzner_dns_tools.record_list import record_list
+
+
+@pytest.fixture
+def staging_zones(api, zone):
+    """Two staging zones, and a zone that isn't related to them."""
+    zones = [api.add_zone(f'{name}.staging.example.com')
+             for name in ('a', 'b')]
+    for staging_zone in zones:
+        api.add_records(staging_zone['id'], 3, name='host{i}')
+    other_zone = api.add_zone('example.org')
+    api.add_records(other_zone['id'], 3, name='host{i}')
+    api.reset_requests()
+    return zones
+
+
+def test_records_of_matching_zones_are_listed(api, token, staging_zones):
+    result = record_list(zone_names='*.staging.example.com')
+
+    # the records are in the same order as the zones, and tagged with the
+    # name of their zone
+    assert [(record['zone_name'], record['name'])
+            for record in result['records']] \
+        == [(zone_name, f'host{i}')
+            for zone_name in ('a.staging.example.com',
+                              'b.staging.example.com')
+            for i in range(3)]
+    # the zones are listed once, then only the matching zones are fetched
+    assert api.get_request_counts() == {'GET /zones': 1, 'GET /records': 2}
+
+
+@pytest.mark.parametrize('zone_names', [
+    'example.com, b.staging.example.com',
+    'example.com b.staging.example.com',
+    ['example.com', 'b.staging.example.com']])
+def test_zone_names_may_be_a_list_or_a_string(api, token, staging_zones,
+                                              zone_names):
+    result = record_list(zone_names=zone_names)
+
+    assert {record['zone_name'] for record in result['records']} \
+        == {'example.com', 'b.staging.example.com'}
+    assert len(result['records']) == 10 + 3
+
+
+def test_no_records_are_fetched_if_no_zones_match(api, token,
+                                                  staging_zones):
+    assert record_list(zone_names='*.example.net') == {'records': []}
+    assert api.get_request_counts() == {'GET /zones': 1}
+
+
+def test_zones_are_fetched_concurrently(api, token, staging_zones):
+    for i in range(4):
+        api.add_zone(f'{i}.example.com')
+    api.latency = 0.1
+    lock = threading.Lock()
+    in_flight = []
+    most_in_flight = []
+
+    def before_request(request_info):
+        with lock:
+            in_flight.append(request_info)
+            most_in_flight.append(len(in_flight))
+
+    def after_request(request_info):
+        with lock:
+            in_flight.remove(request_info)
+
+    request_hooks.add_hook('before_request', before_request)
+    request_hooks.add_hook('after_request', after_request)
+    try:
+        result = record_list(zone_names='*.example.com', max_workers=3)
+    finally:
+        request_hooks.remove_hook('before_request', before_request)
+        request_hooks.remove_hook('after_request', after_request)
+
+    # the staging zones, and the new zones (which have no records)
+    assert len(result['records']) == 3 + 3
+    # never more than 'max_workers' zones are fetched at a time
+    assert max(most_in_flight) == 3
+
+
+def test_records_of_matching_zones_are_streamed(api, token, staging_zones):
+    records = record_list(zone_names='*.staging.example.com', stream=True,
+                          max_workers=1)
+
+    assert sorted((record['zone_name'], record['name'])
+                  for record in records) \
+        == [(zone_name, f'host{i}')
+            for zone_name in ('a.staging.example.com',
+                              'b.staging.example.com')
+            for i in range(3)]
+
+
+def test_records_are_found_in_matching_zones(api, token, staging_zones):
+    records = record_get(zone_names='*.staging.example.com', name='host1',
+                         record_type='A', allow_multiple_records=True)
+
+    assert sorted(record['zone_name'] for record in records) \
+        == ['a.staging.example.com', 'b.staging.example.com']
+    assert all(record['name'] == 'host1' for record in records)
+
+
+def test_zone_names_can_be_given_in_bash(api, token, staging_zones,
+                                         capsys):
+    assert cli.main(['record', 'list', '--zone-names', 'a.staging.*',
+                     '--output', 'ndjson']) == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    assert {cli.json_codec.loads(line)['zone_name'] for line in lines} \
+        == {'a.staging.example.com'}
+    assert len(lines) == 3
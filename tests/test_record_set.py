@@ -0,0 +1,55 @@
+import pytest
+
+from hetzner_dns_tools.record_get import record_get
+from hetzner_dns_tools.record_list import record_list
+from hetzner_dns_tools.record_set import Record, RecordSet
+
+RECORDS = [
+    {'id': '1', 'zone_id': 'z', 'type': 'A', 'name': 'www',
+     'value': '10.0.0.1', 'ttl': 60},
+    {'id': '2', 'zone_id': 'z', 'type': 'AAAA', 'name': 'www',
+     'value': '::1'},
+    {'id': '3', 'zone_id': 'z', 'type': 'A', 'name': 'mail',
+     'value': '10.0.0.1'},
+    {'id': '4', 'zone_id': 'z', 'type': 'A', 'name': 'www',
+     'value': '10.0.0.2'},
+]
+
+
+@pytest.mark.parametrize('filters, ids', [
+    ({}, ['1', '2', '3', '4']),
+    ({'name': 'www'}, ['1', '2', '4']),
+    ({'record_type': 'A'}, ['1', '3', '4']),
+    ({'value': '10.0.0.1'}, ['1', '3']),
+    ({'name': 'www', 'record_type': 'A'}, ['1', '4']),
+    ({'name': 'www', 'record_type': 'A', 'value': '10.0.0.2'}, ['4']),
+    ({'name': 'mail', 'value': '::1'}, []),
+    ({'name': 'missing'}, []),
+])
+def test_query_matches_every_filter_in_order(filters, ids):
+    records = RecordSet(RECORDS)
+    assert [record.id for record in records.query(**filters)] == ids
+
+
+def test_records_can_be_found_by_id():
+    records = RecordSet(RECORDS)
+    assert records.get('3').name == 'mail'
+    assert records.get('missing') is None
+    assert len(records) == 4
+
+
+def test_records_are_converted_back_to_the_api_format():
+    assert RecordSet(RECORDS).to_list() == RECORDS
+    assert Record.from_dict(RECORDS[1]).to_dict() == RECORDS[1]
+
+
+def test_record_get_filters_with_a_record_set(api, token, zone):
+    api.add_record(zone['id'], 'host1', 'TXT', 'hello')
+
+    records = record_list(zone_id=zone['id'], as_record_set=True)
+    assert isinstance(records, RecordSet)
+
+    record = record_get(zone_id=zone['id'], name='host1', record_type='TXT')
+    assert record['value'] == 'hello'
+    assert len(record_get(zone_id=zone['id'], name='host1',
+                          allow_multiple_records=True)) == 2
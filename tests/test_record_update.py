@@ -0,0 +1,39 @@
+import pytest
+
+from hetzner_dns_tools.record_update import record_update
+
+
+def test_record_found_by_name_in_the_zone(api, token, zone):
+    api.reset_requests()
+
+    record = record_update(zone_name='example.com', name='host1',
+                           record_type='A', value='10.1.0.1')['record']
+
+    assert (record['name'], record['value']) == ('host1', '10.1.0.1')
+    assert api.get_request_counts() == {'GET /zones': 1,
+                                        'GET /records': 1,
+                                        'PUT /records/{id}': 1}
+
+
+def test_record_id_without_a_name_keeps_the_name(api, token, zone):
+    record = api.add_record(zone['id'], 'www', 'A', '10.0.0.1')
+
+    updated = record_update(record_id=record['id'], zone_id=zone['id'],
+                            record_type='A', value='10.1.0.1')['record']
+
+    assert (updated['name'], updated['value']) == ('www', '10.1.0.1')
+
+
+def test_name_defaults_to_the_zone_apex(api, token, zone):
+    record = api.add_record(zone['id'], '@', 'A', '10.0.0.1')
+
+    updated = record_update(zone_id=zone['id'], record_type='A',
+                            value='10.1.0.1')['record']
+
+    assert updated['id'] == record['id']
+
+
+def test_missing_value_is_an_error(api, token, zone):
+    with pytest.raises(ValueError, match="value"):
+        record_update(zone_id=zone['id'], name='host1', record_type='A')
+    assert api.request_count == 0
@@ -0,0 +1,82 @@
+from hetzner_dns_tools.record_update_bulk import record_update_bulk
+
+
+def test_records_are_found_by_name(api, token, zone):
+    api.reset_requests()
+    result = record_update_bulk(records=[
+        {'zone_name': 'example.com', 'type': 'A', 'name': f'host{i}',
+         'value': f'10.2.0.{i}'} for i in range(3)])
+
+    assert result['updated'] == 3
+    assert [r['record']['value'] for r in result['results']] \
+        == [f'10.2.0.{i}' for i in range(3)]
+    # the zone's records are only listed once
+    assert api.get_request_counts() == {'GET /zones': 1,
+                                        'GET /records': 1,
+                                        'PUT /records/bulk': 1}
+
+
+def test_records_are_found_by_id_without_a_zone(api, token, zone):
+    records = api.add_records(zone['id'], 2, name='other{i}')
+    api.reset_requests()
+
+    result = record_update_bulk(records=[
+        {'record_id': record['id'], 'value': '10.3.0.1'}
+        for record in records] + [{'record_id': 'missing', 'ttl': 60}])
+
+    assert [r['status'] for r in result['results']] \
+        == ['updated', 'updated', 'failed']
+    assert result['results'][0]['record']['name'] == 'other0'
+    assert result['results'][0]['record']['value'] == '10.3.0.1'
+    assert result['results'][2]['error'] == "record not found"
+    # the records are found in a single listing, not fetched one by one
+    assert api.get_request_counts() == {'GET /records': 1,
+                                        'PUT /records/bulk': 1}
+
+
+def test_duplicate_record_ids_are_rejected(api, token, zone):
+    record = api.add_record(zone['id'], 'www', 'A', '10.0.0.1')
+    api.reset_requests()
+
+    result = record_update_bulk(records=[
+        {'record_id': record['id'], 'zone_id': zone['id'],
+         'value': '10.0.0.2'},
+        {'record_id': record['id'], 'zone_id': zone['id'],
+         'value': '10.0.0.3'}])
+
+    assert [r['status'] for r in result['results']] == ['failed', 'failed']
+    assert 'more than once' in result['results'][0]['error']
+    assert api.request_count == 0
+
+
+def test_records_found_twice_in_different_ways_are_rejected(api, token,
+                                                           zone):
+    host1_id = next(record['id']
+                    for record in api.records[zone['id']].values()
+                    if record['name'] == 'host1')
+    api.reset_requests()
+
+    result = record_update_bulk(records=[
+        {'zone_name': 'example.com', 'type': 'A', 'name': 'host1',
+         'value': '10.4.0.1'},
+        {'record_id': host1_id, 'value': '10.4.0.2'},
+        {'zone_name': 'example.com', 'type': 'A', 'name': 'host2',
+         'value': '10.4.0.3'}])
+
+    assert [r['status'] for r in result['results']] \
+        == ['failed', 'failed', 'updated']
+    assert 'more than once' in result['results'][0]['error']
+    # the duplicates are rejected before anything is sent
+    assert api.records[zone['id']][host1_id]['value'] == '10.0.0.1'
+    assert api.get_request_counts()['PUT /records/bulk'] == 1
+
+
+def test_invalid_ttl_is_a_failure_of_that_record(api, token, zone):
+    result = record_update_bulk(records=[
+        {'zone_name': 'example.com', 'type': 'A', 'name': 'host1',
+         'ttl': 'one hour'},
+        {'zone_name': 'example.com', 'type': 'A', 'name': 'host2',
+         'ttl': '60'}])
+
+    assert [r['status'] for r in result['results']] == ['failed', 'updated']
+    assert result['results'][1]['record']['ttl'] == 60
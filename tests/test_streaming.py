@@ -0,0 +1,82 @@
+import collections.abc
+
+from hetzner_dns_tools import cli, request_hooks
+from hetzner_dns_tools.record_get import record_get
+from hetzner_dns_tools.record_list import record_list
+from hetzner_dns_tools.zone_list import zone_list
+
+
+def get_ndjson(capsys):
+    """Return the items that were printed as NDJSON."""
+    return [cli.json_codec.loads(line)
+            for line in capsys.readouterr().out.splitlines()]
+
+
+def test_zones_are_yielded_before_every_page_is_fetched(api, token):
+    for i in range(250):
+        api.add_zone(f'zone{i}.com')
+    api.reset_requests()
+
+    zones = zone_list(stream=True)
+
+    assert isinstance(zones, collections.abc.Iterator)
+    assert next(zones)['name'] == 'zone0.com'
+    assert api.get_request_counts() == {'GET /zones': 1}
+    assert [zone['name'] for zone in zones] \
+        == [f'zone{i}.com' for i in range(1, 250)]
+    assert api.get_request_counts() == {'GET /zones': 3}
+
+
+def test_records_are_yielded_in_order(api, token, zone):
+    records = record_list(zone_id=zone['id'], per_page=3, stream=True)
+
+    assert [record['name'] for record in records] \
+        == [f'host{i}' for i in range(10)]
+    assert api.get_request_counts()['GET /records'] == 4
+
+
+def test_multiple_matching_records_are_streamed(api, token, zone):
+    records = record_get(zone_id=zone['id'], record_type='A',
+                         allow_multiple_records=True, stream=True)
+
+    assert isinstance(records, collections.abc.Iterator)
+    assert len(list(records)) == 10
+
+
+def test_records_are_printed_one_per_line(api, token, zone, capsys):
+    assert cli.main(['record', 'list', '--zone-name', 'example.com',
+                     '--per-page', '3', '--output', 'ndjson']) == 0
+
+    assert [record['name'] for record in get_ndjson(capsys)] \
+        == [f'host{i}' for i in range(10)]
+
+
+def test_results_that_are_not_streamed_are_printed_as_one_line(
+        api, token, zone, capsys):
+    assert cli.main(['zone', 'get', '--zone-name', 'example.com',
+                     '--output', 'ndjson']) == 0
+
+    assert [zone['name'] for zone in get_ndjson(capsys)] == ['example.com']
+
+
+def test_errors_in_later_pages_exit_with_error(api, token, zone, capsys):
+    pages = []
+
+    def before_request(request_info):
+        # fail the second page
+        if request_info['endpoint'] == '/records':
+            pages.append(request_info)
+            if len(pages) == 2:
+                api.fail_next(1, 422)
+
+    request_hooks.add_hook('before_request', before_request)
+    try:
+        assert cli.main(['record', 'list', '--zone-id', zone['id'],
+                         '--per-page', '5', '--output', 'ndjson']) == 1
+    finally:
+        request_hooks.remove_hook('before_request', before_request)
+
+    # the records of the first page were printed before the error
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 6
+    assert lines[-1].startswith('Error:')
@@ -0,0 +1,35 @@
+from hetzner_dns_tools import cli
+from hetzner_dns_tools.zone_drift import (
+    get_fingerprint, get_normalized_records, zone_drift)
+
+
+def test_drift_exits_with_error_if_a_zone_drifted(api, token, zone):
+    # the first check records the fingerprints of each zone
+    assert cli.main(['zone', 'drift']) == 0
+
+    api.add_record(zone['id'], 'new', 'A', '10.1.0.1')
+    assert cli.main(['zone', 'drift']) == 1
+    assert cli.main(['zone', 'drift']) == 0
+
+
+def test_unchanged_zones_are_not_fetched(api, token, zone):
+    zone_drift()
+    api.reset_requests()
+
+    result = zone_drift()
+
+    assert result['drifted'] == []
+    assert api.get_request_counts() == {'GET /zones': 1}
+
+
+def test_equivalent_records_have_the_same_fingerprint():
+    records = [{'name': 'www', 'type': 'CNAME', 'value': 'example.net',
+                'ttl': 60},
+               {'name': '@', 'type': 'TXT', 'value': '"v=spf1 -all"'}]
+    equivalent_records = [
+        {'name': '@', 'type': 'txt', 'value': 'v=spf1 -all'},
+        {'name': 'WWW', 'type': 'CNAME', 'value': 'Example.net.',
+         'ttl': '60'}]
+
+    assert get_fingerprint(get_normalized_records(records)) \
+        == get_fingerprint(get_normalized_records(equivalent_records))
@@ -0,0 +1,27 @@
+from hetzner_dns_tools.zone_export import zone_export
+
+
+def test_large_zones_are_exported_to_a_file(api, token, zone, tmp_path):
+    api.add_records(zone['id'], 5000, name='www{i}')
+    output_file = tmp_path / 'example.com.zone'
+
+    assert zone_export(zone_name='example.com',
+                       output_file=str(output_file)) == "OK"
+
+    lines = output_file.read_text().splitlines()
+    assert lines[0] == '$ORIGIN example.com.'
+    assert len(lines) == 2 + 10 + 5000
+    assert lines[-1].startswith('www4999 ')
+    # the streamed file is the same as the zone file that is returned
+    assert output_file.read_text() == zone_export(zone_name='example.com')
+
+
+def test_large_zones_are_exported_to_stdout(api, token, zone,
+                                            capsysbinary):
+    api.add_records(zone['id'], 5000, name='www{i}')
+
+    assert zone_export(zone_id=zone['id'], output_file='-') is None
+
+    lines = capsysbinary.readouterr().out.splitlines()
+    assert len(lines) == 2 + 10 + 5000
+    assert lines[-1].startswith(b'www4999 ')
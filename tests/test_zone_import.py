@@ -0,0 +1,56 @@
+import pytest
+
+from hetzner_dns_tools.zone_import import zone_import
+
+ZONE_FILE = '''$ORIGIN example.com.
+$TTL 86400
+www 60 IN A 10.1.0.1
+mail IN A 10.1.0.2
+'''
+
+
+@pytest.fixture
+def zone_file_path(tmp_path):
+    zone_file_path = tmp_path / 'example.com.zone'
+    zone_file_path.write_text(ZONE_FILE)
+    return zone_file_path
+
+
+def test_zone_file_is_validated_then_imported(api, token, zone,
+                                              zone_file_path):
+    api.reset_requests()
+
+    result = zone_import(zone_name='example.com',
+                         input_file=str(zone_file_path), validate=True)
+
+    assert result['zone']['id'] == zone['id']
+    assert sorted(record['name']
+                  for record in api.records[zone['id']].values()) \
+        == ['mail', 'www']
+    assert api.get_request_counts() == {'GET /zones': 1,
+                                        'POST /zones/file/validate': 1,
+                                        'POST /zones/{id}/import': 1}
+
+
+def test_validation_is_retried(api, token, zone, zone_file_path):
+    api.reset_requests()
+    api.fail_next(1, 503)
+
+    zone_import(zone_id=zone['id'], input_file=str(zone_file_path),
+                validate=True)
+
+    # the file is sent again from the start after the failure
+    assert len(api.records[zone['id']]) == 2
+    assert api.get_request_counts() == {'POST /zones/file/validate': 2,
+                                        'POST /zones/{id}/import': 1}
+
+
+def test_invalid_zone_file_is_not_imported(api, token, zone):
+    api.reset_requests()
+
+    with pytest.raises(ValueError, match="1 invalid record"):
+        zone_import(zone_id=zone['id'], validate=True,
+                    zone_file=ZONE_FILE + 'not a record\n')
+
+    assert len(api.records[zone['id']]) == 10
+    assert api.get_request_counts() == {'POST /zones/file/validate': 1}
@@ -0,0 +1,54 @@
+from hetzner_dns_tools.zone_create import zone_create
+from hetzner_dns_tools.zone_delete import zone_delete
+from hetzner_dns_tools.zone_resolver import ZoneResolver, get_zone_resolver
+
+
+def test_zones_are_looked_up_once(api, token, zone):
+    api.reset_requests()
+    zone_resolver = get_zone_resolver(token)
+
+    assert zone_resolver.get_zone_id('example.com') == zone['id']
+    assert zone_resolver.get_zone_id('example.com') == zone['id']
+    assert zone_resolver.get_cached_zone('example.com')[1] == 'memory cache'
+    assert api.get_request_counts() == {'GET /zones': 1}
+
+
+def test_zones_are_fetched_again_after_the_ttl(api, token, zone):
+    api.reset_requests()
+    zone_resolver = ZoneResolver(token, ttl=0)
+
+    zone_resolver.get_zone_id('example.com')
+    zone_resolver.get_zone_id('example.com')
+
+    assert zone_resolver.get_cached_zone('example.com') == (None, None)
+    assert api.request_count == 2
+
+
+def test_missing_zones_are_not_cached(api, token):
+    zone_resolver = get_zone_resolver(token)
+    assert zone_resolver.get_zone_id('example.com') is None
+
+    zone = api.add_zone('example.com')
+    assert zone_resolver.get_zone_id('example.com') == zone['id']
+
+
+def test_created_and_deleted_zones_update_the_cache(api, token):
+    zone = zone_create(name='example.com')['zone']
+    api.reset_requests()
+
+    zone_resolver = get_zone_resolver(token)
+    assert zone_resolver.get_zone_id('example.com') == zone['id']
+    assert api.request_count == 0
+
+    zone_delete(zone_id=zone['id'])
+    assert zone_resolver.get_cached_zone('example.com') == (None, None)
+    assert zone_resolver.get_zone_id('example.com') is None
+
+
+def test_invalidate_clears_the_cache(api, token, zone):
+    zone_resolver = get_zone_resolver(token)
+    zone_resolver.get_zone_id('example.com')
+
+    zone_resolver.invalidate()
+
+    assert zone_resolver.get_cached_zone('example.com') == (None, None)
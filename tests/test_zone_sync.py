@@ -0,0 +1,56 @@
+import pytest
+
+from hetzner_dns_tools import cli, request_hooks
+from hetzner_dns_tools.zone_sync import zone_sync
+
+
+@pytest.fixture
+def records_file(tmp_path):
+    """The zone's current records, and a new one."""
+    records_file = tmp_path / 'zone.json'
+    records_file.write_text(cli.json_codec.dumps(
+        [{'name': f'host{i}', 'type': 'A', 'value': f'10.0.0.{i}'}
+         for i in range(10)]
+        + [{'name': 'www', 'type': 'A', 'value': '10.1.0.1'}]))
+    return records_file
+
+
+def test_sync_exits_without_error_if_every_change_was_made(
+        api, token, zone, records_file, capsys):
+    assert cli.main(['zone', 'sync', '--zone-name', 'example.com',
+                     '--records-file', str(records_file)]) == 0
+
+    result = cli.json_codec.loads(capsys.readouterr().out)
+    assert (result['created'], result['unchanged'], result['failed']) \
+        == (1, 10, 0)
+
+
+def test_sync_exits_with_error_if_any_change_failed(
+        api, token, zone, records_file, capsys):
+    def before_request(request_info):
+        if request_info['endpoint'] == '/records/bulk':
+            api.fail_next(1, 422)
+
+    request_hooks.add_hook('before_request', before_request)
+    try:
+        assert cli.main(['zone', 'sync', '--zone-name', 'example.com',
+                         '--records-file', str(records_file)]) == 1
+    finally:
+        request_hooks.remove_hook('before_request', before_request)
+
+    assert cli.json_codec.loads(capsys.readouterr().out)['failed'] == 1
+
+
+def test_equivalent_records_are_unchanged(api, token, zone):
+    api.add_record(zone['id'], 'mail', 'CNAME', 'mx.example.net')
+    api.add_record(zone['id'], '@', 'TXT', '"v=spf1 -all"')
+    api.reset_requests()
+
+    result = zone_sync(zone_name='example.com', dry_run=True, records=[
+        {'name': f'HOST{i}', 'type': 'a', 'value': f'10.0.0.{i}'}
+        for i in range(10)] + [
+        {'name': 'mail', 'type': 'CNAME', 'value': 'MX.example.net.'},
+        {'name': '@', 'type': 'TXT', 'value': 'v=spf1 -all'}])
+
+    assert (len(result['create']), len(result['update']),
+            len(result['delete']), result['unchanged']) == (0, 0, 0, 12)